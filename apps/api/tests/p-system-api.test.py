@@ -2,145 +2,179 @@
 """
 P-System API Testing Script
 Tests all new P-System endpoints after migration deployment
+
+Usage:
+    python3 tests/p-system-api.test.py [--api-base URL] [--timeout SECONDS]
+    python3 tests/p-system-api.test.py --json results.json --junit junit.xml --budget 250
+    python3 tests/p-system-api.test.py --load --players 50 --rate 20 --duration 60
+    python3 tests/p-system-api.test.py --mock --mock-latency-ms 20 --mock-error-rate 0.05
+    python3 tests/p-system-api.test.py --mock --reorder --task-counts 100,500,1000
+
+Every step shares one pooled keep-alive session with connect/read
+timeouts (see psystem.client), and every request is timed per endpoint.
+--json / --junit write the step outcomes and latency histograms for CI,
+and the run exits non-zero when a step fails or a --budget is exceeded
+(see psystem.report). --load replays the flow with concurrent virtual
+players and reports requests/sec and p50/p95/p99 latency per endpoint
+(see psystem.load); it creates tasks, so point it at a local stack.
+--reorder seeds growing task lists and compares P-level query and
+drag-and-drop reorder cost as they grow (see psystem.bulk).
+--mock runs everything against an in-process stand-in API with injected
+latency and errors instead (see psystem.mockserver).
 """
 
-import requests
-import json
-
-API_BASE = "http://localhost:4000/api/v1"
-
-print("=" * 60)
-print("P-System API Testing")
-print("=" * 60)
-print()
-
-# Step 1: Login
-print("1. Logging in as player@demo.com...")
-try:
-    response = requests.post(
-        f"{API_BASE}/auth/login",
-        json={"email": "player@demo.com", "password": "player123"}
-    )
-    if response.status_code == 200:
-        data = response.json()
-        token = data.get("data", {}).get("accessToken")
-        # Get player ID from user.id (same as playerId in JWT)
-        player_id = data.get("data", {}).get("user", {}).get("id")
-
-        print(f"✅ Login successful!")
-        print(f"   Player ID: {player_id}")
-        print(f"   Token: {token[:50]}...")
-        print()
+import argparse
+import sys
+import time
+
+from psystem import bulk, client as api, load, mockserver, report
+from psystem.client import DEMO_EMAIL, add_client_arguments, client_from_args, resolve_api_base
+from psystem.report import FAILED, PASSED, SKIPPED
+from psystem.stats import Recorder
+
+# Steps after login, in order
+STEPS_AFTER_LOGIN = (
+    "List technique tasks",
+    "Create P3.0 task",
+    "Filter tasks by P-level",
+)
+STEPS_AFTER_CREATE = (
+    "Update priority order",
+    "Get task details",
+    "Add drill",
+)
+
+
+def login(client):
+    """Step 1; the value is the player ID"""
+    print(f"1. Logging in as {DEMO_EMAIL}...")
+    try:
+        response = client.login()
+        if response.status_code == 200:
+            data = response.json()
+            token = data.get("data", {}).get("accessToken")
+            # Get player ID from user.id (same as playerId in JWT)
+            player_id = data.get("data", {}).get("user", {}).get("id")
+
+            print(f"✅ Login successful!")
+            print(f"   Player ID: {player_id}")
+            print(f"   Token: {token[:50]}...")
+            print()
+            return PASSED, None, player_id
 
-        headers = {"Authorization": f"Bearer {token}"}
-    else:
         print(f"❌ Login failed: {response.status_code}")
         print(f"   Response: {response.text}")
-        exit(1)
-except Exception as e:
-    print(f"❌ Login error: {e}")
-    exit(1)
-
-# Step 2: List existing technique tasks
-print("2. Listing existing technique tasks...")
-try:
-    response = requests.get(
-        f"{API_BASE}/technique-plan/tasks",
-        headers=headers,
-        params={"limit": 5}
-    )
-    if response.status_code == 200:
-        data = response.json()
-        tasks = data.get("data", [])
-        if isinstance(tasks, dict):
-            tasks = tasks.get("tasks", [])
-        print(f"✅ Found {len(tasks)} existing tasks")
-        for task in tasks[:3]:
-            print(f"   - {task.get('title')} (P-Level: {task.get('pLevel', 'N/A')})")
         print()
-    else:
+        return FAILED, f"HTTP {response.status_code}", None
+    except Exception as e:
+        print(f"❌ Login error: {e}")
+        print()
+        return FAILED, str(e), None
+
+
+def list_tasks(client):
+    print("2. Listing existing technique tasks...")
+    try:
+        response = client.get("/technique-plan/tasks", endpoint=api.LIST_TASKS, params={"limit": 5})
+        if response.status_code == 200:
+            data = response.json()
+            tasks = data.get("data", [])
+            if isinstance(tasks, dict):
+                tasks = tasks.get("tasks", [])
+            print(f"✅ Found {len(tasks)} existing tasks")
+            for task in tasks[:3]:
+                print(f"   - {task.get('title')} (P-Level: {task.get('pLevel', 'N/A')})")
+            print()
+            return PASSED, None, None
+
         print(f"⚠️  Status: {response.status_code}")
         print(f"   Response: {response.text[:200]}")
         print()
-except Exception as e:
-    print(f"❌ Error: {e}")
-    print()
+        return FAILED, f"HTTP {response.status_code}", None
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print()
+        return FAILED, str(e), None
 
-# Step 3: Create a new P-System task
-print("3. Creating a new P-System task (P3.0)...")
-try:
-    new_task = {
-        "playerId": player_id,
-        "title": "Master P3.0 Top of Backswing",
-        "description": "Develop proper shoulder rotation and club position at top of backswing",
-        "pLevel": "P3.0",
-        "repetitions": 50,
-        "priorityOrder": 1,
-        "technicalArea": "swing",
-        "priority": "high"
-    }
 
-    response = requests.post(
-        f"{API_BASE}/technique-plan/tasks",
-        headers=headers,
-        json=new_task
-    )
-
-    if response.status_code == 201:
-        data = response.json()
-        task = data.get("data", {})
-        task_id = task.get("id")
-
-        print(f"✅ Task created successfully!")
-        print(f"   ID: {task_id}")
-        print(f"   Title: {task.get('title')}")
-        print(f"   P-Level: {task.get('pLevel')}")
-        print(f"   Repetitions: {task.get('repetitions')}")
-        print(f"   Priority Order: {task.get('priorityOrder')}")
-        print()
-    else:
+def create_task(client, player_id):
+    """Step 3; the value is the new task's ID"""
+    print("3. Creating a new P-System task (P3.0)...")
+    try:
+        new_task = {
+            "playerId": player_id,
+            "title": "Master P3.0 Top of Backswing",
+            "description": "Develop proper shoulder rotation and club position at top of backswing",
+            "pLevel": "P3.0",
+            "repetitions": 50,
+            "priorityOrder": 1,
+            "technicalArea": "swing",
+            "priority": "high"
+        }
+
+        response = client.post("/technique-plan/tasks", endpoint=api.CREATE_TASK, json=new_task)
+
+        if response.status_code == 201:
+            data = response.json()
+            task = data.get("data", {})
+            task_id = task.get("id")
+
+            print(f"✅ Task created successfully!")
+            print(f"   ID: {task_id}")
+            print(f"   Title: {task.get('title')}")
+            print(f"   P-Level: {task.get('pLevel')}")
+            print(f"   Repetitions: {task.get('repetitions')}")
+            print(f"   Priority Order: {task.get('priorityOrder')}")
+            print()
+            return PASSED, None, task_id
+
         print(f"❌ Failed: {response.status_code}")
         print(f"   Response: {response.text[:500]}")
         print()
-        task_id = None
-except Exception as e:
-    print(f"❌ Error: {e}")
-    print()
-    task_id = None
-
-# Step 4: Get tasks by P-level
-print("4. Getting tasks filtered by P-level (P3.0)...")
-try:
-    response = requests.get(
-        f"{API_BASE}/technique-plan/tasks/by-p-level",
-        headers=headers,
-        params={"playerId": player_id, "pLevel": "P3.0"}
-    )
-
-    if response.status_code == 200:
-        data = response.json()
-        tasks = data.get("data", [])
-        print(f"✅ Found {len(tasks)} tasks at P3.0 level")
-        for task in tasks:
-            print(f"   - {task.get('title')}")
-            print(f"     Drills: {len(task.get('drills', []))}")
-            print(f"     Responsible: {len(task.get('responsible', []))}")
+        return FAILED, f"HTTP {response.status_code}", None
+    except Exception as e:
+        print(f"❌ Error: {e}")
         print()
-    else:
+        return FAILED, str(e), None
+
+
+def tasks_by_p_level(client, player_id):
+    print("4. Getting tasks filtered by P-level (P3.0)...")
+    try:
+        response = client.get(
+            "/technique-plan/tasks/by-p-level",
+            endpoint=api.TASKS_BY_P_LEVEL,
+            params={"playerId": player_id, "pLevel": "P3.0"}
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+            tasks = data.get("data", [])
+            print(f"✅ Found {len(tasks)} tasks at P3.0 level")
+            for task in tasks:
+                print(f"   - {task.get('title')}")
+                print(f"     Drills: {len(task.get('drills', []))}")
+                print(f"     Responsible: {len(task.get('responsible', []))}")
+            print()
+            return PASSED, None, None
+
         print(f"⚠️  Status: {response.status_code}")
         print(f"   Response: {response.text[:200]}")
         print()
-except Exception as e:
-    print(f"❌ Error: {e}")
-    print()
+        return FAILED, f"HTTP {response.status_code}", None
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print()
+        return FAILED, str(e), None
+
 
-# Step 5: Update task priority (drag-and-drop)
-if task_id:
+def update_priority(client, task_id):
+    """Step 5: drag-and-drop reorder"""
     print("5. Updating task priority order (drag-and-drop simulation)...")
     try:
-        response = requests.patch(
-            f"{API_BASE}/technique-plan/tasks/{task_id}/priority",
-            headers=headers,
+        response = client.patch(
+            f"/technique-plan/tasks/{task_id}/priority",
+            endpoint=api.UPDATE_PRIORITY,
             json={"priorityOrder": 5}
         )
 
@@ -150,22 +184,22 @@ if task_id:
             print(f"✅ Priority updated!")
             print(f"   New priority order: {task.get('priorityOrder')}")
             print()
-        else:
-            print(f"⚠️  Status: {response.status_code}")
-            print(f"   Response: {response.text[:200]}")
-            print()
+            return PASSED, None, None
+
+        print(f"⚠️  Status: {response.status_code}")
+        print(f"   Response: {response.text[:200]}")
+        print()
+        return FAILED, f"HTTP {response.status_code}", None
     except Exception as e:
         print(f"❌ Error: {e}")
         print()
+        return FAILED, str(e), None
 
-# Step 6: Get task with full details
-if task_id:
+
+def task_details(client, task_id):
     print("6. Getting task with full details...")
     try:
-        response = requests.get(
-            f"{API_BASE}/technique-plan/tasks/{task_id}/full",
-            headers=headers
-        )
+        response = client.get(f"/technique-plan/tasks/{task_id}/full", endpoint=api.TASK_FULL)
 
         if response.status_code == 200:
             data = response.json()
@@ -179,77 +213,248 @@ if task_id:
             player_info = task.get('player', {})
             print(f"   Player: {player_info.get('firstName', 'N/A')} {player_info.get('lastName', 'N/A')}")
             print()
-        else:
-            print(f"⚠️  Status: {response.status_code}")
-            print(f"   Response: {response.text[:200]}")
-            print()
+            return PASSED, None, None
+
+        print(f"⚠️  Status: {response.status_code}")
+        print(f"   Response: {response.text[:200]}")
+        print()
+        return FAILED, f"HTTP {response.status_code}", None
     except Exception as e:
         print(f"❌ Error: {e}")
         print()
+        return FAILED, str(e), None
+
 
-# Step 7: Test adding a drill (if we have exercises)
-if task_id:
+def add_drill(client, task_id):
+    """Step 7: assign the first exercise to the task (skipped if we have no exercises)"""
     print("7. Testing drill assignment endpoint...")
     # First, get an exercise to use
     try:
-        response = requests.get(
-            f"{API_BASE}/exercises",
-            headers=headers,
-            params={"limit": 1}
-        )
+        response = client.get("/exercises", endpoint=api.LIST_EXERCISES, params={"limit": 1})
 
-        if response.status_code == 200:
-            exercises_data = response.json().get("data", {})
-            if isinstance(exercises_data, dict):
-                exercises = exercises_data.get("exercises", [])
-            else:
-                exercises = exercises_data
-
-            if exercises:
-                exercise_id = exercises[0].get("id")
-                print(f"   Found exercise: {exercises[0].get('name')}")
-
-                # Add drill to task
-                response = requests.post(
-                    f"{API_BASE}/technique-plan/tasks/{task_id}/drills",
-                    headers=headers,
-                    json={
-                        "exerciseId": exercise_id,
-                        "orderIndex": 0,
-                        "notes": "Focus on shoulder rotation"
-                    }
-                )
-
-                if response.status_code == 201:
-                    data = response.json()
-                    drill = data.get("data", {})
-                    print(f"✅ Drill added successfully!")
-                    print(f"   Exercise: {drill.get('exercise', {}).get('name')}")
-                    print(f"   Order: {drill.get('orderIndex')}")
-                    print()
-                else:
-                    print(f"⚠️  Status: {response.status_code}")
-                    print(f"   Response: {response.text[:200]}")
-                    print()
-            else:
-                print("⚠️  No exercises found in database")
-                print()
-        else:
+        if response.status_code != 200:
             print(f"⚠️  Could not fetch exercises: {response.status_code}")
             print()
+            return FAILED, f"exercises: HTTP {response.status_code}", None
+
+        exercises_data = response.json().get("data", {})
+        if isinstance(exercises_data, dict):
+            exercises = exercises_data.get("exercises", [])
+        else:
+            exercises = exercises_data
+
+        if not exercises:
+            print("⚠️  No exercises found in database")
+            print()
+            return SKIPPED, "no exercises in database", None
+
+        exercise_id = exercises[0].get("id")
+        print(f"   Found exercise: {exercises[0].get('name')}")
+
+        # Add drill to task
+        response = client.post(
+            f"/technique-plan/tasks/{task_id}/drills",
+            endpoint=api.ADD_DRILL,
+            json={
+                "exerciseId": exercise_id,
+                "orderIndex": 0,
+                "notes": "Focus on shoulder rotation"
+            }
+        )
+
+        if response.status_code == 201:
+            data = response.json()
+            drill = data.get("data", {})
+            print(f"✅ Drill added successfully!")
+            print(f"   Exercise: {drill.get('exercise', {}).get('name')}")
+            print(f"   Order: {drill.get('orderIndex')}")
+            print()
+            return PASSED, None, None
+
+        print(f"⚠️  Status: {response.status_code}")
+        print(f"   Response: {response.text[:200]}")
+        print()
+        return FAILED, f"HTTP {response.status_code}", None
     except Exception as e:
         print(f"❌ Error: {e}")
         print()
+        return FAILED, str(e), None
+
+
+def run_step(steps, name, step, *args):
+    """Run step(*args), append its StepResult to steps and return its value"""
+    started = time.perf_counter()
+    status, message, value = step(*args)
+    steps.append(report.StepResult(name, status, message, time.perf_counter() - started))
+    return value
+
+
+def skip_steps(steps, names, reason):
+    steps.extend(report.StepResult(name, SKIPPED, reason, 0.0) for name in names)
+
+
+def finish(args, mode, elapsed, steps, recorder, details=None):
+    """Print the outcome, write --json / --junit and exit with the run's status"""
+    breaches = report.check_budgets(recorder, args.budgets, args.budget_percentile)
+
+    print("Summary:")
+    for line in report.summary_lines(steps, breaches):
+        print(line)
+    for budget in report.unmatched_budgets(recorder, args.budgets):
+        print(f"⚠️  Budget for '{budget.endpoint}' matched no endpoint")
+    print()
+
+    if args.json_path:
+        report.write_json(args.json_path, mode, resolve_api_base(args.api_base), elapsed, steps, recorder,
+                          breaches, details)
+        print(f"📄 JSON results: {args.json_path}")
+    if args.junit_path:
+        report.write_junit(args.junit_path, mode, elapsed, steps, args.budgets, breaches, args.budget_percentile)
+        print(f"📄 JUnit results: {args.junit_path}")
+
+    sys.exit(report.exit_status(steps, breaches))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Check the P-System endpoints of a running API.")
+    add_client_arguments(parser)
+    report.add_report_arguments(parser)
+    load.add_load_arguments(parser)
+    bulk.add_bulk_arguments(parser)
+    mockserver.add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.load and args.reorder:
+        parser.error("--load and --reorder are separate runs")
+    return args
+
+
+def load_main(args):
+    print("=" * 60)
+    print("P-System API Load Test")
+    print("=" * 60)
+    print()
+    rate = f"{args.rate:g} flows/s" if args.rate > 0 else "unthrottled"
+    print(f"🚀 {args.players} players, {rate}, {args.duration:g}s against {resolve_api_base(args.api_base)}")
+    print()
+
+    try:
+        result = load.run_load(
+            lambda recorder: client_from_args(args, pool_size=1, recorder=recorder),
+            players=args.players, rate=args.rate, duration=args.duration,
+        )
+    except Exception as e:
+        print(f"❌ Load test aborted: {e}")
+        sys.exit(report.EXIT_FAILED)
+
+    for line in load.summary_lines(result):
+        print(line)
+    print()
+
+    totals = {
+        'players': result.players,
+        'rate': args.rate,
+        'duration_s': args.duration,
+        'flows': result.flows,
+        'failed_flows': result.failed,
+        'requests': result.recorder.requests,
+        'requests_per_s': round(result.recorder.requests / result.elapsed, 2),
+    }
+    steps = report.error_steps(result.recorder, args.max_error_rate)
+    finish(args, 'load', result.elapsed, steps, result.recorder, totals)
+
+
+def reorder_main(args):
+    print("=" * 60)
+    print("P-System Reorder Benchmark")
+    print("=" * 60)
+    print()
+    counts = ", ".join(map(str, args.task_counts))
+    print(f"🌱 {counts} tasks over {len(args.p_levels)} P-levels against {resolve_api_base(args.api_base)}")
+    print()
+
+    recorder = Recorder()
+    with client_from_args(args, recorder=recorder) as client:
+        try:
+            response = client.login()
+            if response.status_code != 200:
+                raise RuntimeError(f"Login failed: {response.status_code}")
+            player_id = response.json().get("data", {}).get("user", {}).get("id")
+            result = bulk.run_bulk(client, player_id, args.task_counts, args.p_levels, args.moves, args.queries)
+        except Exception as e:
+            print(f"❌ Reorder benchmark aborted: {e}")
+            sys.exit(report.EXIT_FAILED)
+
+    for line in bulk.summary_lines(result):
+        print(line)
+    print()
+
+    steps = report.error_steps(recorder, args.max_error_rate)
+    message = None if result.verified else f"{result.p_levels[0]} list not in the written order"
+    steps.append(report.StepResult("Reordered list read back in order", PASSED if result.verified else FAILED,
+                                   message, 0.0))
+    finish(args, 'reorder', result.elapsed, steps, recorder, bulk.to_dict(result))
+
+
+def check_main(args):
+    print("=" * 60)
+    print("P-System API Testing")
+    print("=" * 60)
+    print()
+
+    recorder = Recorder()
+    steps = []
+    started = time.perf_counter()
+    with client_from_args(args, recorder=recorder) as client:
+        player_id = run_step(steps, "Login", login, client)
+        if steps[-1].status == PASSED:
+            run_step(steps, "List technique tasks", list_tasks, client)
+            task_id = run_step(steps, "Create P3.0 task", create_task, client, player_id)
+            run_step(steps, "Filter tasks by P-level", tasks_by_p_level, client, player_id)
+            if task_id:
+                run_step(steps, "Update priority order", update_priority, client, task_id)
+                run_step(steps, "Get task details", task_details, client, task_id)
+                run_step(steps, "Add drill", add_drill, client, task_id)
+            else:
+                skip_steps(steps, STEPS_AFTER_CREATE, "no task created")
+        else:
+            skip_steps(steps, STEPS_AFTER_LOGIN + STEPS_AFTER_CREATE, "login failed")
+    elapsed = time.perf_counter() - started
+
+    failed = sum(1 for step in steps if step.status == FAILED)
+    print("=" * 60)
+    if failed:
+        print(f"❌ P-System API Testing Failed: {failed} of {len(steps)} steps")
+    else:
+        print("✅ P-System API Testing Complete!")
+    print("=" * 60)
+    print()
+    print(f"⏱️  Timings ({recorder.requests} requests in {elapsed:.2f}s, medians):")
+    for line in recorder.timing_lines():
+        print(line)
+    print()
+    finish(args, 'check', elapsed, steps, recorder)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    server = mockserver.server_from_args(args)
+    if server is not None:
+        args.api_base = server.api_base
+        print(f"🧪 Mock API on {server.api_base}")
+        print()
+
+    try:
+        if args.load:
+            load_main(args)
+        elif args.reorder:
+            reorder_main(args)
+        else:
+            check_main(args)
+    finally:
+        if server is not None:
+            server.stop()
+            print(f"🧪 Mock API: {server.summary()}")
+
 
-print("=" * 60)
-print("✅ P-System API Testing Complete!")
-print("=" * 60)
-print()
-print("Summary:")
-print("  ✓ Migration deployed successfully")
-print("  ✓ Database schema updated")
-print("  ✓ P-System endpoints working")
-print("  ✓ Create, read, update operations functional")
-print("  ✓ P-level filtering working")
-print("  ✓ Drill assignment working")
-print()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+P-System API check helpers
+Shared HTTP client for the p-system-api.test.py script
+"""
@@ -0,0 +1,285 @@
+"""
+Bulk task seeding and priority reordering benchmark
+
+Grows the demo player's technique plan in stages (--task-counts, spread
+round-robin over --p-levels) and at every stage measures:
+
+- GET tasks/by-p-level for every level (--queries each), to see whether
+  the filtered query stays fast as the plan grows;
+- drag-and-drop reorders of the first level's list (--moves seeded random
+  moves), each written three ways:
+
+  single   PATCH only the moved task (what TechnicalPlanView does today;
+           the other tasks keep stale priorityOrder values)
+  shifted  PATCH every task between the old and new position
+  rewrite  PATCH every task in the list
+
+The per-move cost of shifted and rewrite is what a batch reorder endpoint
+would save. After the rewrite pass the list is read back and checked
+against the expected order.
+
+Seeding creates real tasks: run with --mock or against a disposable stack.
+"""
+
+import argparse
+import random
+import time
+from collections import namedtuple
+
+from psystem import client as api
+from psystem.client import P_LEVEL, TECHNICAL_AREAS
+from psystem.stats import percentile
+
+DEFAULT_TASK_COUNTS = (100, 500, 1000)
+DEFAULT_P_LEVELS = ('P1.0', 'P2.0', 'P3.0', 'P4.0', 'P5.0')
+DEFAULT_MOVES = 10
+DEFAULT_QUERIES = 5
+MOVES_SEED = 1
+
+SINGLE = 'single'
+SHIFTED = 'shifted'
+REWRITE = 'rewrite'
+STRATEGIES = (SINGLE, SHIFTED, REWRITE)
+
+# One reorder; seconds is the wall time of all its PATCHes
+Move = namedtuple('Move', 'seconds requests failed')
+# Per stage: tasks per player, size of the reordered list, by-p-level
+# latencies (seconds) and the Moves of each strategy
+Stage = namedtuple('Stage', 'tasks list_size seed_seconds query_seconds moves')
+BulkResult = namedtuple('BulkResult', 'recorder elapsed p_levels stages verified')
+
+
+def _counts(text):
+    """argparse type for --task-counts"""
+    try:
+        counts = [int(value) for value in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid task counts '{text}' (expected N[,N...])") from None
+    if any(count < 1 for count in counts) or counts != sorted(set(counts)):
+        raise argparse.ArgumentTypeError(f"task counts must be positive and increasing, got '{text}'")
+    return counts
+
+
+def _positive(text):
+    """argparse type for counts that must be at least 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count '{text}'") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def _non_negative(text):
+    """argparse type for counts that may be 0"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count '{text}'") from None
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {value}")
+    return value
+
+
+def _levels(text):
+    """argparse type for --p-levels"""
+    levels = text.split(',')
+    invalid = [level for level in levels if not P_LEVEL.match(level)]
+    if invalid or len(set(levels)) != len(levels):
+        raise argparse.ArgumentTypeError(f"invalid P-levels '{text}' (expected distinct P1.0-P10.0)")
+    return levels
+
+
+def add_bulk_arguments(parser):
+    """Add the --reorder benchmark options to an argparse parser"""
+    group = parser.add_argument_group('reorder benchmark')
+    group.add_argument('--reorder', action='store_true',
+                       help="seed large task lists and time P-level queries and reorders as they grow")
+    group.add_argument('--task-counts', type=_counts, default=list(DEFAULT_TASK_COUNTS), metavar='N[,N...]',
+                       help=f"tasks per player at each stage (default: {','.join(map(str, DEFAULT_TASK_COUNTS))})")
+    group.add_argument('--p-levels', type=_levels, default=list(DEFAULT_P_LEVELS),
+                       metavar='LEVEL[,LEVEL...]',
+                       help=f"P-levels to spread tasks over (default: {DEFAULT_P_LEVELS[0]}-{DEFAULT_P_LEVELS[-1]})")
+    group.add_argument('--moves', type=_non_negative, default=DEFAULT_MOVES,
+                       help=f"reorders per strategy and stage (default: {DEFAULT_MOVES})")
+    group.add_argument('--queries', type=_positive, default=DEFAULT_QUERIES,
+                       help=f"by-p-level queries per level and stage (default: {DEFAULT_QUERIES})")
+    return group
+
+
+def staged(endpoint, tasks):
+    """Endpoint label for one stage, e.g. 'GET /technique-plan/tasks/by-p-level [500 tasks]'"""
+    return f"{endpoint} [{tasks} tasks]"
+
+
+def _ok(response):
+    return response.status_code < 400
+
+
+def seed_tasks(client, player_id, p_levels, lists, start, stop, label):
+    """Create tasks start..stop-1 round-robin over p_levels, appending their IDs to lists"""
+    for index in range(start, stop):
+        p_level = p_levels[index % len(p_levels)]
+        response = client.post('/technique-plan/tasks', endpoint=label, json={
+            'playerId': player_id,
+            'title': f"Bulk {p_level} task {index + 1}",
+            'description': "Created by the P-System reorder benchmark",
+            'technicalArea': TECHNICAL_AREAS[index % len(TECHNICAL_AREAS)],
+            'pLevel': p_level,
+            'repetitions': 10,
+            'priorityOrder': len(lists[p_level]) + 1,
+        })
+        if response.status_code != 201:
+            raise RuntimeError(f"Seeding failed at task {index + 1}: HTTP {response.status_code}")
+        lists[p_level].append(response.json()['data']['id'])
+
+
+def query_levels(client, player_id, p_levels, queries, label):
+    """Latencies (seconds) of queries by-p-level calls per level"""
+    seconds = []
+    for _ in range(queries):
+        for p_level in p_levels:
+            started = time.perf_counter()
+            client.get('/technique-plan/tasks/by-p-level', endpoint=label,
+                       params={'playerId': player_id, 'pLevel': p_level})
+            seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def _writes(strategy, order, old, new):
+    """(task ID, priorityOrder) PATCHes for moving order[old] to new; order is already moved"""
+    if strategy == SINGLE:
+        return [(order[new], new + 1)]
+    if strategy == SHIFTED:
+        low, high = min(old, new), max(old, new)
+        return [(order[index], index + 1) for index in range(low, high + 1)]
+    return [(task_id, index + 1) for index, task_id in enumerate(order)]
+
+
+def reorder(client, order, moves, strategy, label):
+    """Apply moves ((old, new) index pairs) to order in place, writing each with strategy"""
+    results = []
+    for old, new in moves:
+        order.insert(new, order.pop(old))
+        writes = _writes(strategy, order, old, new)
+        failed = 0
+        started = time.perf_counter()
+        for task_id, priority_order in writes:
+            response = client.patch(f'/technique-plan/tasks/{task_id}/priority', endpoint=label,
+                                    json={'priorityOrder': priority_order})
+            failed += not _ok(response)
+        results.append(Move(time.perf_counter() - started, len(writes), failed))
+    return results
+
+
+def random_moves(size, count, seed=MOVES_SEED):
+    """count (old, new) index pairs within a list of size, old != new"""
+    rng = random.Random(seed)
+    moves = []
+    for _ in range(count if size > 1 else 0):
+        old = rng.randrange(size)
+        new = rng.randrange(size - 1)
+        moves.append((old, new if new < old else new + 1))
+    return moves
+
+
+def verify_order(client, player_id, p_level, order):
+    """True if by-p-level returns the tasks of order in that order (ignoring other tasks)"""
+    response = client.get('/technique-plan/tasks/by-p-level', endpoint=api.TASKS_BY_P_LEVEL,
+                          params={'playerId': player_id, 'pLevel': p_level})
+    if not _ok(response):
+        return False
+    ours = set(order)
+    return [task.get('id') for task in response.json().get('data', []) if task.get('id') in ours] == order
+
+
+def run_bulk(client, player_id, task_counts=DEFAULT_TASK_COUNTS, p_levels=DEFAULT_P_LEVELS, moves=DEFAULT_MOVES,
+             queries=DEFAULT_QUERIES):
+    """
+    Run the benchmark with a logged-in client (whose recorder collects the
+    per-request timings) and return a BulkResult.
+    """
+    lists = {p_level: [] for p_level in p_levels}
+    reordered = p_levels[0]
+    stages = []
+    started = time.perf_counter()
+
+    seeded = 0
+    for tasks in task_counts:
+        seed_started = time.perf_counter()
+        seed_tasks(client, player_id, p_levels, lists, seeded, tasks, staged(api.CREATE_TASK, tasks))
+        seed_seconds = time.perf_counter() - seed_started
+        seeded = tasks
+
+        query_seconds = query_levels(client, player_id, p_levels, queries, staged(api.TASKS_BY_P_LEVEL, tasks))
+
+        order = lists[reordered]
+        stage_moves = random_moves(len(order), moves)
+        label = staged(api.UPDATE_PRIORITY, tasks)
+        results = {strategy: reorder(client, order, stage_moves, strategy, label) for strategy in STRATEGIES}
+        stages.append(Stage(tasks, len(order), seed_seconds, query_seconds, results))
+
+    verified = verify_order(client, player_id, reordered, lists[reordered])
+    return BulkResult(client.recorder, time.perf_counter() - started, list(p_levels), stages, verified)
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def _ms_text(seconds):
+    """Milliseconds for the text tables; 'n/a' where _ms() gives None"""
+    return 'n/a' if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def move_stats(moves):
+    """(mean requests, p50 seconds, p95 seconds, failed requests) of a strategy's moves"""
+    ordered = sorted(move.seconds for move in moves)
+    requests = sum(move.requests for move in moves) / len(moves) if moves else 0.0
+    return (requests, percentile(ordered, 0.5), percentile(ordered, 0.95),
+            sum(move.failed for move in moves))
+
+
+def to_dict(result):
+    """JSON-friendly stages, times in milliseconds"""
+    stages = []
+    for stage in result.stages:
+        ordered = sorted(stage.query_seconds)
+        reorders = {}
+        for strategy, moves in stage.moves.items():
+            requests, p50, p95, failed = move_stats(moves)
+            reorders[strategy] = {'moves': len(moves), 'requests_per_move': round(requests, 2),
+                                  'p50_ms': _ms(p50), 'p95_ms': _ms(p95), 'failed_requests': failed}
+        stages.append({
+            'tasks': stage.tasks,
+            'list_size': stage.list_size,
+            'seed_s': round(stage.seed_seconds, 3),
+            'by_p_level': {'queries': len(ordered), 'p50_ms': _ms(percentile(ordered, 0.5)),
+                           'p95_ms': _ms(percentile(ordered, 0.95))},
+            'reorder': reorders,
+        })
+    return {'p_levels': result.p_levels, 'stages': stages, 'order_verified': result.verified}
+
+
+def summary_lines(result):
+    """Human-readable tables of query and reorder cost per stage"""
+    lines = [f"🔎 by-p-level ({len(result.p_levels)} levels)",
+             f"   {'tasks':>6}  {'per level':>9}  {'p50 ms':>8}  {'p95 ms':>8}"]
+    for stage in result.stages:
+        ordered = sorted(stage.query_seconds)
+        lines.append(f"   {stage.tasks:>6}  {stage.tasks // len(result.p_levels):>9}  "
+                     f"{_ms_text(percentile(ordered, 0.5)):>8}  {_ms_text(percentile(ordered, 0.95)):>8}")
+
+    lines += ["", f"🔀 Reorder cost per move ({result.p_levels[0]} list)",
+              f"   {'tasks':>6}  {'list':>5}  {'strategy':<8}  {'reqs/move':>9}  {'p50 ms':>8}  {'p95 ms':>8}  "
+              f"{'failed':>6}"]
+    for stage in result.stages:
+        for strategy in STRATEGIES:
+            moves = stage.moves[strategy]
+            if not moves:
+                continue
+            requests, p50, p95, failed = move_stats(moves)
+            lines.append(f"   {stage.tasks:>6}  {stage.list_size:>5}  {strategy:<8}  {requests:>9.1f}  "
+                         f"{_ms_text(p50):>8}  {_ms_text(p95):>8}  {failed:>6}")
+    return lines
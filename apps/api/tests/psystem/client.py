@@ -0,0 +1,234 @@
+"""
+HTTP client for the P-System API checks
+
+All calls go through one requests.Session, whose connection pool keeps
+connections to the API alive between calls, so a run pays the TCP (and
+TLS) handshake once rather than once per request. Every call has a connect
+and a read timeout, so a hung endpoint fails its own step instead of
+stalling the run. Connection failures (and 502/503/504 on GETs) are
+retried a few times with backoff.
+
+With a recorder, every request is reported as a Sample: total time, time
+to the response headers (TTFB, counted from the start of the request) and,
+when the request had to open a connection, the DNS, TCP connect and TLS
+phases of that connection (None on a reused keep-alive connection).
+
+The API base defaults to the local stack and can be set with --api-base
+or $PSYSTEM_API_BASE.
+"""
+
+import os
+import re
+import socket
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+API_BASE_ENV = 'PSYSTEM_API_BASE'
+DEFAULT_API_BASE = 'http://localhost:4000/api/v1'
+
+DEMO_EMAIL = 'player@demo.com'
+DEMO_PASSWORD = 'player123'
+
+# Seconds; slightly above a multiple of 3, the TCP retransmission window
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = (502, 503, 504)
+
+# Task fields the API validates (see technique-plan/schema.ts)
+P_LEVEL = re.compile(r'^P([1-9]|10)\.0$')
+TECHNICAL_AREAS = ('swing', 'putting', 'chipping', 'pitching', 'bunker', 'driving', 'irons', 'wedges',
+                   'mental', 'other')
+
+# Endpoint labels for timing: method plus path template
+LOGIN = 'POST /auth/login'
+LIST_TASKS = 'GET /technique-plan/tasks'
+CREATE_TASK = 'POST /technique-plan/tasks'
+TASKS_BY_P_LEVEL = 'GET /technique-plan/tasks/by-p-level'
+UPDATE_PRIORITY = 'PATCH /technique-plan/tasks/{id}/priority'
+TASK_FULL = 'GET /technique-plan/tasks/{id}/full'
+LIST_EXERCISES = 'GET /exercises'
+ADD_DRILL = 'POST /technique-plan/tasks/{id}/drills'
+
+# One timed request; times in seconds, status None and error set if no response arrived
+Sample = namedtuple('Sample', 'endpoint status ok seconds ttfb dns connect tls error')
+
+# Setup phases of the connection opened by this thread's current request
+_phases = threading.local()
+
+
+class _TimedConnection:
+    """Connection mixin recording DNS, TCP connect and TLS time in _phases"""
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _phases.setup = time.perf_counter() - started
+
+    def _new_conn(self):
+        # Resolve once up front to time DNS; the pool's own lookup right
+        # after is answered from the resolver cache or hosts file
+        started = time.perf_counter()
+        try:
+            socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            pass  # reported by the real connect below
+        resolved = time.perf_counter()
+        sock = super()._new_conn()
+        _phases.dns = resolved - started
+        _phases.connect = time.perf_counter() - resolved
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+def _connection_phases():
+    """(dns, connect, tls) of the connection the last request opened, or Nones"""
+    phases = vars(_phases)
+    if 'connect' not in phases:
+        return None, None, None
+    tls = phases.get('setup', 0.0) - phases['dns'] - phases['connect']
+    return phases['dns'], phases['connect'], tls if tls > 0.0005 else None
+
+
+def resolve_api_base(api_base=None):
+    """api_base, else $PSYSTEM_API_BASE, else the local stack; without a trailing slash"""
+    return (api_base or os.environ.get(API_BASE_ENV) or DEFAULT_API_BASE).rstrip('/')
+
+
+def add_client_arguments(parser):
+    """Add the shared --api-base / timeout / retry options to an argparse parser"""
+    group = parser.add_argument_group('API client')
+    group.add_argument('--api-base', default=None,
+                       help=f"API base URL (default: ${API_BASE_ENV} or {DEFAULT_API_BASE})")
+    group.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                       help=f"seconds to wait for a connection (default: {DEFAULT_CONNECT_TIMEOUT})")
+    group.add_argument('--timeout', dest='read_timeout', type=float, default=DEFAULT_READ_TIMEOUT,
+                       help=f"seconds to wait for a response (default: {DEFAULT_READ_TIMEOUT})")
+    group.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                       help=f"retries for failed connections and 502/503/504 GETs (default: {DEFAULT_RETRIES})")
+    return group
+
+
+class APIClient:
+    """
+    Pooled, keep-alive session against one API base URL.
+
+    recorder, if given, is called with a Sample after every request;
+    endpoint is the label passed to request() (default: method and path),
+    ok is False for exceptions and 4xx/5xx responses.
+    """
+
+    def __init__(self, api_base=None, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+                 recorder=None):
+        self.api_base = resolve_api_base(api_base)
+        self.timeout = (connect_timeout, read_timeout)
+        self.recorder = recorder
+
+        # Connection errors are retried for every method (nothing was sent);
+        # error statuses only for GETs, which are safe to repeat
+        retry = Retry(
+            total=retries, connect=retries, read=0, status=retries,
+            backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET'}), raise_on_status=False,
+        )
+        adapter = _TimedAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path):
+        return f"{self.api_base}/{path.lstrip('/')}"
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        if self.recorder is None:
+            return self.session.request(method, self.url(path), **kwargs)
+
+        vars(_phases).clear()
+        started = time.perf_counter()
+        response, error = None, None
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+            return response
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.recorder(Sample(
+                endpoint or f"{method} {path}",
+                response.status_code if response is not None else None,
+                response is not None and response.status_code < 400,
+                seconds,
+                response.elapsed.total_seconds() if response is not None else None,
+                *_connection_phases(),
+                error,
+            ))
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+
+    def login(self, email=DEMO_EMAIL, password=DEMO_PASSWORD):
+        """POST /auth/login; on success later calls send the access token"""
+        response = self.post('/auth/login', endpoint=LOGIN, json={'email': email, 'password': password})
+        if response.status_code == 200:
+            token = response.json().get('data', {}).get('accessToken')
+            if token:
+                self.session.headers['Authorization'] = f"Bearer {token}"
+        return response
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def client_from_args(args, pool_size=DEFAULT_POOL_SIZE, recorder=None):
+    return APIClient(
+        api_base=args.api_base, connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+        pool_size=pool_size, retries=args.retries, recorder=recorder,
+    )
@@ -0,0 +1,157 @@
+"""
+Concurrent load mode for the technique-plan endpoints
+
+Replays the check flow (list tasks, create task, filter by P-level, patch
+priority, get full, add drill) with N virtual players on a thread pool.
+Each player logs in once on its own keep-alive session and then runs the
+flow repeatedly until the duration is up; a shared Pacer spaces flow
+starts to --rate flows per second across all players (0: as fast as the
+players can go). Every request is timed per endpoint (see psystem.stats).
+
+Flows create real tasks and drills: run against a local or disposable
+stack, not production.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from psystem import client as api
+from psystem.stats import Recorder
+
+DEFAULT_PLAYERS = 10
+DEFAULT_RATE = 0.0
+DEFAULT_DURATION = 30.0
+
+LOAD_TASK = {
+    "title": "Load test: P3.0 Top of Backswing",
+    "description": "Created by the P-System load mode",
+    "pLevel": "P3.0",
+    "repetitions": 50,
+    "priorityOrder": 1,
+    "technicalArea": "swing",
+    "priority": "high",
+}
+
+# Outcome of a run; flows counts started flows, failed those that raised
+LoadResult = namedtuple('LoadResult', 'recorder elapsed players flows failed')
+
+
+def add_load_arguments(parser):
+    """Add the --load options to an argparse parser"""
+    group = parser.add_argument_group('load mode')
+    group.add_argument('--load', action='store_true',
+                       help="replay the flow concurrently and report throughput and latency per endpoint")
+    group.add_argument('--players', type=int, default=DEFAULT_PLAYERS,
+                       help=f"virtual players, each on its own session (default: {DEFAULT_PLAYERS})")
+    group.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                       help="flow starts per second across all players (default: 0, unthrottled)")
+    group.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                       help=f"seconds to keep starting flows (default: {DEFAULT_DURATION:g})")
+    return group
+
+
+class Pacer:
+    """Hands out flow start times rate per second until deadline"""
+
+    def __init__(self, rate, deadline):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.deadline = deadline
+        self._next = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Sleep until the next start slot; False once the deadline has passed"""
+        with self._lock:
+            start = max(self._next, time.perf_counter())
+            self._next = start + self.interval
+        if start >= self.deadline:
+            return False
+        time.sleep(max(0.0, start - time.perf_counter()))
+        return True
+
+    def stop(self):
+        """Make every later wait() return False"""
+        self.deadline = float('-inf')
+
+
+def run_flow(client, player_id):
+    """One pass over the technique-plan flow; returns the created task ID or None"""
+    client.get('/technique-plan/tasks', endpoint=api.LIST_TASKS, params={'limit': 5})
+
+    response = client.post('/technique-plan/tasks', endpoint=api.CREATE_TASK,
+                           json=dict(LOAD_TASK, playerId=player_id))
+    task_id = response.json().get('data', {}).get('id') if response.status_code == 201 else None
+
+    client.get('/technique-plan/tasks/by-p-level', endpoint=api.TASKS_BY_P_LEVEL,
+               params={'playerId': player_id, 'pLevel': 'P3.0'})
+    if not task_id:
+        return None
+
+    client.patch(f'/technique-plan/tasks/{task_id}/priority', endpoint=api.UPDATE_PRIORITY,
+                 json={'priorityOrder': 5})
+    client.get(f'/technique-plan/tasks/{task_id}/full', endpoint=api.TASK_FULL)
+
+    response = client.get('/exercises', endpoint=api.LIST_EXERCISES, params={'limit': 1})
+    exercises = response.json().get('data', {}) if response.status_code == 200 else []
+    if isinstance(exercises, dict):
+        exercises = exercises.get('exercises', [])
+    if exercises:
+        client.post(f'/technique-plan/tasks/{task_id}/drills', endpoint=api.ADD_DRILL,
+                    json={'exerciseId': exercises[0].get('id'), 'orderIndex': 0, 'notes': 'Load test'})
+    return task_id
+
+
+def _player(make_client, pacer, counts, lock):
+    with make_client() as client:
+        try:
+            response = client.login()
+        except Exception:
+            pacer.stop()
+            raise
+        if response.status_code != 200:
+            pacer.stop()
+            raise RuntimeError(f"Login failed: {response.status_code}")
+        player_id = response.json().get('data', {}).get('user', {}).get('id')
+
+        while pacer.wait():
+            with lock:
+                counts['flows'] += 1
+            try:
+                run_flow(client, player_id)
+            except Exception:
+                # Already recorded per request; keep the player going
+                with lock:
+                    counts['failed'] += 1
+
+
+def run_load(make_client, players=DEFAULT_PLAYERS, rate=DEFAULT_RATE, duration=DEFAULT_DURATION):
+    """
+    Run the flow with players virtual players for duration seconds.
+
+    make_client(recorder) returns a new APIClient reporting to recorder.
+    If a player cannot log in, the run stops and that error is raised.
+    """
+    recorder = Recorder()
+    counts, lock = {'flows': 0, 'failed': 0}, threading.Lock()
+    started = time.perf_counter()
+    pacer = Pacer(rate, started + duration)
+
+    with ThreadPoolExecutor(max_workers=players, thread_name_prefix='player') as pool:
+        futures = [pool.submit(_player, lambda: make_client(recorder), pacer, counts, lock)
+                   for _ in range(players)]
+        for future in futures:
+            future.result()
+
+    return LoadResult(recorder, time.perf_counter() - started, players, counts['flows'], counts['failed'])
+
+
+def summary_lines(result):
+    """Human-readable load run summary"""
+    lines = [
+        f"👥 {result.players} players, {result.flows} flows ({result.failed} failed) "
+        f"in {result.elapsed:.1f}s → {result.recorder.requests / result.elapsed:.1f} req/s",
+        "",
+    ]
+    return lines + result.recorder.summary_lines(result.elapsed)
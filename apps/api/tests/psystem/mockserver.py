@@ -0,0 +1,470 @@
+"""
+Stand-in P-System API for offline, deterministic runs
+
+Serves the endpoints the checks call (/auth/login, /technique-plan/tasks,
+tasks/by-p-level, tasks/{id}/priority, tasks/{id}/full, tasks/{id}/drills,
+/exercises) from an in-memory store, with the real API's response shapes,
+so the client harness can be exercised without the Node API or a database:
+
+    cd apps/api/tests
+    python3 -m psystem.mockserver --port 4000 --latency-ms 20 --error-rate 0.05
+    python3 p-system-api.test.py --mock --mock-latency-ms 20     # in-process
+
+Every request can be delayed by --latency-ms plus up to --jitter-ms, and
+--error-rate of them (never logins) answered with --error-status instead;
+503, the default, is retried by the client on GETs. Delays, failures and
+IDs come from one seeded generator, so a sequential run is repeatable.
+Connections are HTTP/1.1 keep-alive, and each response goes out in a
+single write.
+"""
+
+import argparse
+import datetime
+import json
+import random
+import re
+import signal
+import sys
+import threading
+import time
+import traceback
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from psystem.client import API_BASE_ENV, DEMO_EMAIL, DEMO_PASSWORD, P_LEVEL, TECHNICAL_AREAS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 4000
+API_PREFIX = '/api/v1'
+DEFAULT_SEED = 1
+DEFAULT_ERROR_STATUS = 503
+
+EXERCISES = (
+    ('Mirror Work: Top of Backswing', 'technique'),
+    ('Alignment Stick Gate Drill', 'technique'),
+    ('Pause at the Top', 'technique'),
+    ('Step-Through Drill', 'movement'),
+    ('Lead Arm Only Swings', 'technique'),
+)
+
+
+class Faults:
+    """Injected latency and errors, drawn from one seeded generator"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_status=DEFAULT_ERROR_STATUS,
+                 seed=DEFAULT_SEED):
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError(f"Error rate must be between 0 and 1, got {error_rate}")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """(delay in seconds, whether to fail) for the next request"""
+        with self._lock:
+            jitter = self._random.uniform(0.0, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        return (self.latency_ms + jitter) / 1000, fail
+
+
+class MockStore:
+    """Players, tasks, drills and exercises behind one lock"""
+
+    def __init__(self, seed=DEFAULT_SEED):
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.player = {'id': self._new_id(), 'firstName': 'Demo', 'lastName': 'Player'}
+        self.user = {'id': self.player['id'], 'email': DEMO_EMAIL, 'firstName': 'Demo', 'lastName': 'Player',
+                     'role': 'player', 'tenantId': self._new_id(), 'onboardingComplete': True}
+        self.tokens = {}
+        self.tasks = {}
+        # Task IDs per player, in creation order
+        self.player_tasks = {self.player['id']: []}
+        self.exercises = [
+            {'id': self._new_id(), 'name': name, 'description': f"{name} for the P-System", 'exerciseType': kind}
+            for name, kind in EXERCISES
+        ]
+
+    def _new_id(self):
+        return str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+
+    def login(self, email, password):
+        """Login response data, or None for unknown credentials"""
+        if (email, password) != (DEMO_EMAIL, DEMO_PASSWORD):
+            return None
+        with self._lock:
+            token = uuid.UUID(int=self._random.getrandbits(128), version=4).hex * 2
+            self.tokens[token] = self.user
+        return {'accessToken': token, 'refreshToken': token[::-1], 'expiresIn': 900, 'user': self.user}
+
+    def create_task(self, fields):
+        now = _timestamp()
+        with self._lock:
+            self._sequence += 1
+            task = {
+                'id': self._new_id(),
+                'playerId': fields['playerId'],
+                'title': fields['title'],
+                'description': fields['description'],
+                'technicalArea': fields['technicalArea'],
+                'priority': fields.get('priority', 'medium'),
+                'status': 'pending',
+                'pLevel': fields.get('pLevel'),
+                'repetitions': fields.get('repetitions', 0),
+                'priorityOrder': fields.get('priorityOrder', 0),
+                'createdAt': now,
+                'updatedAt': now,
+                '_sequence': self._sequence,
+                '_drills': [],
+            }
+            self.tasks[task['id']] = task
+            self.player_tasks.setdefault(task['playerId'], []).append(task['id'])
+        return task
+
+    def _player_tasks(self, player_id, p_level=None):
+        with self._lock:
+            tasks = [self.tasks[task_id] for task_id in self.player_tasks.get(player_id, ())]
+        if p_level is not None:
+            tasks = [task for task in tasks if task['pLevel'] == p_level]
+        # The API orders by priorityOrder, newest first among equals
+        return sorted(tasks, key=lambda task: (task['priorityOrder'], -task['_sequence']))
+
+    def list_tasks(self, player_id, limit, offset):
+        tasks = self._player_tasks(player_id)
+        return tasks[offset:offset + limit], len(tasks)
+
+    def tasks_by_p_level(self, player_id, p_level):
+        return self._player_tasks(player_id, p_level)
+
+    def update_priority(self, task_id, priority_order):
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                task['priorityOrder'] = priority_order
+                task['updatedAt'] = _timestamp()
+        return task
+
+    def add_drill(self, task_id, exercise_id, order_index, notes):
+        """The new drill; None if the task is unknown, False if the exercise is"""
+        exercise = next((exercise for exercise in self.exercises if exercise['id'] == exercise_id), None)
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return None
+            if exercise is None:
+                return False
+            drill = {'id': self._new_id(), 'taskId': task_id, 'exerciseId': exercise_id,
+                     'orderIndex': order_index, 'notes': notes, 'exercise': exercise}
+            task['_drills'].append(drill)
+        return drill
+
+    def task_view(self, task, player=False):
+        """Public fields of task with its drills and responsible persons"""
+        view = {key: value for key, value in task.items() if not key.startswith('_')}
+        view['drills'] = sorted(task['_drills'], key=lambda drill: drill['orderIndex'])
+        view['responsible'] = []
+        if player:
+            view['player'] = self.player
+        return view
+
+
+def _timestamp():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _query_int(query, name, default):
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        raise _Reject(400, f"{name} must be an integer") from None
+
+
+class _Reject(Exception):
+    """Abort a request with an error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Buffer the status line, headers and body into one send; two small
+    # writes would stall on Nagle's algorithm and delayed ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    ROUTES = (
+        ('POST', re.compile(r'/auth/login'), 'login'),
+        ('GET', re.compile(r'/technique-plan/tasks'), 'list_tasks'),
+        ('POST', re.compile(r'/technique-plan/tasks'), 'create_task'),
+        ('GET', re.compile(r'/technique-plan/tasks/by-p-level'), 'tasks_by_p_level'),
+        ('PATCH', re.compile(r'/technique-plan/tasks/(?P<id>[^/]+)/priority'), 'update_priority'),
+        ('GET', re.compile(r'/technique-plan/tasks/(?P<id>[^/]+)/full'), 'task_full'),
+        ('POST', re.compile(r'/technique-plan/tasks/(?P<id>[^/]+)/drills'), 'add_drill'),
+        ('GET', re.compile(r'/exercises/?'), 'list_exercises'),
+    )
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def _dispatch(self, method):
+        self.server.count('requests')
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        delay, fail = self.server.faults.draw()
+        if delay:
+            time.sleep(delay)
+
+        path = url.path
+        if path.startswith(API_PREFIX):
+            path = path[len(API_PREFIX):]
+        route = next(((name, match) for verb, pattern, name in self.ROUTES
+                      if verb == method and (match := pattern.fullmatch(path))), None)
+        if route is None:
+            self._send(404, {'success': False, 'error': f"Route {method}:{url.path} not found"})
+            return
+        name, match = route
+
+        if fail and name != 'login':
+            self.server.count('injected_errors')
+            self._send(self.server.faults.error_status, {'success': False, 'error': 'Injected failure'})
+            return
+
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                raise _Reject(400, 'JSON body must be an object')
+            if name != 'login':
+                self._authenticate()
+            status, payload = getattr(self, f'_{name}')(body, parse_qs(url.query), **match.groupdict())
+        except json.JSONDecodeError:
+            status, payload = 400, {'success': False, 'error': 'Invalid JSON body'}
+        except _Reject as e:
+            status, payload = e.status, {'success': False, 'error': str(e)}
+        except Exception as e:
+            # A handler bug answers 500 like the real API instead of dropping the connection
+            self.log_error('%s', traceback.format_exc())
+            status, payload = 500, {'success': False, 'error': f"{type(e).__name__}: {e}"}
+        self._send(status, payload)
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authenticate(self):
+        scheme, _, token = self.headers.get('Authorization', '').partition(' ')
+        if scheme != 'Bearer' or token not in self.server.store.tokens:
+            raise _Reject(401, 'Authentication required')
+
+    def _login(self, body, query):
+        data = self.server.store.login(body.get('email'), body.get('password'))
+        if data is None:
+            raise _Reject(401, 'Invalid email or password')
+        return 200, {'success': True, 'data': data}
+
+    def _list_tasks(self, body, query):
+        store = self.server.store
+        limit, offset = _query_int(query, 'limit', 50), _query_int(query, 'offset', 0)
+        if not 1 <= limit <= 100 or offset < 0:
+            raise _Reject(400, 'limit must be 1-100 and offset at least 0')
+        tasks, total = store.list_tasks(store.player['id'], limit, offset)
+        return 200, {
+            'success': True,
+            'data': [store.task_view(task, player=True) for task in tasks],
+            'pagination': {'total': total, 'limit': limit, 'offset': offset},
+        }
+
+    def _create_task(self, body, query):
+        missing = [field for field in ('playerId', 'title', 'description', 'technicalArea') if not body.get(field)]
+        if missing:
+            raise _Reject(400, f"Missing required fields: {', '.join(missing)}")
+        if body['technicalArea'] not in TECHNICAL_AREAS:
+            raise _Reject(400, f"Invalid technicalArea '{body['technicalArea']}'")
+        if body.get('pLevel') is not None and not P_LEVEL.match(str(body['pLevel'])):
+            raise _Reject(400, f"Invalid pLevel '{body['pLevel']}'")
+        store = self.server.store
+        return 201, {'success': True, 'data': store.task_view(store.create_task(body), player=True)}
+
+    def _tasks_by_p_level(self, body, query):
+        store = self.server.store
+        player_id = query.get('playerId', [None])[0]
+        p_level = query.get('pLevel', [None])[0]
+        tasks = store.tasks_by_p_level(player_id, p_level)
+        return 200, {'success': True, 'data': [store.task_view(task) for task in tasks]}
+
+    def _update_priority(self, body, query, id):
+        priority_order = body.get('priorityOrder')
+        if not isinstance(priority_order, int) or priority_order < 0:
+            raise _Reject(400, 'priorityOrder must be a non-negative integer')
+        task = self.server.store.update_priority(id, priority_order)
+        if task is None:
+            raise _Reject(500, 'Task not found')
+        return 200, {'success': True, 'data': {key: value for key, value in task.items() if not key.startswith('_')}}
+
+    def _task_full(self, body, query, id):
+        store = self.server.store
+        task = store.tasks.get(id)
+        if task is None:
+            raise _Reject(404, 'Task not found')
+        return 200, {'success': True, 'data': store.task_view(task, player=True)}
+
+    def _add_drill(self, body, query, id):
+        drill = self.server.store.add_drill(id, body.get('exerciseId'), body.get('orderIndex', 0), body.get('notes'))
+        if drill is None:
+            raise _Reject(500, 'Task not found')
+        if drill is False:
+            raise _Reject(500, 'Exercise not found')
+        return 201, {'success': True, 'data': drill}
+
+    def _list_exercises(self, body, query):
+        exercises = self.server.store.exercises
+        limit, offset = _query_int(query, 'limit', 20), _query_int(query, 'offset', 0)
+        return 200, {'success': True, 'data': {
+            'exercises': exercises[offset:offset + limit],
+            'pagination': {'total': len(exercises), 'limit': limit, 'offset': offset},
+        }}
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded mock API; port 0 picks a free port (see api_base)"""
+
+    daemon_threads = True
+
+    def __init__(self, host=DEFAULT_HOST, port=0, faults=None, seed=DEFAULT_SEED, verbose=False):
+        super().__init__((host, port), MockHandler)
+        self.store = MockStore(seed)
+        self.faults = faults or Faults(seed=seed)
+        self.verbose = verbose
+        self.counts = {'connections': 0, 'requests': 0, 'injected_errors': 0}
+        self._counts_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def api_base(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def count(self, name):
+        with self._counts_lock:
+            self.counts[name] += 1
+
+    def start(self):
+        """Serve from a daemon thread; returns self"""
+        self._thread = threading.Thread(target=self.serve_forever, name='mock-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self.stop()
+        else:
+            self.server_close()
+
+    def summary(self):
+        return (f"{self.counts['requests']} requests on {self.counts['connections']} connections, "
+                f"{self.counts['injected_errors']} injected errors")
+
+
+def _rate(text):
+    """argparse type for --error-rate"""
+    value = float(text)
+    if not 0.0 <= value <= 1.0:
+        raise argparse.ArgumentTypeError(f"error rate must be between 0 and 1, got {text}")
+    return value
+
+
+def add_fault_arguments(parser, prefix=''):
+    """Add the latency / error injection options, named --{prefix}latency-ms etc."""
+    parser.add_argument(f'--{prefix}latency-ms', type=float, default=0.0,
+                        help="delay added to every request (default: 0)")
+    parser.add_argument(f'--{prefix}jitter-ms', type=float, default=0.0,
+                        help="random extra delay, up to this much (default: 0)")
+    parser.add_argument(f'--{prefix}error-rate', type=_rate, default=0.0,
+                        help="share of requests (other than logins) answered with an error (default: 0)")
+    parser.add_argument(f'--{prefix}error-status', type=int, default=DEFAULT_ERROR_STATUS,
+                        help=f"status of injected errors (default: {DEFAULT_ERROR_STATUS})")
+    parser.add_argument(f'--{prefix}seed', type=int, default=DEFAULT_SEED,
+                        help=f"seed for delays, errors and IDs (default: {DEFAULT_SEED})")
+
+
+def add_mock_arguments(parser):
+    """Add --mock and its fault options to the check script's parser"""
+    group = parser.add_argument_group('mock API')
+    group.add_argument('--mock', action='store_true',
+                       help="run against an in-process mock API instead of --api-base")
+    add_fault_arguments(group, prefix='mock-')
+    return group
+
+
+def _faults(args, prefix):
+    options = [getattr(args, f"{prefix}{name}") for name in ('latency_ms', 'jitter_ms', 'error_rate', 'error_status',
+                                                             'seed')]
+    return Faults(*options)
+
+
+def server_from_args(args):
+    """Started MockServer on a free port if --mock was given, else None"""
+    if not args.mock:
+        return None
+    return MockServer(faults=_faults(args, 'mock_'), seed=args.mock_seed).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock P-System API for offline testing.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port, 0 for any (default: {DEFAULT_PORT})")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        server = MockServer(args.host, args.port, _faults(args, ''), args.seed, args.verbose)
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"🟢 Mock P-System API on {server.api_base} (export {API_BASE_ENV}={server.api_base})",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"🛑 {server.summary()}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Machine-readable results and latency budgets for the P-System checks
+
+--json writes the run (steps, per-endpoint percentiles, phase timings and
+latency histograms, budget breaches) as one JSON document; --junit writes
+the same outcome as JUnit XML, one test case per check step (or, in load
+and reorder mode, per endpoint) plus one per latency budget, for CI test
+reports.
+
+Budgets are --budget [ENDPOINT=]MS, checked against --budget-percentile
+(default p95) of each endpoint's latency. ENDPOINT is a label such as
+'GET /technique-plan/tasks/{id}/full' or just its path, and also covers
+that endpoint's staged labels in reorder mode; without it the budget
+applies to every endpoint. The run exits non-zero (EXIT_FAILED) when a
+step fails, load or reorder errors exceed --max-error-rate or a budget is
+breached.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import xml.etree.ElementTree as ElementTree
+from collections import namedtuple
+
+from psystem.stats import percentile
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+
+PASSED = 'passed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+SUITE_NAME = 'p-system-api'
+
+StepResult = namedtuple('StepResult', 'name status message seconds')
+
+# ENDPOINT None applies to every endpoint
+Budget = namedtuple('Budget', 'endpoint milliseconds')
+Breach = namedtuple('Breach', 'budget endpoint percentile actual')
+
+
+def parse_budget(text):
+    """Budget from '[ENDPOINT=]MS'"""
+    endpoint, _, value = text.rpartition('=')
+    try:
+        milliseconds = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid latency budget '{text}' (expected [ENDPOINT=]MS)") from None
+    if milliseconds <= 0:
+        raise ValueError(f"Invalid latency budget '{text}'")
+    return Budget(endpoint.strip() or None, milliseconds)
+
+
+def _budget(text):
+    """argparse type for --budget"""
+    try:
+        return parse_budget(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_report_arguments(parser):
+    """Add the --json / --junit / --budget options to an argparse parser"""
+    group = parser.add_argument_group('results')
+    group.add_argument('--json', dest='json_path', metavar='PATH', help="write results as JSON")
+    group.add_argument('--junit', dest='junit_path', metavar='PATH', help="write results as JUnit XML")
+    group.add_argument('--budget', dest='budgets', action='append', type=_budget, default=[],
+                       metavar='[ENDPOINT=]MS',
+                       help="latency budget, repeatable; fail the run if an endpoint's percentile exceeds it")
+    group.add_argument('--budget-percentile', type=int, choices=(50, 95, 99, 100), default=95,
+                       help="percentile checked against budgets (default: 95)")
+    group.add_argument('--max-error-rate', type=float, default=0.0,
+                       help="load and reorder modes: share of failed requests per endpoint tolerated (default: 0)")
+    return group
+
+
+def _matches(budget, endpoint):
+    if budget.endpoint is None:
+        return True
+    # Staged labels ('GET /path [500 tasks]', see psystem.bulk) match their endpoint too
+    base = endpoint.split(' [', 1)[0]
+    return budget.endpoint in (endpoint, base, base.partition(' ')[2])
+
+
+def check_budgets(recorder, budgets, at=95):
+    """Breaches of budgets by the at-th percentile latency of each endpoint"""
+    breaches = []
+    for endpoint, stats in sorted(recorder.endpoints.items()):
+        actual = percentile(sorted(stats.latencies), at / 100)
+        for budget in budgets:
+            if actual is not None and _matches(budget, endpoint) and actual * 1000 > budget.milliseconds:
+                breaches.append(Breach(budget, endpoint, at, round(actual * 1000, 3)))
+    return breaches
+
+
+def unmatched_budgets(recorder, budgets):
+    """Budgets naming endpoints the run never called (likely typos)"""
+    return [budget for budget in budgets
+            if budget.endpoint is not None and not any(_matches(budget, e) for e in recorder.endpoints)]
+
+
+def error_steps(recorder, max_error_rate):
+    """Load and reorder mode: one StepResult per endpoint, failed above max_error_rate"""
+    steps = []
+    for endpoint, stats in sorted(recorder.endpoints.items()):
+        rate = stats.errors / stats.count if stats.count else 0.0
+        if rate > max_error_rate:
+            steps.append(StepResult(endpoint, FAILED,
+                                    f"{stats.errors} of {stats.count} requests failed ({stats.last_error})",
+                                    sum(stats.latencies)))
+        else:
+            steps.append(StepResult(endpoint, PASSED, None, sum(stats.latencies)))
+    return steps
+
+
+def exit_status(steps, breaches):
+    failed = any(step.status == FAILED for step in steps)
+    return EXIT_FAILED if failed or breaches else EXIT_OK
+
+
+def _ensure_directory(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def write_json(path, mode, api_base, elapsed, steps, recorder, breaches, details=None):
+    """Write the run as a JSON document; details (mode settings and totals) go under the mode's name"""
+    report = {
+        'suite': SUITE_NAME,
+        'mode': mode,
+        'api_base': api_base,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'elapsed_s': round(elapsed, 3),
+        'ok': exit_status(steps, breaches) == EXIT_OK,
+        'steps': [
+            {'name': step.name, 'status': step.status, 'message': step.message,
+             'seconds': round(step.seconds, 4)}
+            for step in steps
+        ],
+        'endpoints': {endpoint: stats.to_dict() for endpoint, stats in sorted(recorder.endpoints.items())},
+        'budget_breaches': [
+            {'endpoint': breach.endpoint, 'percentile': breach.percentile, 'actual_ms': breach.actual,
+             'budget_ms': breach.budget.milliseconds}
+            for breach in breaches
+        ],
+    }
+    if details is not None:
+        report[mode] = details
+
+    _ensure_directory(path)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+        handle.write('\n')
+
+
+def write_junit(path, mode, elapsed, steps, budgets, breaches, at=95):
+    """Write steps and budget checks as a JUnit XML test suite"""
+    cases = []
+    for step in steps:
+        case = ElementTree.Element('testcase', classname=f'{SUITE_NAME}.{mode}', name=step.name,
+                                   time=f'{step.seconds:.4f}')
+        if step.status == FAILED:
+            ElementTree.SubElement(case, 'failure', message=step.message or 'failed').text = step.message
+        elif step.status == SKIPPED:
+            ElementTree.SubElement(case, 'skipped', message=step.message or 'skipped')
+        cases.append(case)
+
+    for budget in budgets:
+        target = budget.endpoint or 'every endpoint'
+        case = ElementTree.Element('testcase', classname=f'{SUITE_NAME}.latency',
+                                   name=f"p{at} of {target} <= {budget.milliseconds:g}ms", time='0')
+        over = [breach for breach in breaches if breach.budget is budget]
+        if over:
+            ElementTree.SubElement(case, 'failure', message=f"{len(over)} endpoint(s) over budget").text = '\n'.join(
+                f"{breach.endpoint}: p{at} {breach.actual:.1f}ms > {budget.milliseconds:g}ms" for breach in over
+            )
+        cases.append(case)
+
+    failures = sum(1 for case in cases if case.find('failure') is not None)
+    skipped = sum(1 for case in cases if case.find('skipped') is not None)
+    suites = ElementTree.Element('testsuites')
+    suite = ElementTree.SubElement(
+        suites, 'testsuite', name=SUITE_NAME, tests=str(len(cases)), failures=str(failures), errors='0',
+        skipped=str(skipped), time=f'{elapsed:.3f}',
+        timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+    )
+    suite.extend(cases)
+
+    _ensure_directory(path)
+    ElementTree.indent(suites)
+    ElementTree.ElementTree(suites).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def summary_lines(steps, breaches):
+    """Per-step outcome lines plus budget breaches"""
+    marks = {PASSED: '✓', FAILED: '✗', SKIPPED: '-'}
+    lines = []
+    for step in steps:
+        suffix = f" ({step.message})" if step.message else ''
+        lines.append(f"  {marks[step.status]} {step.name}{suffix}")
+    for breach in breaches:
+        lines.append(f"  ✗ {breach.endpoint}: p{breach.percentile} {breach.actual:.1f}ms "
+                     f"> budget {breach.budget.milliseconds:g}ms")
+    return lines
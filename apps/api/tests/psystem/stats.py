@@ -0,0 +1,142 @@
+"""
+Per-endpoint request statistics
+
+A Recorder is passed to APIClient(recorder=...) and collects every
+request's Sample by endpoint label; it is thread-safe, so all virtual
+players of a load run share one. Each endpoint keeps its latencies (for
+exact percentiles), a latency histogram over HISTOGRAM_BUCKETS_MS and the
+connection setup phases of the requests that opened a connection.
+"""
+
+import bisect
+import math
+import threading
+from collections import Counter
+
+# Upper bounds of the latency histogram buckets; slower requests land in +Inf
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+PERCENTILES = (50, 95, 99)
+PHASES = ('ttfb', 'dns', 'connect', 'tls')
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list (None if empty)"""
+    if not ordered:
+        return None
+    rank = min(max(1, math.ceil(fraction * len(ordered))), len(ordered))
+    return ordered[rank - 1]
+
+
+def _milliseconds(value):
+    return None if value is None else round(value * 1000, 3)
+
+
+class EndpointStats:
+    """Latencies (seconds), phases, statuses and histogram of one endpoint"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.latencies = []
+        self.phases = {phase: [] for phase in PHASES}
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.statuses = Counter()
+        self.errors = 0
+        self.last_error = None
+
+    def add(self, sample):
+        self.latencies.append(sample.seconds)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, sample.seconds * 1000)] += 1
+        for phase in PHASES:
+            value = getattr(sample, phase)
+            if value is not None:
+                self.phases[phase].append(value)
+        self.statuses[str(sample.status) if sample.status is not None else 'error'] += 1
+        if not sample.ok:
+            self.errors += 1
+            self.last_error = sample.error or f"HTTP {sample.status}"
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    def percentiles(self, fractions=(0.5, 0.95, 0.99)):
+        ordered = sorted(self.latencies)
+        return [percentile(ordered, fraction) for fraction in fractions]
+
+    def histogram(self):
+        """{'<=5ms': n, ..., '+Inf': n} request counts per bucket (not cumulative)"""
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + ['+Inf']
+        return dict(zip(labels, self.buckets))
+
+    def to_dict(self):
+        """JSON-friendly summary, times in milliseconds"""
+        ordered = sorted(self.latencies)
+        summary = {
+            'count': self.count,
+            'errors': self.errors,
+            'statuses': dict(self.statuses),
+            'mean_ms': _milliseconds(sum(ordered) / len(ordered)) if ordered else None,
+            'max_ms': _milliseconds(ordered[-1]) if ordered else None,
+        }
+        for value in PERCENTILES:
+            summary[f'p{value}_ms'] = _milliseconds(percentile(ordered, value / 100))
+        summary['phases_ms'] = {
+            phase: {f'p{value}': _milliseconds(percentile(sorted(values), value / 100)) for value in PERCENTILES}
+            for phase, values in self.phases.items() if values
+        }
+        summary['histogram'] = self.histogram()
+        if self.last_error:
+            summary['last_error'] = self.last_error
+        return summary
+
+
+class Recorder:
+    """recorder(sample) callback collecting EndpointStats"""
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, sample):
+        with self._lock:
+            stats = self.endpoints.get(sample.endpoint)
+            if stats is None:
+                stats = self.endpoints[sample.endpoint] = EndpointStats(sample.endpoint)
+            stats.add(sample)
+
+    @property
+    def requests(self):
+        return sum(stats.count for stats in self.endpoints.values())
+
+    @property
+    def errors(self):
+        return sum(stats.errors for stats in self.endpoints.values())
+
+    def summary_lines(self, elapsed):
+        """Table of requests/sec and p50/p95/p99 per endpoint over elapsed seconds"""
+        width = max([len(endpoint) for endpoint in self.endpoints] + [len('endpoint')])
+        lines = [f"   {'endpoint':<{width}}  {'reqs':>6}  {'req/s':>7}  {'errors':>6}  "
+                 f"{'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}"]
+        for endpoint, stats in sorted(self.endpoints.items()):
+            p50, p95, p99 = (value * 1000 for value in stats.percentiles())
+            lines.append(f"   {endpoint:<{width}}  {stats.count:>6}  {stats.count / elapsed:>7.1f}  "
+                         f"{stats.errors:>6}  {p50:>8.1f}  {p95:>8.1f}  {p99:>8.1f}")
+        lines.append(f"   {'total':<{width}}  {self.requests:>6}  {self.requests / elapsed:>7.1f}  {self.errors:>6}")
+        return lines
+
+    def timing_lines(self):
+        """Table of total/TTFB and connection phase medians per endpoint"""
+        width = max([len(endpoint) for endpoint in self.endpoints] + [len('endpoint')])
+        lines = [f"   {'endpoint':<{width}}  {'total ms':>8}  {'ttfb ms':>8}  {'dns ms':>7}  "
+                 f"{'conn ms':>7}  {'tls ms':>7}"]
+
+        def median(values):
+            value = percentile(sorted(values), 0.5)
+            return '-' if value is None else f"{value * 1000:.1f}"
+
+        for endpoint, stats in sorted(self.endpoints.items()):
+            lines.append(f"   {endpoint:<{width}}  {median(stats.latencies):>8}  {median(stats.phases['ttfb']):>8}  "
+                         f"{median(stats.phases['dns']):>7}  {median(stats.phases['connect']):>7}  "
+                         f"{median(stats.phases['tls']):>7}")
+        return lines
@@ -5,328 +5,191 @@ Adds professional headline and subheadline to enhanced mockup
 
 Usage:
     python add-headline.py tier-golf-hero-1920x1080.png
+    python add-headline.py -m campaign.yaml heroes/ [-j WORKERS] [--out-dir DIR]
+
+A manifest (JSON or YAML, see imaging.variations) lists any number of
+variations with their text, colors, fonts and positions, and optionally
+the base images; every image x variation pair renders on a worker pool.
+
+Variations whose base image and text are unchanged are skipped (see
+--no-cache and the other build cache options). --emit layer|region writes
+only the text layer or the changed region plus its placement, for tools
+that composite it themselves. --format and --max-kb pick the codec
+profile (see imaging.encode), --name the output file names. Services can
+draw headlines in memory through imaging.api instead of this script, and
+$TIER_IMAGING_SOCKET forwards runs to a warm imaging.server process.
 """
 
+import argparse
 import sys
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
+import time
 
-def add_headline_to_mockup(input_path, output_path=None):
-    """Add professional headline text to mockup"""
-
-    # Load the enhanced mockup
-    img = Image.open(input_path)
-    if img.mode != 'RGBA':
-        img = img.convert('RGBA')
-
-    # Create drawing context
-    draw = ImageDraw.Draw(img)
+from imaging import batch, encode, fonts, headline, server, variations
+from imaging.buildcache import BUILT, FRESH, RESTORED, add_cache_arguments, cache_from_args
 
-    # Try to load professional fonts (fallback to system fonts)
-    fonts = {
-        'headline': None,
-        'subheadline': None,
-        'cta': None
-    }
+# Fonts tried in order for the single headline (resolved via imaging.fonts)
+HEADLINE_FONTS = fonts.SANS_FONTS
 
-    # Try different font paths for macOS
-    font_paths = [
-        '/System/Library/Fonts/SFCompact.ttf',
-        '/System/Library/Fonts/SFNS.ttf',
-        '/System/Library/Fonts/Helvetica.ttc',
-        '/System/Library/Fonts/HelveticaNeue.ttc',
-        '/Library/Fonts/Arial.ttf',
-    ]
+def add_headline_to_mockup(input_path, output_path=None, codec=None, max_bytes=None):
+    """Add professional headline text to mockup"""
 
-    # Load fonts with fallback
-    try:
-        for path in font_paths:
-            try:
-                fonts['headline'] = ImageFont.truetype(path, 72)
-                fonts['subheadline'] = ImageFont.truetype(path, 32)
-                fonts['cta'] = ImageFont.truetype(path, 24)
-                print(f"✅ Loaded font: {path}")
-                break
-            except:
-                continue
-    except:
-        pass
+    # Load the enhanced mockup
+    base = headline.BaseImage(input_path)
 
-    # Fallback to default if needed
-    if not fonts['headline']:
+    # Load professional fonts (shared per process, default font if none installed)
+    font_path = fonts.resolve(HEADLINE_FONTS)
+    if font_path:
+        print(f"✅ Loaded font: {font_path}")
+    else:
         print("⚠️  Using default fonts")
-        fonts['headline'] = ImageFont.load_default()
-        fonts['subheadline'] = ImageFont.load_default()
-        fonts['cta'] = ImageFont.load_default()
-
-    # Text content
-    headline = "Elevate Your Golf Game"
-    subheadline = "Professional analytics across all your devices"
-    cta = "Start Your Journey →"
-
-    # Safe area margins
-    margin = 120
-
-    # Calculate text positioning (top-left of safe area)
-    headline_x = margin
-    headline_y = margin + 40  # 40px below safe area top
-
-    # Text colors
-    headline_color = (26, 29, 35, 255)  # Dark navy (TIER brand)
-    subheadline_color = (99, 102, 112, 180)  # Gray with transparency
-    cta_color = (255, 255, 255, 255)  # White
-    cta_bg_color = (34, 139, 34, 255)  # Green
-
-    # Draw headline with subtle shadow
-    # Shadow first (offset slightly)
-    shadow_offset = 2
-    draw.text(
-        (headline_x + shadow_offset, headline_y + shadow_offset),
-        headline,
-        font=fonts['headline'],
-        fill=(0, 0, 0, 30)  # Subtle black shadow
-    )
-
-    # Main headline
-    draw.text(
-        (headline_x, headline_y),
-        headline,
-        font=fonts['headline'],
-        fill=headline_color
-    )
-
-    # Get headline height for positioning subheadline
-    headline_bbox = draw.textbbox((headline_x, headline_y), headline, font=fonts['headline'])
-    headline_height = headline_bbox[3] - headline_bbox[1]
-
-    # Draw subheadline
-    subheadline_y = headline_y + headline_height + 24  # 24px gap
-    draw.text(
-        (headline_x, subheadline_y),
-        subheadline,
-        font=fonts['subheadline'],
-        fill=subheadline_color
+    faces = headline.faces(HEADLINE_FONTS)
+
+    # Text block (headline, subheadline, CTA button) in the top-left safe area
+    layer, position = headline.headline_layer(
+        "Elevate Your Golf Game",
+        "Professional analytics across all your devices",
+        "Start Your Journey →",
+        faces,
+        size=base.size,
     )
 
-    # Get subheadline height for CTA positioning
-    subheadline_bbox = draw.textbbox((headline_x, subheadline_y), subheadline, font=fonts['subheadline'])
-    subheadline_height = subheadline_bbox[3] - subheadline_bbox[1]
-
-    # Draw CTA button
-    cta_y = subheadline_y + subheadline_height + 48  # 48px gap
-
-    # Get CTA text size
-    cta_bbox = draw.textbbox((0, 0), cta, font=fonts['cta'])
-    cta_text_width = cta_bbox[2] - cta_bbox[0]
-    cta_text_height = cta_bbox[3] - cta_bbox[1]
-
-    # CTA button dimensions
-    cta_padding_x = 32
-    cta_padding_y = 16
-    cta_button_width = cta_text_width + (cta_padding_x * 2)
-    cta_button_height = cta_text_height + (cta_padding_y * 2)
-
-    # Draw CTA button background with rounded corners
-    cta_button_rect = [
-        headline_x,
-        cta_y,
-        headline_x + cta_button_width,
-        cta_y + cta_button_height
-    ]
-
-    # Button shadow
-    shadow_rect = [
-        cta_button_rect[0] + 2,
-        cta_button_rect[1] + 2,
-        cta_button_rect[2] + 2,
-        cta_button_rect[3] + 2
-    ]
-    draw.rounded_rectangle(shadow_rect, radius=8, fill=(0, 0, 0, 30))
-
-    # Button background
-    draw.rounded_rectangle(cta_button_rect, radius=8, fill=cta_bg_color)
-
-    # CTA text (centered in button)
-    cta_text_x = headline_x + cta_padding_x
-    cta_text_y = cta_y + cta_padding_y
-    draw.text(
-        (cta_text_x, cta_text_y),
-        cta,
-        font=fonts['cta'],
-        fill=cta_color
-    )
-
-    # Save output
+    # Save output (PNG unless another codec profile is given)
+    codec = codec or encode.PROFILES[encode.DEFAULT_PROFILE]
     if not output_path:
-        output_path = input_path.replace('.png', '-with-headline.png')
+        output_path = encode.with_extension(input_path.replace('.png', '-with-headline.png'), codec)
 
-    img.convert('RGB').save(output_path, 'PNG', quality=95)
+    headline.save(base, layer, position, output_path, codec=codec, max_bytes=max_bytes)
 
     return output_path
 
-def create_variations(base_image):
+# Variation rendering lives in imaging.variations; re-exported for callers of this script
+TOOL_NAME = variations.TOOL_NAME
+VARIATION_FONTS = variations.VARIATION_FONTS
+variation_params = variations.variation_params
+variation_output = variations.variation_output
+
+# Per-variation status line for each build cache outcome
+SAVE_MESSAGES = {
+    BUILT: "✅ Saved",
+    FRESH: "⏭️  Up to date",
+    RESTORED: "♻️  Restored from cache",
+    batch.FAILED: "❌ Failed",
+}
+
+def report(result):
+    """Print one finished variation"""
+    print(f"   {SAVE_MESSAGES[result.status]}: {result.output} ({result.seconds:.1f}s)")
+
+def create_variations(base_image, cache=None, emit=headline.EMIT_FULL,
+                      variation_list=variations.DEFAULT_VARIATIONS, workers=1):
     """Create multiple headline variations"""
-
-    variations = [
-        {
-            'name': 'default',
-            'headline': 'Elevate Your Golf Game',
-            'subheadline': 'Professional analytics across all your devices',
-            'cta': 'Start Your Journey →'
-        },
-        {
-            'name': 'data-driven',
-            'headline': 'Data-Driven Golf Excellence',
-            'subheadline': 'Real-time insights from tee to green',
-            'cta': 'Get Started →'
-        },
-        {
-            'name': 'performance',
-            'headline': 'Master Your Performance',
-            'subheadline': 'Track, analyze, and improve every round',
-            'cta': 'Try It Free →'
-        }
-    ]
-
-    outputs = []
-
-    for var in variations:
-        print(f"\n📝 Creating variation: {var['name']}")
-
-        # Load base image
-        img = Image.open(base_image)
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-
-        draw = ImageDraw.Draw(img)
-
-        # Load fonts
+    results = variations.run_variations(
+        [base_image], variation_list, workers=workers, progress=report, cache=cache, emit=emit,
+    )
+    failed = [result for result in results if not result.ok]
+    if failed:
+        raise RuntimeError(failed[0].error.splitlines()[0])
+    return [result.output for result in results]
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Add headline variations to enhanced mockups.")
+    parser.add_argument('inputs', nargs='*', metavar='INPUT',
+                        help="enhanced mockup PNG, directory or glob (added to the manifest's bases)")
+    parser.add_argument('-m', '--manifest',
+                        help="JSON or YAML file with variations (and optionally bases); "
+                             "default: the three built-in variations")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes (default: one per input, up to the CPU count)")
+    parser.add_argument('--out-dir', default=None, help="output directory (default: next to each input)")
+    parser.add_argument('--emit', choices=headline.EMIT_MODES, default=headline.EMIT_FULL,
+                        help="full images, only the text layer, or only the changed region "
+                             "(layer/region write a placement .json next to each PNG)")
+    parser.add_argument('--name', dest='name_template', default=variations.DEFAULT_NAME_TEMPLATE,
+                        metavar='TEMPLATE',
+                        help="output file name without extension; fields {stem}, {name}, {emit} "
+                             f"(default: {variations.DEFAULT_NAME_TEMPLATE})")
+    add_cache_arguments(parser)
+    encode.add_encode_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Hand the job to a warm image server when one is running
+    status = server.forward(variations.TOOL_NAME, argv)
+    if status is not None:
+        sys.exit(status)
+
+    args = parse_args(argv)
+
+    manifest_bases, variation_list = [], variations.DEFAULT_VARIATIONS
+    if args.manifest:
         try:
-            font_paths = [
-                '/System/Library/Fonts/SFCompact.ttf',
-                '/System/Library/Fonts/SFNS.ttf',
-                '/System/Library/Fonts/Helvetica.ttc',
-                '/System/Library/Fonts/HelveticaNeue.ttc',
-            ]
-
-            headline_font = None
-            for path in font_paths:
-                try:
-                    headline_font = ImageFont.truetype(path, 72)
-                    subheadline_font = ImageFont.truetype(path, 32)
-                    cta_font = ImageFont.truetype(path, 24)
-                    break
-                except:
-                    continue
-
-            if not headline_font:
-                headline_font = ImageFont.load_default()
-                subheadline_font = ImageFont.load_default()
-                cta_font = ImageFont.load_default()
-        except:
-            headline_font = ImageFont.load_default()
-            subheadline_font = ImageFont.load_default()
-            cta_font = ImageFont.load_default()
-
-        # Safe area
-        margin = 120
-        x = margin
-        y = margin + 40
-
-        # Colors
-        headline_color = (26, 29, 35, 255)
-        subheadline_color = (99, 102, 112, 180)
-        cta_color = (255, 255, 255, 255)
-        cta_bg_color = (34, 139, 34, 255)
-
-        # Draw headline with shadow
-        draw.text((x + 2, y + 2), var['headline'], font=headline_font, fill=(0, 0, 0, 30))
-        draw.text((x, y), var['headline'], font=headline_font, fill=headline_color)
-
-        # Get headline height
-        headline_bbox = draw.textbbox((x, y), var['headline'], font=headline_font)
-        headline_h = headline_bbox[3] - headline_bbox[1]
-
-        # Draw subheadline
-        sub_y = y + headline_h + 24
-        draw.text((x, sub_y), var['subheadline'], font=subheadline_font, fill=subheadline_color)
-
-        # Get subheadline height
-        sub_bbox = draw.textbbox((x, sub_y), var['subheadline'], font=subheadline_font)
-        sub_h = sub_bbox[3] - sub_bbox[1]
-
-        # Draw CTA
-        cta_y = sub_y + sub_h + 48
-        cta_bbox = draw.textbbox((0, 0), var['cta'], font=cta_font)
-        cta_w = cta_bbox[2] - cta_bbox[0]
-        cta_h = cta_bbox[3] - cta_bbox[1]
-
-        # Button dimensions
-        btn_w = cta_w + 64
-        btn_h = cta_h + 32
-
-        # Button shadow
-        draw.rounded_rectangle([x + 2, cta_y + 2, x + btn_w + 2, cta_y + btn_h + 2], radius=8, fill=(0, 0, 0, 30))
-
-        # Button background
-        draw.rounded_rectangle([x, cta_y, x + btn_w, cta_y + btn_h], radius=8, fill=cta_bg_color)
+            manifest_bases, variation_list = variations.load_manifest(args.manifest)
+        except (OSError, ValueError) as e:
+            print(f"❌ Invalid manifest: {e}")
+            sys.exit(1)
 
-        # CTA text
-        draw.text((x + 32, cta_y + 16), var['cta'], font=cta_font, fill=cta_color)
-
-        # Save
-        output_name = base_image.replace('.png', f'-{var["name"]}.png')
-        img.convert('RGB').save(output_name, 'PNG', quality=95)
-        outputs.append(output_name)
-
-        print(f"   ✅ Saved: {output_name}")
-
-    return outputs
-
-def main():
-    if len(sys.argv) < 2:
+    sources = manifest_bases + args.inputs
+    if not sources:
         print("❌ Usage: python add-headline.py input-image.png")
         print("   Example: python add-headline.py tier-golf-hero-1920x1080.png")
+        print("   Campaign: python add-headline.py -m campaign.yaml heroes/ -j 8 --out-dir variants")
+        sys.exit(1)
+
+    try:
+        codec, max_bytes = encode.profile_from_args(args)
+        headline.check_codec(codec, args.emit)
+        batch.check_name_template(args.name_template, fields=('stem', 'name', 'emit'))
+    except ValueError as e:
+        print(f"❌ {e}")
         sys.exit(1)
 
-    input_path = sys.argv[1]
+    inputs, missing = batch.collect_inputs(sources)
+    cache = cache_from_args(args)
 
     print("=" * 60)
     print("📝 TIER GOLF MOCKUP - ADD HEADLINE TEXT")
     print("=" * 60)
     print()
 
+    # Create headline variations
+    print(f"🎨 Creating {len(variation_list)} headline variations × {len(inputs)} images...")
+    started = time.perf_counter()
     try:
-        # Create headline variations
-        print("🎨 Creating headline variations...")
-        outputs = create_variations(input_path)
+        results = variations.run_variations(
+            inputs, variation_list, out_dir=args.out_dir, workers=args.workers,
+            progress=report, cache=cache, emit=args.emit, codec=codec, max_bytes=max_bytes,
+            encode_threads=args.encode_threads, name_template=args.name_template,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    if cache is not None:
+        cache.prune()
 
-        print()
-        print("=" * 60)
-        print("✨ HEADLINE VARIATIONS COMPLETE!")
-        print("=" * 60)
-        print()
-        print("📁 Output files:")
-        for output in outputs:
-            print(f"   • {output}")
-        print()
-        print("💡 Variations created:")
-        print("   1. Default: 'Elevate Your Golf Game'")
-        print("   2. Data-Driven: 'Data-Driven Golf Excellence'")
-        print("   3. Performance: 'Master Your Performance'")
-        print()
-        print("🎯 All headlines include:")
-        print("   ✅ Professional typography")
-        print("   ✅ Subtle text shadows")
-        print("   ✅ Subheadline for context")
-        print("   ✅ CTA button with hover-ready design")
-        print("   ✅ Safe area compliance (120px margins)")
-        print()
+    print()
+    print("=" * 60)
+    print("✨ HEADLINE VARIATIONS COMPLETE!")
+    print("=" * 60)
+    for line in batch.summarize(results, missing, elapsed):
+        print(line)
+    print()
+    print("💡 Variations created:")
+    for number, variation in enumerate(variation_list[:10], 1):
+        print(f"   {number}. {variation['name']}: '{variation['headline']}'")
+    if len(variation_list) > 10:
+        print(f"   ... and {len(variation_list) - 10} more")
+    print()
+    print("🎯 All headlines include:")
+    print("   ✅ Professional typography")
+    print("   ✅ Subtle text shadows")
+    print("   ✅ Subheadline for context")
+    print("   ✅ CTA button with hover-ready design")
+    print("   ✅ Safe area compliance (120px margins)")
+    print()
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    if missing or not all(result.ok for result in results):
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+"""
+Benchmarks and visual regression checks for the image tools
+
+Every hot path runs on synthetic, seeded RGBA inputs at 1080p, 4K and 8K:
+
+    test_benchmarks.py  wall time per function and end to end (pytest-benchmark)
+    test_memory.py      peak allocation per function vs baselines/memory.json
+    test_golden.py      small renders diffed against goldens/*.png
+    test_caches.py      in-process caches follow inputs rewritten between runs
+
+Only memory and golden images are gated by default. Timing regressions
+are not: wall times depend on the machine, so no timing baseline is
+committed and a plain pytest run only reports them. To gate timings,
+record a baseline on the machine that will run the comparison (it is
+stored under .benchmarks/) and compare against it as shown below.
+
+Usage (from the repository root):
+
+    pip install -r scripts/tools/benchmarks/requirements.txt
+
+    # record a timing baseline, then fail on >15% slower minimum times
+    pytest scripts/tools/benchmarks --benchmark-autosave
+    pytest scripts/tools/benchmarks --benchmark-compare --benchmark-compare-fail=min:15%
+
+    # only some sizes; refresh stored memory baselines / golden images
+    pytest scripts/tools/benchmarks --bench-sizes=1080p,4k
+    pytest scripts/tools/benchmarks --update-baseline --update-goldens
+
+Caches are cleared before every measured round, so numbers are for cold
+renders of a new input, not for repeated renders within one session.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+MEMORY_BASELINE = os.path.join(BENCHMARKS_DIR, 'baselines', 'memory.json')
+GOLDEN_DIR = os.path.join(BENCHMARKS_DIR, 'goldens')
+
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from imaging import batch, grain, overlays, shadow, textlayout, vignette  # noqa: E402
+from imaging.buildcache import _file_digests  # noqa: E402
+from imaging.profiling import rss_bytes  # noqa: E402
+
+SIZES = {
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+    '8k': (7680, 4320),
+}
+
+# Timed rounds per size; 8K renders take seconds each
+ROUNDS = {'1080p': 5, '4k': 3, '8k': 1}
+
+# Allowed growth over the stored memory baseline
+MEMORY_TOLERANCE = 0.10
+MEMORY_SLACK = 1024 * 1024
+
+SEED = 1234
+
+Case = namedtuple('Case', 'name setup run')
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('image tool benchmarks')
+    group.addoption('--bench-sizes', default=','.join(SIZES),
+                    help=f"comma-separated render sizes to benchmark (default: {','.join(SIZES)})")
+    group.addoption('--update-baseline', action='store_true',
+                    help="rewrite baselines/memory.json from this run instead of checking it")
+    group.addoption('--update-goldens', action='store_true',
+                    help="rewrite goldens/*.png from this run instead of diffing against them")
+
+
+def pytest_generate_tests(metafunc):
+    if 'size_name' in metafunc.fixturenames:
+        names = [name.strip() for name in metafunc.config.getoption('bench_sizes').split(',') if name.strip()]
+        unknown = [name for name in names if name not in SIZES]
+        if unknown:
+            raise pytest.UsageError(f"Unknown --bench-sizes {unknown}; expected some of {list(SIZES)}")
+        metafunc.parametrize('size_name', names)
+
+
+def _load_script(name, filename):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(TOOLS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def enhancer():
+    """mockup-enhancer.py loaded as a module"""
+    return _load_script('mockup_enhancer', 'mockup-enhancer.py')
+
+
+@pytest.fixture(scope='session')
+def headline():
+    """add-headline.py loaded as a module"""
+    return _load_script('add_headline', 'add-headline.py')
+
+
+@pytest.fixture(scope='session')
+def tools(enhancer, headline):
+    return {'enhancer': enhancer, 'headline': headline}
+
+
+def clear_caches():
+    """Drop every in-process render cache so the next call starts cold"""
+    vignette.clear_cache()
+    grain.clear_cache()
+    shadow.clear_cache()
+    textlayout.clear_cache()
+    overlays.clear_cache()
+    _file_digests.clear()
+
+
+def synthetic_mockup(width, height, seed=SEED):
+    """
+    Deterministic stand-in for a design tool export: a rounded device frame
+    with a gradient screen and UI blocks on a transparent background.
+    """
+    rng = np.random.default_rng(seed)
+    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+
+    inset = max(2, min(width, height) // 20)
+    radius = max(2, min(width, height) // 12)
+    draw.rounded_rectangle([inset, inset, width - inset, height - inset], radius=radius, fill=(28, 30, 36, 255))
+
+    bezel = inset + max(2, min(width, height) // 40)
+    screen = np.zeros((height - 2 * bezel, width - 2 * bezel, 4), dtype=np.uint8)
+    screen[..., 0] = np.linspace(40, 220, screen.shape[1], dtype=np.float32).astype(np.uint8)
+    screen[..., 1] = np.linspace(90, 160, screen.shape[0], dtype=np.float32).astype(np.uint8)[:, np.newaxis]
+    screen[..., 2] = 180
+    screen[..., 3] = 255
+    image.paste(Image.fromarray(screen), (bezel, bezel))
+
+    for _ in range(12):
+        x0 = int(rng.integers(bezel, width - bezel - 8))
+        y0 = int(rng.integers(bezel, height - bezel - 8))
+        x1 = min(width - bezel, x0 + int(rng.integers(8, max(9, width // 4))))
+        y1 = min(height - bezel, y0 + int(rng.integers(8, max(9, height // 10))))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3)) + (255,)
+        draw.rectangle([x0, y0, x1, y1], fill=color)
+
+    return image
+
+
+def _mockup_file(directory, width, height):
+    path = os.path.join(directory, f'mockup-{width}x{height}.png')
+    synthetic_mockup(width, height).save(path)
+    return path
+
+
+def _base_file(directory, width, height):
+    path = os.path.join(directory, f'base-{width}x{height}.png')
+    synthetic_mockup(width, height).convert('RGB').save(path)
+    return path
+
+
+# Each case: setup(size, tmp_dir) -> args, run(tools, *args)
+CASES = [
+    Case(
+        'gradient',
+        lambda size, tmp: size,
+        lambda tools, width, height: tools['enhancer'].create_gradient_background(width, height),
+    ),
+    Case(
+        'vignette',
+        lambda size, tmp: size,
+        lambda tools, width, height: tools['enhancer'].create_radial_vignette(width, height),
+    ),
+    Case(
+        'dual_shadow',
+        lambda size, tmp: (synthetic_mockup(*size),),
+        lambda tools, image: tools['enhancer'].add_dual_shadow(image),
+    ),
+    Case(
+        'noise',
+        lambda size, tmp: (synthetic_mockup(*size),),
+        lambda tools, image: tools['enhancer'].add_noise_texture(image),
+    ),
+    Case(
+        'enhance_mockup',
+        lambda size, tmp: (_mockup_file(tmp, *size), size),
+        lambda tools, path, size: tools['enhancer'].enhance_mockup(path, *size),
+    ),
+    Case(
+        'enhance_tiled',
+        lambda size, tmp: (_mockup_file(tmp, *size), size, os.path.join(tmp, 'tiled.png')),
+        lambda tools, path, size, output: batch.render_job(
+            path, batch.OutputSpec(*size, False), output, tiled=batch.TILED_ON,
+        ),
+    ),
+    Case(
+        'create_variations',
+        lambda size, tmp: (_base_file(tmp, *size),),
+        lambda tools, path: tools['headline'].create_variations(path),
+    ),
+]
+
+CASE_IDS = [case.name for case in CASES]
+
+
+def measure_memory(fn, interval=0.002):
+    """
+    Call fn once and return (traced_peak, rss_peak) growth in bytes.
+
+    traced_peak comes from tracemalloc (Python and NumPy allocations, stable
+    across runs); rss_peak is sampled from a helper thread and also covers
+    Pillow's buffers, but is noisier. rss_peak is None without /proc.
+    """
+    start_rss = rss_bytes()
+    peak_rss = start_rss
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak_rss
+        while not done.wait(interval):
+            peak_rss = max(peak_rss, rss_bytes())
+
+    sampler = threading.Thread(target=sample, daemon=True) if start_rss is not None else None
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start_traced = tracemalloc.get_traced_memory()[0]
+    if sampler:
+        sampler.start()
+    try:
+        fn()
+    finally:
+        done.set()
+        if sampler:
+            sampler.join()
+        traced_peak = tracemalloc.get_traced_memory()[1] - start_traced
+        if not tracing:
+            tracemalloc.stop()
+
+    if start_rss is None:
+        return traced_peak, None
+    return traced_peak, max(peak_rss, rss_bytes()) - start_rss
+
+
+def load_memory_baseline():
+    try:
+        with open(MEMORY_BASELINE, encoding='utf-8') as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+@pytest.fixture(scope='session')
+def memory_baseline(request):
+    """
+    Stored peak allocation per case; with --update-baseline, results recorded
+    during the run are written back when the session ends.
+    """
+    baseline = load_memory_baseline()
+    updates = {}
+    yield baseline, updates
+
+    if request.config.getoption('update_baseline') and updates:
+        baseline.update(updates)
+        os.makedirs(os.path.dirname(MEMORY_BASELINE), exist_ok=True)
+        with open(MEMORY_BASELINE, 'w', encoding='utf-8') as handle:
+            json.dump(dict(sorted(baseline.items())), handle, indent=2)
+            handle.write('\n')
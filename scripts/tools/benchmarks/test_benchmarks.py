@@ -0,0 +1,26 @@
+"""Wall time per hot path and end to end, at every --bench-sizes size"""
+
+import pytest
+
+from conftest import CASE_IDS, CASES, ROUNDS, SIZES, clear_caches, measure_memory
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize('case', CASES, ids=CASE_IDS)
+def test_hot_path(benchmark, tools, case, size_name, tmp_path):
+    size = SIZES[size_name]
+    args = case.setup(size, str(tmp_path))
+
+    def setup():
+        clear_caches()
+        return args, {}
+
+    benchmark.group = f'{case.name}-{size_name}'
+    benchmark.pedantic(lambda *a: case.run(tools, *a), setup=setup, rounds=ROUNDS[size_name])
+
+    clear_caches()
+    traced, rss = measure_memory(lambda: case.run(tools, *args))
+    benchmark.extra_info['traced_peak_mb'] = round(traced / (1024 * 1024), 1)
+    if rss is not None:
+        benchmark.extra_info['rss_peak_mb'] = round(rss / (1024 * 1024), 1)
@@ -0,0 +1,73 @@
+"""In-process caches must follow inputs that change between runs"""
+
+import io
+import json
+import os
+
+from PIL import Image
+
+from conftest import clear_caches
+from imaging import batch, server
+from imaging.buildcache import BUILT, BuildCache
+
+SPEC = batch.OutputSpec(480, 360, False)
+
+
+def _write_input(path, color, mtime_ns):
+    Image.new('RGBA', (900, 600), color).save(path)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _center(path):
+    with Image.open(path) as image:
+        return image.convert('RGB').getpixel((image.width // 2, image.height // 2))
+
+
+def test_rewritten_input_renders_again(tmp_path):
+    clear_caches()
+    path = str(tmp_path / 'mockup.png')
+    out_dir = str(tmp_path / 'out')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    mtime_ns = os.stat(tmp_path).st_mtime_ns
+
+    _write_input(path, (220, 30, 30, 255), mtime_ns)
+    [first] = batch.run_batch([path], [SPEC], out_dir, workers=1, cache=cache)
+    red, _, blue = _center(first.output)
+    assert first.ok and red > blue
+
+    # Same size and a later mtime, as when a design tool re-exports the file
+    _write_input(path, (30, 30, 220, 255), mtime_ns + 1_000_000_000)
+    [second] = batch.run_batch([path], [SPEC], out_dir, workers=1, cache=cache)
+    red, _, blue = _center(second.output)
+    assert second.ok and second.status == BUILT and blue > red
+
+
+def _serve(job):
+    replies = io.StringIO()
+    server.serve_stream(io.StringIO(json.dumps(job) + '\n'), replies)
+    return json.loads(replies.getvalue())
+
+
+def test_warm_server_renders_rewritten_input(tmp_path):
+    clear_caches()
+    path = str(tmp_path / 'mockup.png')
+    output = str(tmp_path / 'out' / 'mockup-hero-480x360.png')
+    mtime_ns = os.stat(tmp_path).st_mtime_ns
+    job = {
+        'tool': batch.TOOL_NAME,
+        'args': ['--batch', 'mockup.png', '-o', '480x360', '-j', '1', '--out-dir', 'out', '--cache-dir', 'cache'],
+        'cwd': str(tmp_path),
+    }
+
+    # Both jobs run in this process, as they would in one warm server
+    _write_input(path, (220, 30, 30, 255), mtime_ns)
+    reply = _serve(dict(job, id=1))
+    red, _, blue = _center(output)
+    assert reply['status'] == 0, reply['output']
+    assert red > blue
+
+    _write_input(path, (30, 30, 220, 255), mtime_ns + 1_000_000_000)
+    reply = _serve(dict(job, id=2))
+    red, _, blue = _center(output)
+    assert reply['status'] == 0, reply['output']
+    assert blue > red
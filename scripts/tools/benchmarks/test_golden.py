@@ -0,0 +1,112 @@
+"""Small renders diffed against goldens/*.png so optimizations keep the look"""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import GOLDEN_DIR, clear_caches, synthetic_mockup
+from imaging import batch
+
+# Largest per-channel difference tolerated, and share of pixels allowed to differ
+MAX_DIFFERENCE = 2
+MAX_CHANGED = 0.001
+
+
+def _render_gradient(tools, tmp):
+    return tools['enhancer'].create_gradient_background(320, 180)
+
+
+def _render_vignette(tools, tmp):
+    return tools['enhancer'].create_radial_vignette(320, 180, strength=0.3)
+
+
+def _render_vignette_stepped(tools, tmp):
+    return tools['enhancer'].create_radial_vignette(320, 180, strength=0.3, falloff='stepped')
+
+
+def _render_dual_shadow(tools, tmp):
+    image, _ = tools['enhancer'].add_dual_shadow(synthetic_mockup(160, 120))
+    return image
+
+
+def _render_noise(tools, tmp):
+    return tools['enhancer'].add_noise_texture(synthetic_mockup(256, 256), strength=0.5)
+
+
+def _render_hero(tools, tmp):
+    path = os.path.join(tmp, 'mockup.png')
+    synthetic_mockup(900, 600).save(path)
+    return tools['enhancer'].enhance_mockup(path, 480, 360)
+
+
+def _render_hero_tiled(tools, tmp):
+    path = os.path.join(tmp, 'mockup.png')
+    output = os.path.join(tmp, 'tiled.png')
+    synthetic_mockup(900, 600).save(path)
+    result = batch.render_job(path, batch.OutputSpec(480, 360, False), output, tiled=batch.TILED_ON)
+    assert result.ok, result.error
+    return Image.open(output)
+
+
+def _render_hero_safe(tools, tmp, tiled=batch.TILED_OFF):
+    path = os.path.join(tmp, 'mockup.png')
+    output = os.path.join(tmp, 'safe.png')
+    synthetic_mockup(900, 600).save(path)
+    result = batch.render_job(path, batch.OutputSpec(480, 360, True), output, tiled=tiled)
+    assert result.ok, result.error
+    return Image.open(output)
+
+
+def _render_hero_safe_tiled(tools, tmp):
+    return _render_hero_safe(tools, tmp, tiled=batch.TILED_ON)
+
+
+def _render_safe_area(tools, tmp):
+    return tools['enhancer'].create_safe_area_guide(480, 270)
+
+
+RENDERS = {
+    'gradient': _render_gradient,
+    'vignette': _render_vignette,
+    'vignette-stepped': _render_vignette_stepped,
+    'dual-shadow': _render_dual_shadow,
+    'noise': _render_noise,
+    'hero': _render_hero,
+    'hero-tiled': _render_hero_tiled,
+    'hero-safe': _render_hero_safe,
+    'hero-safe-tiled': _render_hero_safe_tiled,
+    'safe-area': _render_safe_area,
+}
+
+# Renders that must match another render's golden
+GOLDEN_NAMES = {'hero-tiled': 'hero', 'hero-safe-tiled': 'hero-safe'}
+
+
+@pytest.mark.parametrize('name', list(RENDERS))
+def test_matches_golden(tools, name, tmp_path, request):
+    clear_caches()
+    image = RENDERS[name](tools, str(tmp_path))
+    golden_path = os.path.join(GOLDEN_DIR, f'{GOLDEN_NAMES.get(name, name)}.png')
+
+    if request.config.getoption('update_goldens'):
+        if name in GOLDEN_NAMES:
+            return
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        image.save(golden_path)
+        return
+    if not os.path.exists(golden_path):
+        pytest.skip(f"no golden for {name} (run with --update-goldens)")
+
+    golden = Image.open(golden_path)
+    assert image.mode == golden.mode and image.size == golden.size
+
+    actual = np.asarray(image, dtype=np.int16)
+    expected = np.asarray(golden, dtype=np.int16)
+    difference = np.abs(actual - expected)
+    changed = np.count_nonzero(difference.reshape(difference.shape[0], difference.shape[1], -1).any(axis=2))
+    assert difference.max() <= MAX_DIFFERENCE, f"{name}: max channel difference {difference.max()}"
+    assert changed <= MAX_CHANGED * actual.shape[0] * actual.shape[1], (
+        f"{name}: {changed} pixels differ from the golden image"
+    )
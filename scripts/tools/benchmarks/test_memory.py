@@ -0,0 +1,29 @@
+"""Peak allocation per hot path, checked against baselines/memory.json"""
+
+import pytest
+
+from conftest import (
+    CASE_IDS, CASES, MEMORY_SLACK, MEMORY_TOLERANCE, SIZES, clear_caches, measure_memory,
+)
+
+
+@pytest.mark.parametrize('case', CASES, ids=CASE_IDS)
+def test_peak_memory(tools, case, size_name, tmp_path, memory_baseline, request):
+    baseline, updates = memory_baseline
+    key = f'{case.name}[{size_name}]'
+    args = case.setup(SIZES[size_name], str(tmp_path))
+
+    clear_caches()
+    traced, _ = measure_memory(lambda: case.run(tools, *args))
+
+    if request.config.getoption('update_baseline'):
+        updates[key] = traced
+        return
+    if key not in baseline:
+        pytest.skip(f"no memory baseline for {key} (run with --update-baseline)")
+
+    limit = baseline[key] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK
+    assert traced <= limit, (
+        f"{key} peak allocation {traced / 2**20:.1f} MB exceeds baseline "
+        f"{baseline[key] / 2**20:.1f} MB by more than {MEMORY_TOLERANCE:.0%}"
+    )
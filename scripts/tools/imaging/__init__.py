@@ -0,0 +1,7 @@
+"""
+TIER Golf imaging helpers
+Vectorized building blocks shared by the mockup and headline tools
+"""
+
+# Part of every build cache key: bump whenever rendered output changes
+__version__ = '1.5.0'
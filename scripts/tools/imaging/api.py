@@ -0,0 +1,154 @@
+"""
+In-process rendering API for services that embed the image tools
+
+    from imaging import api
+
+    png = api.render_hero_bytes(upload_bytes, '1920x1080+safe')
+    hero = api.render_hero(Image.open(path), (1600, 1200))
+    webp = api.add_headline_bytes(hero, {'name': 'spring', 'headline': '...',
+                                         'subheadline': '...', 'cta': '...'},
+                                  codec='webp')
+
+Sources may be encoded bytes, open files, paths or PIL images; results
+are PIL images or encoded bytes, and nothing touches the filesystem or
+stdout. Progress goes to the 'imaging' loggers (see imaging.logs).
+
+A Renderer keeps the decoded sessions of its most recent sources, and the
+module caches (fonts, vignette fields, grain tiles, shadows, text runs)
+stay warm for the life of the process, so a long-running worker pays the
+decode and setup cost once per source rather than once per request. The
+module-level functions share one default Renderer.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import time
+
+from PIL import Image
+
+from imaging import encode, headline, variations
+from imaging.batch import OutputSpec, parse_output_spec
+from imaging.lru import LRUCache
+from imaging.overlays import apply_safe_area_guide
+from imaging.resample import DEFAULT_QUALITY
+from imaging.session import EnhancementSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPEC = OutputSpec(1920, 1080, False)
+
+
+def output_spec(spec):
+    """OutputSpec from an OutputSpec, 'WxH[+safe]' or (width, height[, safe_area])"""
+    if spec is None:
+        return DEFAULT_SPEC
+    if isinstance(spec, OutputSpec):
+        return spec
+    if isinstance(spec, str):
+        return parse_output_spec(spec)
+    width, height, *rest = spec
+    return OutputSpec(int(width), int(height), bool(rest and rest[0]))
+
+
+def _codec(codec):
+    if codec is None:
+        return encode.PROFILES[encode.DEFAULT_PROFILE]
+    return codec if isinstance(codec, encode.EncodeProfile) else encode.get_profile(codec)
+
+
+def _source_key(source):
+    """Cache key identifying source's content, or None if it cannot be cached"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return 'bytes', hashlib.blake2b(source, digest_size=16).hexdigest()
+    if isinstance(source, str):
+        stat = os.stat(source)
+        return 'file', os.path.abspath(source), stat.st_size, stat.st_mtime_ns
+    return None
+
+
+class Renderer:
+    """Renders heroes and headlines in memory, reusing recent sources"""
+
+    def __init__(self, cache_size=8, quality=DEFAULT_QUALITY):
+        self.quality = quality
+        self._sessions = LRUCache(maxsize=cache_size)
+
+    def session(self, source):
+        """EnhancementSession for source (shared while source stays in the cache)"""
+        key = _source_key(source)
+        if key is None:
+            if not isinstance(source, Image.Image):
+                # File objects are read once; keep their bytes for the cache key
+                return self.session(source.read())
+            return EnhancementSession(source, quality=self.quality)
+        return self._sessions.get_or_create(key, lambda: EnhancementSession(source, quality=self.quality))
+
+    def render_hero(self, source, spec=None, effects=None):
+        """Hero render of source as an RGB image; spec as accepted by output_spec()"""
+        spec = output_spec(spec)
+        started = time.perf_counter()
+        image = self.session(source).render(spec.width, spec.height, effects)
+        if spec.safe_area:
+            image = apply_safe_area_guide(image)
+        logger.info(
+            "rendered hero", extra={
+                'width': spec.width, 'height': spec.height, 'safe_area': spec.safe_area,
+                'seconds': round(time.perf_counter() - started, 4),
+            },
+        )
+        return image
+
+    def render_hero_bytes(self, source, spec=None, effects=None, codec=None, max_bytes=None):
+        """render_hero() encoded with an imaging.encode profile (name or EncodeProfile)"""
+        return encode.encode(self.render_hero(source, spec, effects), _codec(codec), max_bytes)
+
+    def add_headline(self, source, variation=None, emit=headline.EMIT_FULL):
+        """
+        Headline variation drawn over source.
+
+        variation is a manifest entry (see imaging.variations), by default
+        the first built-in one. Returns the full image, the text layer or
+        the changed region depending on emit, plus its (x, y, width,
+        height) placement in the base image.
+        """
+        variation = variations.normalize_variation(variation or variations.DEFAULT_VARIATIONS[0])
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        base = headline.BaseImage(source)
+        faces = headline.faces(variations.variation_fonts(variation), variation.get('style'))
+        texts = (variation['headline'], variation['subheadline'], variation['cta'])
+        layer, position = headline.headline_layer(*texts, faces, variation.get('style'), size=base.size)
+        logger.info("rendered headline", extra={'variation': variation['name'], 'emit': emit})
+        return headline.output_image(base, layer, position, emit), position + layer.size
+
+    def add_headline_bytes(self, source, variation=None, emit=headline.EMIT_FULL, codec=None, max_bytes=None):
+        """add_headline() image encoded with an imaging.encode profile"""
+        codec = _codec(codec)
+        headline.check_codec(codec, emit)
+        image, _ = self.add_headline(source, variation, emit)
+        return encode.encode(image, codec, max_bytes)
+
+    def clear(self):
+        """Drop the cached sessions"""
+        self._sessions.clear()
+
+
+_default = Renderer()
+
+
+def render_hero(source, spec=None, effects=None):
+    return _default.render_hero(source, spec, effects)
+
+
+def render_hero_bytes(source, spec=None, effects=None, codec=None, max_bytes=None):
+    return _default.render_hero_bytes(source, spec, effects, codec, max_bytes)
+
+
+def add_headline(source, variation=None, emit=headline.EMIT_FULL):
+    return _default.add_headline(source, variation, emit)
+
+
+def add_headline_bytes(source, variation=None, emit=headline.EMIT_FULL, codec=None, max_bytes=None):
+    return _default.add_headline_bytes(source, variation, emit, codec, max_bytes)
@@ -0,0 +1,463 @@
+"""
+Batch rendering of hero variants on a process pool
+
+Inputs can be image files, directories, glob patterns or manifests (a JSON
+list / {"inputs": [...]} object, or a text file with one path per line).
+Every (input, output spec) pair becomes an independent job: a failure is
+recorded in the summary instead of aborting the whole run.
+
+Each worker renders the variants of one input in a row and hands every
+finished image to a background encoder (imaging.encode), so writing one
+variant overlaps with rendering the next. Print-size outputs are rendered
+tiled instead: bands of rows stream straight into the PNG file, so memory
+stays bounded whatever the canvas size.
+
+Safe area variants either composite the cached guide layer onto the
+render (GUIDES_COMPOSITE) or, with GUIDES_SIDECAR, write only the
+transparent guide layer, to be stacked over the plain render of the same
+size by whatever displays it.
+
+The rendering modules (and with them NumPy and Pillow) are imported by
+the job functions, so the CLIs parse options, expand inputs and print
+usage without loading them.
+"""
+
+import glob
+import json
+import os
+import time
+import traceback
+from collections import namedtuple
+
+from imaging import encode
+from imaging.buildcache import BUILT, FRESH, RESTORED, build_key
+from imaging.lru import LRUCache
+from imaging.profiling import NULL_PROFILER, Profiler
+from imaging.resample import DEFAULT_QUALITY
+
+# Tool name in build cache keys
+TOOL_NAME = 'mockup-enhancer'
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.tif', '.tiff')
+MANIFEST_EXTENSIONS = ('.json', '.txt')
+
+# safe_area renders the same size with the safe area guide on top
+OutputSpec = namedtuple('OutputSpec', 'width height safe_area')
+
+# Same variants the single-image mode produces
+DEFAULT_OUTPUTS = (
+    OutputSpec(1920, 1080, False),
+    OutputSpec(1600, 1200, False),
+    OutputSpec(1920, 1080, True),
+)
+
+FAILED = 'failed'
+
+# Output file name without extension; fields: stem, width, height, safe
+DEFAULT_NAME_TEMPLATE = '{stem}-hero-{width}x{height}{safe}'
+
+# Tiled rendering modes; auto tiles outputs of at least TILED_MIN_PIXELS
+TILED_AUTO = 'auto'
+TILED_ON = 'on'
+TILED_OFF = 'off'
+TILED_MODES = (TILED_AUTO, TILED_ON, TILED_OFF)
+TILED_MIN_PIXELS = 40_000_000
+
+# What a safe_area variant writes: the render with the guide composited on
+# top, or only the guide layer (a sidecar to the plain render)
+GUIDES_COMPOSITE = 'composite'
+GUIDES_SIDECAR = 'sidecar'
+GUIDE_MODES = (GUIDES_COMPOSITE, GUIDES_SIDECAR)
+
+
+class JobResult(namedtuple('JobResult', 'input output status error seconds stages', defaults=(None,))):
+    """
+    Outcome of one job; status is a buildcache outcome or FAILED.
+
+    stages holds the job's profiling report rows when profiling was on.
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.status != FAILED
+
+
+def intermediate_plan(input_path, sizes):
+    """
+    Device size the session for input_path and sizes decodes and shares its
+    intermediate for (see imaging.session.planned_fit); None without sizes.
+    Reads only the image header.
+    """
+    if not sizes:
+        return None
+    from PIL import Image
+    from imaging.session import planned_fit
+
+    with Image.open(input_path) as image:
+        return planned_fit(image.size, sizes)
+
+
+def render_params(spec, quality=DEFAULT_QUALITY, codec=None, max_bytes=None, guides=GUIDES_COMPOSITE, plan=None):
+    """
+    Everything besides the input bytes that determines a job's output.
+
+    plan is the job's intermediate_plan(): the same spec renders slightly
+    differently depending on the other sizes its session was planned for.
+    """
+    from imaging.session import DEFAULT_EFFECTS
+
+    if spec.safe_area and guides == GUIDES_SIDECAR:
+        params = {'guide_layer': True, 'width': spec.width, 'height': spec.height}
+        params.update(encode.encode_params(codec or encode.PROFILES[encode.DEFAULT_PROFILE], max_bytes))
+        return params
+
+    params = {
+        'effects': DEFAULT_EFFECTS,
+        'width': spec.width,
+        'height': spec.height,
+        'safe_area': spec.safe_area,
+        'quality': quality,
+        'plan': plan,
+    }
+    params.update(encode.encode_params(codec or encode.PROFILES[encode.DEFAULT_PROFILE], max_bytes))
+    return params
+
+
+def parse_output_spec(text):
+    """Parse 'WIDTHxHEIGHT' or 'WIDTHxHEIGHT+safe' into an OutputSpec"""
+    size, _, suffix = text.strip().lower().partition('+')
+    if suffix not in ('', 'safe'):
+        raise ValueError(f"Unknown output option '+{suffix}' in '{text}'")
+
+    try:
+        width, height = (int(part) for part in size.split('x'))
+    except ValueError:
+        raise ValueError(f"Invalid output size '{text}' (expected e.g. 1920x1080)") from None
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Invalid output size '{text}'")
+
+    return OutputSpec(width, height, suffix == 'safe')
+
+
+def output_filename(input_path, spec, codec=None, template=DEFAULT_NAME_TEMPLATE):
+    """Output file name for one job, e.g. mockup-hero-1920x1080-safe.png"""
+    name = template.format(
+        stem=os.path.splitext(os.path.basename(input_path))[0],
+        width=spec.width,
+        height=spec.height,
+        safe='-safe' if spec.safe_area else '',
+    )
+    return name + (codec.extension if codec else '.png')
+
+
+def check_name_template(template, fields=('stem', 'width', 'height', 'safe')):
+    """Raise ValueError if template uses fields other than the given ones"""
+    try:
+        template.format(**dict.fromkeys(fields, ''))
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Invalid name template '{template}' (fields: {', '.join(fields)}): {e}") from None
+    if os.sep in template or (os.altsep and os.altsep in template):
+        raise ValueError(f"Name template '{template}' must be a file name, not a path")
+
+
+def check_guides(codec, guides):
+    """Raise ValueError if codec cannot hold a sidecar guide layer (needs alpha)"""
+    if guides == GUIDES_SIDECAR and codec is not None and codec.format == 'JPEG':
+        raise ValueError("Sidecar guide layers need an alpha channel; use png, webp or avif instead of jpeg")
+
+
+def check_unique(paths):
+    """Raise ValueError if two jobs would write the same output file"""
+    seen = set()
+    for path in paths:
+        key = os.path.abspath(path)
+        if key in seen:
+            raise ValueError(f"Several jobs would write {path}; make the name template unique "
+                             "(e.g. include {stem})")
+        seen.add(key)
+
+
+def _read_manifest(path):
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding='utf-8') as handle:
+        if path.lower().endswith('.json'):
+            data = json.load(handle)
+            entries = data.get('inputs', []) if isinstance(data, dict) else data
+        else:
+            entries = [line.strip() for line in handle]
+
+    paths = []
+    for entry in entries:
+        if not entry or entry.startswith('#'):
+            continue
+        paths.append(entry if os.path.isabs(entry) else os.path.join(base, entry))
+    return paths
+
+
+def collect_inputs(sources):
+    """
+    Expand sources into image paths.
+
+    Returns (inputs, missing): de-duplicated image paths in a stable order,
+    and the sources that matched nothing.
+    """
+    inputs, missing, seen = [], [], set()
+
+    def add(path):
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            inputs.append(path)
+
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(
+                os.path.join(source, name) for name in os.listdir(source)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        elif os.path.isfile(source) and source.lower().endswith(MANIFEST_EXTENSIONS):
+            matches = _read_manifest(source)
+        elif os.path.isfile(source):
+            matches = [source]
+        else:
+            matches = sorted(glob.glob(source))
+
+        if not matches:
+            missing.append(source)
+        for match in matches:
+            add(match)
+
+    return inputs, missing
+
+
+# Per-process caches: a worker usually receives every variant of one input
+# in a row, so it keeps that input's session and its last plain renders
+_sessions = LRUCache(maxsize=2)
+_renders = LRUCache(maxsize=4)
+
+
+def _source_key(input_path, quality, sizes):
+    """
+    Cache key for input_path's current contents, so a rewritten file is
+    decoded again; sizes is part of it because the session's draft decode
+    and reduction are planned for them.
+    """
+    stat = os.stat(input_path)
+    return (os.path.abspath(input_path), stat.st_size, stat.st_mtime_ns, quality, tuple(sizes or ()))
+
+
+def _session(input_path, quality, sizes, profiler):
+    from imaging.session import EnhancementSession
+
+    session = _sessions.get_or_create(
+        _source_key(input_path, quality, sizes),
+        lambda: EnhancementSession(input_path, sizes=sizes, quality=quality, profiler=profiler),
+    )
+    session.profiler = profiler
+    return session
+
+
+def _render(input_path, spec, quality, sizes, profiler):
+    session = _session(input_path, quality, sizes, profiler)
+    key = _source_key(input_path, quality, sizes) + (spec.width, spec.height)
+    return _renders.get_or_create(key, lambda: session.render(spec.width, spec.height))
+
+
+def is_tiled(spec, codec=None, tiled=TILED_AUTO):
+    """Whether spec renders tiled; TILED_ON needs a PNG codec"""
+    codec = codec or encode.PROFILES[encode.DEFAULT_PROFILE]
+    if tiled == TILED_ON:
+        if not encode.can_stream(codec):
+            raise ValueError(f"Tiled rendering streams PNG only, not '{codec.name}'")
+        return True
+    return tiled == TILED_AUTO and encode.can_stream(codec) and spec.width * spec.height >= TILED_MIN_PIXELS
+
+
+def _write_tiled(input_path, spec, output_path, quality, sizes, codec, profiler):
+    """Render spec band by band straight into a streamed PNG"""
+    from imaging.overlays import apply_safe_area_guide_rows
+
+    session = _session(input_path, quality, sizes, profiler)
+    with encode.PNGStream(output_path, spec.width, spec.height, codec) as stream:
+        for y0, rows in session.render_bands(spec.width, spec.height):
+            if spec.safe_area:
+                with profiler.stage('overlay'):
+                    apply_safe_area_guide_rows(rows, y0, spec.height)
+            with profiler.stage('save'):
+                stream.write(rows)
+
+
+def _error(e):
+    return f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+
+
+def _start_job(input_path, spec, output_path, cache, quality, sizes, profile, trace_memory, codec, max_bytes,
+               tiled, guides, encoder):
+    """
+    Render one variant and submit it to encoder; returns finish(), which
+    waits for the write and returns the JobResult. Never raises.
+    """
+    started = time.perf_counter()
+    profiler = Profiler(trace_memory=trace_memory) if profile else NULL_PROFILER
+    codec = codec or encode.PROFILES[encode.DEFAULT_PROFILE]
+    run = os.path.basename(output_path)
+    status, error, pending = None, None, None
+
+    try:
+        store = None
+        if cache is not None:
+            params = render_params(spec, quality, codec, max_bytes, guides, intermediate_plan(input_path, sizes))
+            key = build_key(input_path, params, TOOL_NAME)
+            status = cache.lookup(key, output_path)
+
+            def store(path):
+                cache.store(key, path)
+
+        if status is None and spec.safe_area and guides == GUIDES_SIDECAR:
+            from imaging.overlays import safe_area_layer
+
+            with profiler.run(run), profiler.stage('overlay'):
+                image = safe_area_layer(spec.width, spec.height).image()
+            pending = encoder.submit(image, output_path, codec, max_bytes, on_done=store)
+            status = BUILT
+        elif status is None and is_tiled(spec, codec, tiled):
+            with profiler.run(run):
+                _write_tiled(input_path, spec, output_path, quality, sizes, codec, profiler)
+            if store:
+                store(output_path)
+            status = BUILT
+        elif status is None:
+            with profiler.run(run):
+                image = _render(input_path, spec, quality, sizes, profiler)
+                if spec.safe_area:
+                    from imaging.overlays import apply_safe_area_guide
+
+                    with profiler.stage('overlay'):
+                        image = apply_safe_area_guide(image)
+                image = image.convert('RGB')
+            pending = encoder.submit(image, output_path, codec, max_bytes, on_done=store)
+            status = BUILT
+    except Exception as e:
+        status, error = FAILED, _error(e)
+
+    def finish():
+        nonlocal status, error
+        if pending is not None:
+            try:
+                profiler.add('save', pending.result(), run=run)
+            except Exception as e:
+                status, error = FAILED, _error(e)
+        stages = profiler.report_rows() if profile else None
+        return JobResult(input_path, output_path, status, error, time.perf_counter() - started, stages)
+
+    return finish
+
+
+def render_job(input_path, spec, output_path, cache=None, quality=DEFAULT_QUALITY, sizes=None,
+               profile=False, trace_memory=False, codec=None, max_bytes=None, tiled=TILED_AUTO,
+               guides=GUIDES_COMPOSITE):
+    """
+    Render and save one variant (skipped if cache has it); never raises.
+
+    sizes lists every (width, height) rendered for this input, so the
+    worker's session can share one intermediate resolution between them.
+    codec is an imaging.encode profile (default: png) and max_bytes its
+    size target. tiled is one of TILED_MODES and guides one of
+    GUIDE_MODES. With profile, the result carries per-stage report rows.
+    """
+    with encode.Encoder(threads=0) as encoder:
+        return _start_job(input_path, spec, output_path, cache, quality, sizes, profile, trace_memory,
+                          codec, max_bytes, tiled, guides, encoder)()
+
+
+def _run_chunk(chunk):
+    """Render one input's jobs in a row while the encoder writes the finished ones"""
+    jobs, encode_threads = chunk
+    with encode.Encoder(threads=encode_threads) as encoder:
+        finishers = [_start_job(*job, encoder=encoder) for job in jobs]
+        return [finish() for finish in finishers]
+
+
+def run_batch(inputs, outputs=DEFAULT_OUTPUTS, out_dir='.', workers=None, progress=None, cache=None,
+              quality=DEFAULT_QUALITY, profile=False, trace_memory=False, codec=None, max_bytes=None,
+              encode_threads=encode.DEFAULT_THREADS, tiled=TILED_AUTO, name_template=DEFAULT_NAME_TEMPLATE,
+              guides=GUIDES_COMPOSITE):
+    """
+    Render every (input, output spec) pair, spreading inputs over workers processes.
+
+    workers=1 renders in the current process. progress, if given, is called
+    with each JobResult as it finishes. With a BuildCache, up-to-date
+    outputs are skipped and cached ones restored. quality selects the
+    resampling profile (see imaging.resample); codec, max_bytes and
+    encode_threads the output encoding (see imaging.encode); tiled, one of
+    TILED_MODES, when to render band by band; guides, one of GUIDE_MODES,
+    what safe area variants write; profile and trace_memory attach
+    per-stage profiling rows to each result. name_template names the
+    outputs (see output_filename). Raises ValueError before rendering
+    anything if two jobs would write the same file or codec cannot hold
+    a sidecar guide. Returns the JobResults.
+    """
+    check_guides(codec, guides)
+    sizes = sorted({
+        (spec.width, spec.height) for spec in outputs if not (spec.safe_area and guides == GUIDES_SIDECAR)
+    })
+    # All variants of an input form one chunk so they share a worker's session
+    chunks = [
+        ([
+            (input_path, spec, os.path.join(out_dir, output_filename(input_path, spec, codec, name_template)),
+             cache, quality, sizes, profile, trace_memory, codec, max_bytes, tiled, guides)
+            for spec in outputs
+        ], encode_threads)
+        for input_path in inputs
+    ]
+    check_unique(job[2] for jobs, _ in chunks for job in jobs)
+    os.makedirs(out_dir, exist_ok=True)
+    if not chunks or not outputs:
+        return []
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    results = []
+
+    def collect(chunk_results):
+        for result in chunk_results:
+            results.append(result)
+            if progress:
+                progress(result)
+
+    if workers == 1:
+        for chunk in chunks:
+            collect(_run_chunk(chunk))
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for chunk_results in pool.map(_run_chunk, chunks):
+            collect(chunk_results)
+
+    return results
+
+
+def summarize(results, missing=(), elapsed=None):
+    """Human-readable batch summary lines"""
+    rendered = [r for r in results if r.status == BUILT]
+    cached = [r for r in results if r.status in (FRESH, RESTORED)]
+    failed = [r for r in results if not r.ok]
+
+    lines = [
+        f"✅ {len(rendered)} rendered, ⏭️  {len(cached)} up to date, "
+        f"❌ {len(failed)} failed, ⚠️  {len(missing)} inputs not found"
+    ]
+    if elapsed is not None and results:
+        # Job times include waits for the background encoder, so their sum
+        # over wall time is not a parallel speedup
+        job_time = sum(r.seconds for r in results)
+        lines.append(f"⏱️  {elapsed:.1f}s wall, {job_time:.1f}s job time ({job_time / elapsed:.1f} job/wall ratio)")
+    for source in missing:
+        lines.append(f"   ⚠️  No inputs matched: {source}")
+    for result in failed:
+        first_line = result.error.splitlines()[0] if result.error else 'unknown error'
+        lines.append(f"   ❌ {result.input} → {os.path.basename(result.output)}: {first_line}")
+    return lines
@@ -0,0 +1,222 @@
+"""
+Content-addressed build cache for rendered outputs
+
+A build key is the SHA-256 of the input bytes, the effect parameters and
+the tool version. For every output path a small stamp file records the key
+it was built from, so an up-to-date output is skipped without rendering.
+Rendered files are also stored under their key, so a deleted or
+overwritten output is restored by copying instead of re-rendering.
+
+Layout under the cache root:
+
+    objects/ab/abcdef....png    rendered outputs, by build key
+    stamps/<hash of path>.json  key + size/mtime of each output written
+
+Stamps and objects are written atomically (temp file + os.replace), so
+several batch workers can share one cache directory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import imaging
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'tier-golf-hero')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+# Build outcomes
+BUILT = 'built'
+FRESH = 'fresh'
+RESTORED = 'restored'
+
+_file_digests = {}
+
+
+def add_cache_arguments(parser):
+    """Add the shared --no-cache / --cache-* options to an argparse parser"""
+    group = parser.add_argument_group('build cache')
+    group.add_argument('--no-cache', action='store_true', help="always re-render every output")
+    group.add_argument('--cache-dir', default=None,
+                       help=f"cache location (default: $TIER_HERO_CACHE_DIR or {DEFAULT_CACHE_DIR})")
+    group.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                       help="evict least recently used outputs above this size")
+    group.add_argument('--cache-max-age-days', type=int, default=DEFAULT_MAX_AGE // (24 * 60 * 60),
+                       help="evict cached outputs older than this")
+    return group
+
+
+def cache_from_args(args):
+    """BuildCache configured from add_cache_arguments() options, or None with --no-cache"""
+    if args.no_cache:
+        return None
+    return BuildCache(
+        args.cache_dir,
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+        max_age=args.cache_max_age_days * 24 * 60 * 60,
+    )
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, memoized per (path, size, mtime) in this process"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b''):
+                digest.update(block)
+        _file_digests[memo_key] = digest.hexdigest()
+    return _file_digests[memo_key]
+
+
+def build_key(input_path, params, tool):
+    """Build key for rendering input_path with params using tool"""
+    digest = hashlib.sha256()
+    digest.update(f"{tool}@{imaging.__version__}\0".encode())
+    digest.update(file_digest(input_path).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=_json_default).encode())
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            write(handle)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class BuildCache:
+    """On-disk cache of rendered outputs keyed by build key"""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.root = root or os.environ.get('TIER_HERO_CACHE_DIR') or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _object_path(self, key, output_path):
+        extension = os.path.splitext(output_path)[1] or '.bin'
+        return os.path.join(self.root, 'objects', key[:2], key + extension)
+
+    def _stamp_path(self, output_path):
+        name = hashlib.sha256(os.path.abspath(output_path).encode()).hexdigest()
+        return os.path.join(self.root, 'stamps', name + '.json')
+
+    def is_fresh(self, key, output_path):
+        """True if output_path exists and was built from key"""
+        try:
+            with open(self._stamp_path(output_path), encoding='utf-8') as handle:
+                stamp = json.load(handle)
+            stat = os.stat(output_path)
+        except (OSError, ValueError):
+            return False
+
+        return (
+            stamp.get('key') == key
+            and stamp.get('size') == stat.st_size
+            and stamp.get('mtime_ns') == stat.st_mtime_ns
+        )
+
+    def _write_stamp(self, key, output_path):
+        stat = os.stat(output_path)
+        stamp = {'key': key, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        _atomic_write(self._stamp_path(output_path), lambda handle: handle.write(json.dumps(stamp).encode()))
+
+    def restore(self, key, output_path):
+        """Copy a stored object to output_path; False if the key is not cached"""
+        object_path = self._object_path(key, output_path)
+        if not os.path.exists(object_path):
+            return False
+
+        shutil.copyfile(object_path, output_path)
+        # Mark as recently used for size-based eviction
+        os.utime(object_path)
+        self._write_stamp(key, output_path)
+        return True
+
+    def store(self, key, output_path):
+        """Record a freshly built output_path under key"""
+        object_path = self._object_path(key, output_path)
+        with open(output_path, 'rb') as source:
+            _atomic_write(object_path, lambda handle: shutil.copyfileobj(source, handle))
+        self._write_stamp(key, output_path)
+
+    def lookup(self, key, output_path):
+        """
+        FRESH or RESTORED if output_path is (now) current for key, else None.
+
+        For callers that write the output asynchronously and call store()
+        once it is on disk.
+        """
+        if self.is_fresh(key, output_path):
+            return FRESH
+        if self.restore(key, output_path):
+            return RESTORED
+        return None
+
+    def build(self, key, output_path, render):
+        """
+        Make output_path current for key.
+
+        render(output_path) is only called when the output is stale and the
+        key is not in the store. Returns FRESH, RESTORED or BUILT.
+        """
+        status = self.lookup(key, output_path)
+        if status is not None:
+            return status
+
+        render(output_path)
+        self.store(key, output_path)
+        return BUILT
+
+    def prune(self):
+        """Evict objects older than max_age, then least recently used ones above max_bytes"""
+        objects_dir = os.path.join(self.root, 'objects')
+        if not os.path.isdir(objects_dir):
+            return 0
+
+        entries = []
+        for directory, _, names in os.walk(objects_dir):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        now = time.time()
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for mtime, size, path in entries:
+            too_old = self.max_age is not None and now - mtime > self.max_age
+            too_big = self.max_bytes is not None and total > self.max_bytes
+            if not (too_old or too_big):
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        return removed
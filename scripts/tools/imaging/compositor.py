@@ -0,0 +1,247 @@
+"""
+Single-buffer layer compositor for hero renders
+
+All layers are applied in place to one float32 (height, width, 3) working
+buffer instead of building a new full-canvas image per step:
+
+    background   gradient written straight into the buffer
+    shadow       darken by the cached shadow coverage (device region only)
+    device       alpha "over" blend (device region only)
+    vignette     \\ fused: one pass over row strips, which also
+    grain        / accumulates the luminance needed for contrast
+    contrast     masked contrast around the focal point, fused with the
+                 final rounding into the uint8 output
+
+The masked contrast matches ImageEnhance.Contrast + Image.composite: the
+canvas is pushed away from its mean grey level by `contrast_factor`, with
+the focus mask deciding how much of that applies per pixel.
+
+composite_hero_bands() is the tiled variant for print-size canvases: it
+builds one band of rows at a time and never holds the full canvas. As the
+contrast step needs the mean over the whole canvas, it makes two passes:
+the first only sums the luminance of each band, the second rebuilds the
+bands and yields them finished. No stage reads neighbouring pixels (the
+shadow blur is done once on the cached device-sized coverage), so bands
+need no halo rows.
+"""
+
+import numpy as np
+from PIL import Image
+
+from imaging.gradient import HERO_STOPS, linear_gradient_array, linear_gradient_rows
+from imaging.grain import apply_grain
+from imaging.profiling import NULL_PROFILER
+from imaging.vignette import DEFAULT_CENTER, focus_mask_array, focus_mask_rows, vignette_alpha, vignette_rows
+
+# Rows processed per fused pass; keeps per-strip temporaries small
+STRIP_HEIGHT = 256
+
+# Pixels per band in tiled renders (float32 RGB: 12 bytes each, ~12 MB)
+BAND_PIXELS = 1 << 20
+
+# ITU-R 601-2 luma, as used by Image.convert('L')
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _clip_region(position, size, canvas_size):
+    """Overlap of a layer at position with the canvas, as (canvas, layer) slice pairs"""
+    x, y = position
+    width, height = size
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, canvas_size[0]), min(y + height, canvas_size[1])
+    if x0 >= x1 or y0 >= y1:
+        return None
+
+    canvas = (slice(y0, y1), slice(x0, x1))
+    layer = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+    return canvas, layer
+
+
+def darken(buf, coverage, position):
+    """Composite a black layer with alpha coverage (uint8) at position"""
+    region = _clip_region(position, (coverage.shape[1], coverage.shape[0]), (buf.shape[1], buf.shape[0]))
+    if region is None:
+        return
+    canvas, layer = region
+
+    factor = coverage[layer].astype(np.float32)
+    factor *= np.float32(-1 / 255)
+    factor += 1
+    buf[canvas] *= factor[:, :, np.newaxis]
+
+
+def blend_over(buf, rgba, position):
+    """Alpha-blend an RGBA uint8 array over the buffer at position"""
+    region = _clip_region(position, (rgba.shape[1], rgba.shape[0]), (buf.shape[1], buf.shape[0]))
+    if region is None:
+        return
+    canvas, layer = region
+
+    source = rgba[layer]
+    alpha = source[:, :, 3].astype(np.float32)
+    alpha *= np.float32(1 / 255)
+
+    target = buf[canvas]
+    delta = source[:, :, :3].astype(np.float32)
+    delta -= target
+    delta *= alpha[:, :, np.newaxis]
+    target += delta
+
+
+def _vignette_and_grain(buf, vignette, strength, seed, profiler=NULL_PROFILER):
+    """Apply vignette and grain strip by strip; returns the canvas luminance sum"""
+    luminance = 0.0
+    for y0 in range(0, buf.shape[0], STRIP_HEIGHT):
+        strip = buf[y0:y0 + STRIP_HEIGHT]
+
+        with profiler.stage('vignette'):
+            factor = vignette[y0:y0 + STRIP_HEIGHT].astype(np.float32)
+            factor *= np.float32(-1 / 255)
+            factor += 1
+            strip *= factor[:, :, np.newaxis]
+
+        with profiler.stage('grain'):
+            apply_grain(strip, strength, seed, origin=(0, y0))
+
+        # The mean grey level feeds the contrast step
+        with profiler.stage('contrast'):
+            luminance += float(np.dot(strip.reshape(-1, 3), LUMA).sum(dtype=np.float64))
+    return luminance
+
+
+def _focus_contrast(buf, out, mean, factor, mask):
+    """Masked contrast around mean, rounded into the uint8 output"""
+    gain = np.float32((factor - 1) / 255)
+    mean = np.float32(mean)
+    for y0 in range(0, buf.shape[0], STRIP_HEIGHT):
+        strip = buf[y0:y0 + STRIP_HEIGHT]
+
+        weight = mask[y0:y0 + STRIP_HEIGHT].astype(np.float32)
+        weight *= gain
+        delta = strip - mean
+        delta *= weight[:, :, np.newaxis]
+        strip += delta
+
+        strip += 0.5
+        np.clip(strip, 0, 255, out=strip)
+        out[y0:y0 + STRIP_HEIGHT] = strip
+
+
+def composite_hero(width, height, effects, device=None, device_position=(0, 0),
+                   shadow=None, shadow_position=(0, 0), progress=None, profiler=None):
+    """
+    Composite a hero render and return it as an RGB image.
+
+    device is an RGBA image or uint8 array, shadow a uint8 coverage array
+    (see shadow.render_shadow_alpha); positions are top-left canvas
+    coordinates. effects is a full effect parameter dict. profiler, if
+    given, times the gradient/shadow/vignette/grain/contrast stages.
+    """
+    progress = progress or (lambda message: None)
+    profiler = profiler or NULL_PROFILER
+
+    progress("🎨 Creating gradient background...")
+    with profiler.stage('gradient'):
+        buf = np.empty((height, width, 3), dtype=np.float32)
+        linear_gradient_array(width, height, HERO_STOPS, out=buf)
+
+    if shadow is not None:
+        progress("🌑 Adding professional shadows...")
+        with profiler.stage('shadow'):
+            darken(buf, shadow, shadow_position)
+
+    if device is not None:
+        with profiler.stage('device'):
+            blend_over(buf, np.asarray(device), device_position)
+
+    progress("✨ Adding vignette...")
+    with profiler.stage('vignette'):
+        vignette = vignette_alpha(
+            width, height, effects['vignette_strength'], effects['vignette_falloff'], DEFAULT_CENTER,
+        )
+    progress("🔲 Adding subtle grain texture...")
+    luminance = _vignette_and_grain(buf, vignette, effects['noise_strength'], effects['grain_seed'], profiler)
+
+    progress("🎯 Enhancing focal point...")
+    with profiler.stage('contrast'):
+        # ImageEnhance.Contrast blends against the rounded mean grey level
+        mean = int(luminance / (width * height) + 0.5)
+        mask = focus_mask_array(
+            width, height, effects['focus_strength'], effects['vignette_falloff'], DEFAULT_CENTER,
+        )
+        out = np.empty((height, width, 3), dtype=np.uint8)
+        _focus_contrast(buf, out, mean, effects['contrast_factor'], mask)
+
+    return Image.fromarray(out)
+
+
+def band_height(width):
+    """Rows per tiled band: STRIP_HEIGHT, fewer for very wide canvases"""
+    return max(8, min(STRIP_HEIGHT, BAND_PIXELS // width))
+
+
+def _band(width, height, y0, y1, effects, device, device_position, shadow, shadow_position, profiler):
+    """Float32 rows y0:y1 of the canvas up to and including grain"""
+    with profiler.stage('gradient'):
+        buf = np.empty((y1 - y0, width, 3), dtype=np.float32)
+        linear_gradient_rows(width, height, y0, y1, HERO_STOPS, out=buf)
+
+    # Layers are placed in band coordinates; _clip_region crops them
+    if shadow is not None:
+        with profiler.stage('shadow'):
+            darken(buf, shadow, (shadow_position[0], shadow_position[1] - y0))
+    if device is not None:
+        with profiler.stage('device'):
+            # Only the device rows inside this band are converted to an array
+            top, bottom = max(y0 - device_position[1], 0), min(y1 - device_position[1], device.height)
+            if top < bottom:
+                rows = np.asarray(device.crop((0, top, device.width, bottom)))
+                blend_over(buf, rows, (device_position[0], device_position[1] + top - y0))
+
+    with profiler.stage('vignette'):
+        factor = vignette_rows(
+            width, height, y0, y1, effects['vignette_strength'], effects['vignette_falloff'], DEFAULT_CENTER,
+        ).astype(np.float32)
+        factor *= np.float32(-1 / 255)
+        factor += 1
+        buf *= factor[:, :, np.newaxis]
+
+    with profiler.stage('grain'):
+        apply_grain(buf, effects['noise_strength'], effects['grain_seed'], origin=(0, y0))
+    return buf
+
+
+def composite_hero_bands(width, height, effects, device=None, device_position=(0, 0),
+                         shadow=None, shadow_position=(0, 0), progress=None, profiler=None):
+    """
+    Tiled composite_hero(): yields (y0, rows) with rows a (n, width, 3)
+    uint8 array, top to bottom. Canvas buffers are bounded by
+    band_height(width) rows, whatever the canvas height. device must be
+    an RGBA image here; it is read one band at a time.
+    """
+    progress = progress or (lambda message: None)
+    profiler = profiler or NULL_PROFILER
+    rows = band_height(width)
+    layers = (effects, device, device_position, shadow, shadow_position, profiler)
+
+    # Pass 1: mean grey level of the finished canvas, band by band
+    progress("🧮 Measuring canvas brightness...")
+    luminance = 0.0
+    for y0 in range(0, height, rows):
+        buf = _band(width, height, y0, min(y0 + rows, height), *layers)
+        with profiler.stage('contrast'):
+            luminance += float(np.dot(buf.reshape(-1, 3), LUMA).sum(dtype=np.float64))
+    mean = int(luminance / (width * height) + 0.5)
+
+    # Pass 2: rebuild each band and finish it with the masked contrast
+    progress("🧱 Rendering tiles...")
+    for y0 in range(0, height, rows):
+        y1 = min(y0 + rows, height)
+        buf = _band(width, height, y0, y1, *layers)
+        with profiler.stage('contrast'):
+            mask = focus_mask_rows(
+                width, height, y0, y1, effects['focus_strength'], effects['vignette_falloff'], DEFAULT_CENTER,
+            )
+            out = np.empty((y1 - y0, width, 3), dtype=np.uint8)
+            _focus_contrast(buf, out, mean, effects['contrast_factor'], mask)
+        yield y0, out
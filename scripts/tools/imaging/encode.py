@@ -0,0 +1,301 @@
+"""
+Output encoding profiles and a background encoder
+
+Profiles make the codec settings explicit:
+
+    png            zlib level 6 (Pillow's default, the historical output)
+    png-fast       zlib level 1, for previews; much faster, larger files
+    png-optimized  maximum compression + optimize, for final renders
+    webp           lossy WebP, quality 90
+    avif           lossy AVIF, quality 80 (needs Pillow built with libavif)
+    jpeg           progressive JPEG, quality 90, no alpha
+
+Lossy profiles accept a size target (max_bytes): quality is lowered by
+binary search until the encoded file fits, down to MIN_QUALITY.
+
+Encoder runs saves on a small thread pool. Pillow releases the GIL while
+encoding, so rendering the next variant overlaps with writing the
+previous one; at most 2 x threads images wait in the queue, which bounds
+memory. Files are written to a temp file and renamed, so a reader never
+sees a partial image.
+
+PNGStream writes an RGB PNG a band of rows at a time, for tiled renders
+whose full canvas never exists in memory.
+
+Pillow and NumPy are imported on first use, so the CLIs can build their
+option parsers from this module without loading either.
+"""
+
+import io
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+EncodeProfile = namedtuple('EncodeProfile', 'name format extension options lossy')
+
+PROFILES = {
+    'png': EncodeProfile('png', 'PNG', '.png', {}, False),
+    'png-fast': EncodeProfile('png-fast', 'PNG', '.png', {'compress_level': 1}, False),
+    'png-optimized': EncodeProfile('png-optimized', 'PNG', '.png', {'compress_level': 9, 'optimize': True}, False),
+    'webp': EncodeProfile('webp', 'WEBP', '.webp', {'quality': 90, 'method': 4}, True),
+    'avif': EncodeProfile('avif', 'AVIF', '.avif', {'quality': 80, 'speed': 6}, True),
+    'jpeg': EncodeProfile('jpeg', 'JPEG', '.jpg', {'quality': 90, 'optimize': True, 'progressive': True}, True),
+}
+
+DEFAULT_PROFILE = 'png'
+
+# zlib level Pillow uses when a PNG profile sets none
+DEFAULT_COMPRESS_LEVEL = 6
+DEFAULT_THREADS = 2
+
+# Lowest quality a size target may push lossy profiles to
+MIN_QUALITY = 40
+
+
+def add_encode_arguments(parser):
+    """Add the shared --format / --max-kb / --encode-threads options to an argparse parser"""
+    group = parser.add_argument_group('output encoding')
+    group.add_argument('--format', dest='encode_profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                       help="codec profile (default: png; png-fast for previews, png-optimized for finals)")
+    group.add_argument('--max-kb', type=int, default=None,
+                       help="size target for webp/avif/jpeg: lower quality until each file fits")
+    group.add_argument('--encode-threads', type=int, default=DEFAULT_THREADS,
+                       help=f"background encoder threads, 0 to encode inline (default: {DEFAULT_THREADS})")
+    return group
+
+
+def profile_from_args(args):
+    """(profile, max_bytes) from add_encode_arguments() options"""
+    max_bytes = args.max_kb * 1024 if args.max_kb else None
+    return get_profile(args.encode_profile), max_bytes
+
+
+def available(profile):
+    """True if this Pillow build can write profile's format"""
+    from PIL import Image, features
+
+    Image.init()
+    if profile.format not in Image.SAVE:
+        return False
+    module = profile.format.lower()
+    return module not in features.modules or features.check_module(module)
+
+
+def get_profile(name):
+    if name not in PROFILES:
+        raise ValueError(f"Unknown output format '{name}' (expected one of: {', '.join(PROFILES)})")
+    profile = PROFILES[name]
+    if not available(profile):
+        raise ValueError(f"This Pillow build cannot write {profile.format} (output format '{name}')")
+    return profile
+
+
+def encode_params(profile, max_bytes=None):
+    """Profile settings for build cache keys; the default profile keeps the historical key"""
+    if profile.name == DEFAULT_PROFILE and max_bytes is None:
+        return {'format': 'png'}
+    return {'format': profile.name, 'options': profile.options, 'max_bytes': max_bytes}
+
+
+def with_extension(path, profile):
+    """path with its extension replaced by the profile's"""
+    return os.path.splitext(path)[0] + profile.extension
+
+
+def _prepare(image, profile):
+    if profile.format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        return image.convert('RGB')
+    if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        return image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return image
+
+
+def _encode_once(image, profile, options):
+    buffer = io.BytesIO()
+    image.save(buffer, profile.format, **options)
+    return buffer.getvalue()
+
+
+def encode(image, profile, max_bytes=None):
+    """Encoded bytes of image; lossy profiles drop quality to fit max_bytes"""
+    image = _prepare(image, profile)
+    data = _encode_once(image, profile, profile.options)
+    if max_bytes is None or not profile.lossy or len(data) <= max_bytes:
+        return data
+
+    # Highest quality that fits; the smallest attempt if none does
+    low, high = MIN_QUALITY, profile.options['quality'] - 1
+    best, smallest = None, data
+    while low <= high:
+        quality = (low + high) // 2
+        attempt = _encode_once(image, profile, dict(profile.options, quality=quality))
+        if len(attempt) <= max_bytes:
+            best, low = attempt, quality + 1
+        else:
+            high = quality - 1
+            smallest = min(smallest, attempt, key=len)
+    return best if best is not None else smallest
+
+
+def save(image, path, profile, max_bytes=None):
+    """Encode image and write it to path atomically; returns the byte count"""
+    data = encode(image, profile, max_bytes)
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, 'wb') as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(data)
+
+
+def can_stream(profile):
+    """True if tiled renders can stream profile's format (PNG only)"""
+    return profile.format == 'PNG'
+
+
+def _temp_path(path):
+    # A plain open() (unlike mkstemp) gives the file the usual umask permissions
+    return f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+
+
+class PNGStream:
+    """
+    Incremental 8-bit RGB PNG writer.
+
+    write(rows) appends a (rows, width, 3) uint8 band; close() checks that
+    every row arrived and moves the file into place. Rows use the PNG Sub
+    filter, computed for the whole band at once.
+    """
+
+    SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+    def __init__(self, path, width, height, profile=None):
+        profile = profile or PROFILES[DEFAULT_PROFILE]
+        if not can_stream(profile):
+            raise ValueError(f"Tiled rendering streams PNG only, not '{profile.name}'")
+        self.path = path
+        self.width, self.height = width, height
+        self.rows = 0
+        self._tmp_path = _temp_path(path)
+        self._compressor = zlib.compressobj(profile.options.get('compress_level', DEFAULT_COMPRESS_LEVEL))
+        self._handle = open(self._tmp_path, 'wb')
+        self._handle.write(self.SIGNATURE)
+        # 8-bit truecolor, deflate, adaptive filtering, no interlace
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self._handle.write(struct.pack('>I', len(data)) + kind + data)
+        self._handle.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+    def write(self, rows):
+        import numpy as np
+
+        height, width, _ = rows.shape
+        if width != self.width or self.rows + height > self.height:
+            raise ValueError(f"Band of {width}x{height} does not fit a {self.width}x{self.height} PNG")
+
+        # Filter byte 1 (Sub): each byte minus the same channel one pixel left
+        raw = rows.reshape(height, width * 3)
+        lines = np.empty((height, width * 3 + 1), dtype=np.uint8)
+        lines[:, 0] = 1
+        lines[:, 1:4] = raw[:, :3]
+        np.subtract(raw[:, 3:], raw[:, :-3], out=lines[:, 4:])
+
+        data = self._compressor.compress(lines.tobytes())
+        if data:
+            self._chunk(b'IDAT', data)
+        self.rows += height
+
+    def close(self):
+        """Finish the file; raises ValueError if rows are missing"""
+        if self._handle is None:
+            return
+        try:
+            if self.rows != self.height:
+                raise ValueError(f"PNG stream got {self.rows} of {self.height} rows")
+            self._chunk(b'IDAT', self._compressor.flush())
+            self._chunk(b'IEND', b'')
+            self._handle.close()
+            os.replace(self._tmp_path, self.path)
+        finally:
+            self.abort()
+
+    def abort(self):
+        """Drop a partially written file"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class Encoder:
+    """
+    Background saver. submit() returns a Future of the seconds spent
+    encoding; threads=0 encodes inline and returns a finished Future.
+    """
+
+    def __init__(self, threads=DEFAULT_THREADS):
+        self.threads = max(0, threads)
+        self._pool = ThreadPoolExecutor(self.threads, thread_name_prefix='encode') if self.threads else None
+        self._slots = threading.BoundedSemaphore(self.threads * 2) if self.threads else None
+
+    def _save(self, image, path, profile, max_bytes, on_done):
+        started = time.perf_counter()
+        try:
+            save(image, path, profile, max_bytes)
+            if on_done:
+                on_done(path)
+            return time.perf_counter() - started
+        finally:
+            if self._slots:
+                self._slots.release()
+
+    def submit(self, image, path, profile, max_bytes=None, on_done=None):
+        """Save image to path; on_done(path) runs after a successful write"""
+        if self._pool is None:
+            future = Future()
+            try:
+                future.set_result(self._save(image, path, profile, max_bytes, on_done))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        # Block while the queue is full so pending images cannot pile up
+        self._slots.acquire()
+        try:
+            return self._pool.submit(self._save, image, path, profile, max_bytes, on_done)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def encoder_from_args(args):
+    return Encoder(threads=args.encode_threads)
@@ -0,0 +1,128 @@
+"""
+Process-wide font resolver
+
+Font directories are scanned once per process into a file name index
+(case-insensitive), covering the platform font folders, the <dir> entries
+of the fontconfig configuration on Linux and any directories listed in
+$TIER_FONT_DIRS. Candidate lists then resolve to the first installed file
+without trying to open missing paths, and loaded FreeTypeFont objects are
+memoized by (path, size), so every variation and image in a process shares
+them.
+
+Candidates are file names ('Helvetica.ttc'), looked up in the index, or
+absolute paths.
+"""
+
+import glob
+import os
+import sys
+import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
+
+FONT_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+
+# Keynote-style sans faces, then metric-compatible/common Linux fallbacks
+SANS_FONTS = (
+    'SFCompact.ttf',
+    'SFNS.ttf',
+    'Helvetica.ttc',
+    'HelveticaNeue.ttc',
+    'Arial.ttf',
+    'LiberationSans-Regular.ttf',
+    'DejaVuSans.ttf',
+)
+
+FONTCONFIG_FILES = ('/etc/fonts/fonts.conf', '/etc/fonts/conf.d/*.conf', '/etc/fonts/local.conf')
+
+
+def _xdg_data_home():
+    return os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+
+
+def _fontconfig_dirs():
+    """Directories named by <dir> elements in the fontconfig configuration"""
+    dirs = []
+    for pattern in FONTCONFIG_FILES:
+        for path in sorted(glob.glob(pattern)):
+            try:
+                root = ElementTree.parse(path).getroot()
+            except (OSError, ElementTree.ParseError):
+                continue
+            for element in root.iter('dir'):
+                text = (element.text or '').strip()
+                if not text:
+                    continue
+                if element.get('prefix') == 'xdg':
+                    text = os.path.join(_xdg_data_home(), text)
+                dirs.append(os.path.expanduser(text))
+    return dirs
+
+
+def font_dirs():
+    """Directories searched for fonts, most specific first"""
+    home = os.path.expanduser('~')
+    dirs = [path for path in os.environ.get('TIER_FONT_DIRS', '').split(os.pathsep) if path]
+
+    if sys.platform == 'darwin':
+        dirs += [os.path.join(home, 'Library', 'Fonts'), '/Library/Fonts', '/System/Library/Fonts']
+    elif sys.platform == 'win32':
+        dirs.append(os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'))
+    else:
+        dirs += [os.path.join(_xdg_data_home(), 'fonts'), os.path.join(home, '.fonts')]
+        dirs += _fontconfig_dirs()
+        dirs += ['/usr/local/share/fonts', '/usr/share/fonts']
+
+    unique = []
+    for path in dirs:
+        if path not in unique:
+            unique.append(path)
+    return unique
+
+
+@lru_cache(maxsize=1)
+def font_index():
+    """{lower-case file name: path} of every font file, first directory wins"""
+    index = {}
+    for directory in font_dirs():
+        for root, _, names in os.walk(directory):
+            for name in sorted(names):
+                if name.lower().endswith(FONT_EXTENSIONS):
+                    index.setdefault(name.lower(), os.path.join(root, name))
+    return index
+
+
+@lru_cache(maxsize=32)
+def resolve(candidates=SANS_FONTS):
+    """Path of the first installed candidate, or None"""
+    index = font_index()
+    for candidate in candidates:
+        if os.path.isabs(candidate):
+            if os.path.isfile(candidate):
+                return candidate
+        elif candidate.lower() in index:
+            return index[candidate.lower()]
+    return None
+
+
+@lru_cache(maxsize=64)
+def load(path, size):
+    """FreeTypeFont for path at size, or Pillow's default font when path is None"""
+    from PIL import ImageFont
+
+    if path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(path, size)
+
+
+def truetype(size, candidates=SANS_FONTS):
+    """Shared font object for the first installed candidate at size"""
+    try:
+        return load(resolve(tuple(candidates)), size)
+    except OSError:
+        # Unreadable font file
+        return load(None, size)
+
+
+def clear_cache():
+    for cached in (font_index, resolve, load):
+        cached.cache_clear()
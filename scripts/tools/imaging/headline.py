@@ -0,0 +1,275 @@
+"""
+Headline text blocks drawn as small layers over a decoded base image
+
+A variation only changes the headline block in the top-left safe area, so
+its text is painted into an RGBA layer just large enough for that block.
+The base image is decoded and converted once (BaseImage); each variation
+then blends its layer into a crop of the base and pastes the result into a
+copy, instead of re-opening, converting and drawing on the full image.
+
+Every element (text shadow, headline, subheadline, CTA button and label)
+is alpha-blended, so semi-transparent colors such as the 30/255 shadow
+stay subtle instead of being written over the base as opaque pixels.
+
+Layers can also be written on their own (EMIT_LAYER, transparent PNG) or
+as the composited changed region (EMIT_REGION), each with a JSON sidecar
+holding the paste position, for tools that do their own composition.
+
+Pillow is imported by the functions that draw, so the style constants can
+be read (e.g. to validate a manifest) without loading it.
+"""
+
+import json
+import os
+from collections import namedtuple
+
+from imaging import encode, fonts, textlayout
+
+# Layout and colors of the TIER headline block
+DEFAULT_STYLE = {
+    'margin': 120,                          # Safe area margin
+    'offset_y': 40,                         # Headline distance below the safe area top
+    'position': None,                       # Explicit headline (x, y); overrides the two above
+    'headline_size': 72,
+    'subheadline_size': 32,
+    'cta_size': 24,
+    'headline_color': (26, 29, 35, 255),    # Dark navy (TIER brand)
+    'subheadline_color': (99, 102, 112, 180),
+    'cta_color': (255, 255, 255, 255),
+    'cta_background': (34, 139, 34, 255),   # Green
+    'shadow_color': (0, 0, 0, 30),          # Subtle black shadow
+    'shadow_offset': 2,
+    'headline_gap': 24,
+    'cta_gap': 48,
+    'cta_padding': (32, 16),
+    'cta_radius': 8,
+    'max_width': None,                      # Wrap headline/subheadline lines wider than this
+    'line_height': 1.15,                    # Line step of wrapped text, in font sizes
+}
+
+# Output modes
+EMIT_FULL = 'full'
+EMIT_LAYER = 'layer'
+EMIT_REGION = 'region'
+EMIT_MODES = (EMIT_FULL, EMIT_LAYER, EMIT_REGION)
+
+# kind is 'text' (value = string) or 'box' (value = corner radius)
+Element = namedtuple('Element', 'kind xy value font color')
+
+
+def faces(candidates=fonts.SANS_FONTS, style=None):
+    """Shared headline/subheadline/CTA fonts for style"""
+    style = dict(DEFAULT_STYLE, **(style or {}))
+    return {
+        'headline': fonts.truetype(style['headline_size'], candidates),
+        'subheadline': fonts.truetype(style['subheadline_size'], candidates),
+        'cta': fonts.truetype(style['cta_size'], candidates),
+    }
+
+
+def _lines(font, text, xy, style):
+    """
+    [(xy, line)] for text at xy, wrapped to style['max_width'], and the
+    height of the block (ink top of the first line to ink bottom of the last).
+    """
+    lines = [text] if not style['max_width'] else textlayout.wrap(font, text, style['max_width'])
+    if hasattr(font, 'size'):
+        step = round(font.size * style['line_height'])
+    else:
+        # PIL's bitmap fallback font has no size; measure a line instead
+        top, bottom = textlayout.bbox(font, 'Ag')[1::2]
+        step = round((bottom - top) * style['line_height'])
+    placed = [((xy[0], xy[1] + index * step), line) for index, line in enumerate(lines)]
+
+    top = textlayout.bbox(font, placed[0][1], placed[0][0])[1]
+    bottom = textlayout.bbox(font, placed[-1][1], placed[-1][0])[3]
+    return placed, bottom - top
+
+
+def layout(headline, subheadline, cta, faces, style=None):
+    """Elements of one headline block in image coordinates, in paint order"""
+    style = dict(DEFAULT_STYLE, **(style or {}))
+    if style['position'] is not None:
+        x, y = style['position']
+    else:
+        x = style['margin']
+        y = style['margin'] + style['offset_y']
+    shadow = style['shadow_offset']
+
+    headline_lines, headline_height = _lines(faces['headline'], headline, (x, y), style)
+    sub_y = y + headline_height + style['headline_gap']
+    sub_lines, sub_height = _lines(faces['subheadline'], subheadline, (x, sub_y), style)
+    cta_y = sub_y + sub_height + style['cta_gap']
+
+    cta_box = textlayout.bbox(faces['cta'], cta)
+    pad_x, pad_y = style['cta_padding']
+    button = (x, cta_y, x + cta_box[2] - cta_box[0] + pad_x * 2, cta_y + cta_box[3] - cta_box[1] + pad_y * 2)
+    button_shadow = tuple(value + shadow for value in button)
+
+    elements = []
+    for (line_x, line_y), line in headline_lines:
+        elements.append(Element(
+            'text', (line_x + shadow, line_y + shadow), line, faces['headline'], style['shadow_color'],
+        ))
+    for xy, line in headline_lines:
+        elements.append(Element('text', xy, line, faces['headline'], style['headline_color']))
+    for xy, line in sub_lines:
+        elements.append(Element('text', xy, line, faces['subheadline'], style['subheadline_color']))
+
+    return elements + [
+        Element('box', button_shadow, style['cta_radius'], None, style['shadow_color']),
+        Element('box', button, style['cta_radius'], None, style['cta_background']),
+        Element('text', (x + pad_x, cta_y + pad_y), cta, faces['cta'], style['cta_color']),
+    ]
+
+
+def _element_bbox(element):
+    if element.kind == 'text':
+        return textlayout.bbox(element.font, element.value, element.xy)
+    # Rectangles include their right/bottom edge
+    x0, y0, x1, y1 = element.xy
+    return x0, y0, x1 + 1, y1 + 1
+
+
+def bounds(elements, size=None):
+    """Union box of elements, clipped to an image of size if given"""
+    boxes = [_element_bbox(element) for element in elements]
+    x0, y0 = min(box[0] for box in boxes), min(box[1] for box in boxes)
+    x1, y1 = max(box[2] for box in boxes), max(box[3] for box in boxes)
+    if size is not None:
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, size[0]), min(y1, size[1])
+    return x0, y0, max(x1, x0 + 1), max(y1, y0 + 1)
+
+
+def _blend(layer, mask, position, color):
+    """Alpha-blend color through an 'L' coverage mask placed at position on layer"""
+    x, y = position
+    # Clip to the layer; alpha_composite() only takes in-bounds destinations
+    left, top = max(-x, 0), max(-y, 0)
+    right, bottom = min(mask.width, layer.width - x), min(mask.height, layer.height - y)
+    if left >= right or top >= bottom:
+        return
+    if (left, top, right, bottom) != (0, 0, mask.width, mask.height):
+        mask = mask.crop((left, top, right, bottom))
+
+    from PIL import Image
+
+    red, green, blue, alpha = color
+    if alpha < 255:
+        mask = mask.point(lambda value: value * alpha // 255)
+    solid = Image.new('RGBA', mask.size, (red, green, blue, 0))
+    solid.putalpha(mask)
+    layer.alpha_composite(solid, dest=(x + left, y + top))
+
+
+def _paint(layer, element, origin):
+    """Alpha-blend one element onto layer, whose top-left sits at origin"""
+    if element.kind == 'text':
+        # Shadow and fill passes share the cached glyph coverage
+        run = textlayout.layout(element.font, element.value)
+        position = (element.xy[0] + run.bbox[0] - origin[0], element.xy[1] + run.bbox[1] - origin[1])
+        _blend(layer, run.mask, position, element.color)
+        return
+
+    from PIL import Image, ImageDraw
+
+    x0, y0, x1, y1 = element.xy
+    mask = Image.new('L', (x1 - x0 + 1, y1 - y0 + 1), 0)
+    ImageDraw.Draw(mask).rounded_rectangle([0, 0, x1 - x0, y1 - y0], radius=element.value, fill=255)
+    _blend(layer, mask, (x0 - origin[0], y0 - origin[1]), element.color)
+
+
+def block_box(headline, subheadline, cta, faces, style=None, size=None):
+    """Box the headline block covers, without painting it"""
+    return bounds(layout(headline, subheadline, cta, faces, style), size)
+
+
+def headline_layer(headline, subheadline, cta, faces, style=None, size=None):
+    """
+    Paint a headline block into a transparent layer.
+
+    Returns (layer, (x, y)): the RGBA layer cropped to the block and its
+    position in the base image. size clips the block to the base image.
+    """
+    from PIL import Image
+
+    elements = layout(headline, subheadline, cta, faces, style)
+    box = bounds(elements, size)
+    layer = Image.new('RGBA', (box[2] - box[0], box[3] - box[1]), (0, 0, 0, 0))
+    for element in elements:
+        _paint(layer, element, box[:2])
+    return layer, box[:2]
+
+
+class BaseImage:
+    """A base image decoded once, shared by every variation drawn over it"""
+
+    def __init__(self, source):
+        from PIL import Image
+
+        image = Image.open(source) if not isinstance(source, Image.Image) else source
+        image.load()
+        self.path = source if isinstance(source, str) else getattr(image, 'filename', '')
+        self.image = image.convert('RGB') if image.mode != 'RGB' else image
+        self.size = self.image.size
+
+    def region(self, layer, position):
+        """The changed region: the base crop under layer with layer blended in"""
+        x, y = position
+        region = self.image.crop((x, y, x + layer.width, y + layer.height)).convert('RGBA')
+        region.alpha_composite(layer)
+        return region.convert('RGB')
+
+    def composite(self, layer, position):
+        """Copy of the base with layer blended in at position (only that region is touched)"""
+        output = self.image.copy()
+        output.paste(self.region(layer, position), position)
+        return output
+
+
+def sidecar_path(output_path):
+    """placement.json next to a layer/region output"""
+    return os.path.splitext(output_path)[0] + '.json'
+
+
+def output_image(base, layer, position, emit=EMIT_FULL):
+    """The image a variation writes in one of the EMIT_MODES"""
+    if emit == EMIT_FULL:
+        return base.composite(layer, position)
+    if emit == EMIT_LAYER:
+        return layer
+    return base.region(layer, position)
+
+
+def check_codec(codec, emit):
+    """Reject codecs that would drop the transparency of EMIT_LAYER outputs"""
+    if emit == EMIT_LAYER and codec.format == 'JPEG':
+        raise ValueError(f"'{codec.name}' has no alpha channel; use png or webp for --emit layer")
+
+
+def save(base, layer, position, output_path, emit=EMIT_FULL, codec=None, max_bytes=None):
+    """Write a variation in one of the EMIT_MODES (the image only, see write_placement)"""
+    codec = codec or encode.PROFILES[encode.DEFAULT_PROFILE]
+    check_codec(codec, emit)
+    encode.save(output_image(base, layer, position, emit), output_path, codec, max_bytes)
+
+
+def write_placement(output_path, base_path, box, emit):
+    """
+    JSON sidecar telling downstream tools where a layer/region output goes.
+
+    Written separately from the image so it is refreshed even when the
+    image itself comes from the build cache.
+    """
+    placement = {
+        'base': base_path,
+        'mode': emit,
+        'x': box[0],
+        'y': box[1],
+        'width': box[2] - box[0],
+        'height': box[3] - box[1],
+    }
+    with open(sidecar_path(output_path), 'w', encoding='utf-8') as handle:
+        json.dump(placement, handle, indent=2)
+        handle.write('\n')
@@ -0,0 +1,163 @@
+"""
+Overlay layers drawn on top of rendered heroes
+
+Static overlays (the safe area guide, or any decoration that depends only
+on the canvas size) are drawn once per key and cached as OverlayLayers:
+the flat indices of the pixels they cover, their color premultiplied by
+alpha and their inverse alpha. Blending one onto a render, or onto a
+tiled band, is a single vectorized gather/blend/scatter over the covered
+pixels instead of drawing a full-canvas RGBA guide and alpha-compositing
+a copy of the render. The arithmetic is Pillow's alpha_composite for
+opaque destinations, so the output is unchanged.
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from imaging import fonts
+from imaging.lru import LRUCache
+
+# Label font candidates, resolved via imaging.fonts
+LABEL_FONTS = ('Helvetica.ttc',) + fonts.SANS_FONTS
+
+DEFAULT_MARGIN = 120
+
+# Layers are drawn in bands of at most this many pixels, so guides for
+# print-size canvases never need a full-canvas RGBA image
+DRAW_BAND_PIXELS = 1 << 22
+
+# Pillow's fixed-point precision in alpha_composite
+_PRECISION_BITS = 7
+
+_layers = LRUCache(maxsize=16)
+
+
+class OverlayLayer:
+    """Sparse, premultiplied RGBA layer of a width x height canvas"""
+
+    def __init__(self, width, height, index, color, inverse_alpha):
+        self.width, self.height = width, height
+        self.index = index                  # sorted flat pixel indices (y * width + x)
+        self.color = color                  # (n, 3) uint16, rgb * alpha
+        self.inverse_alpha = inverse_alpha  # (n,) uint16, 255 - alpha
+
+    @classmethod
+    def draw(cls, width, height, paint):
+        """Layer from paint(draw, offset), which draws the full canvas shifted by offset"""
+        rows = max(1, DRAW_BAND_PIXELS // width)
+        indices, colors, alphas = [], [], []
+        for y0 in range(0, height, rows):
+            band = Image.new('RGBA', (width, min(rows, height - y0)), (0, 0, 0, 0))
+            paint(ImageDraw.Draw(band), (0, -y0))
+            pixels = np.asarray(band).reshape(-1, 4)
+            covered = np.flatnonzero(pixels[:, 3])
+            indices.append(covered + y0 * width)
+            colors.append(pixels[covered, :3])
+            alphas.append(pixels[covered, 3])
+
+        alpha = np.concatenate(alphas).astype(np.uint16)
+        color = np.concatenate(colors).astype(np.uint16) * alpha[:, None]
+        return cls(width, height, np.concatenate(indices), color, 255 - alpha)
+
+    @property
+    def nbytes(self):
+        return self.index.nbytes + self.color.nbytes + self.inverse_alpha.nbytes
+
+    def blend(self, pixels, y0=0):
+        """
+        Composite the layer onto pixels in place: a (rows, width, 3|4) uint8
+        array holding canvas rows y0 onward, assumed opaque.
+        """
+        rows, width = pixels.shape[:2]
+        if width != self.width:
+            raise ValueError(f"Overlay is {self.width} pixels wide, rows are {width}")
+        start, stop = np.searchsorted(self.index, (y0 * width, (y0 + rows) * width))
+        if start == stop:
+            return pixels
+
+        flat = pixels.reshape(-1, pixels.shape[2])
+        index = self.index[start:stop] - y0 * width
+        total = self.color[start:stop] + flat[index, :3].astype(np.uint32) * self.inverse_alpha[start:stop, None]
+        # Pillow's rounded division by 255 at 7-bit precision
+        total = (total << _PRECISION_BITS) + (0x80 << _PRECISION_BITS)
+        flat[index, :3] = ((((total >> 8) + total) >> 8) >> _PRECISION_BITS).astype(np.uint8)
+        return pixels
+
+    def composite(self, image):
+        """Copy of image with the layer on top (RGB and opaque RGBA stay in their mode)"""
+        if image.mode == 'RGB' or (image.mode == 'RGBA' and image.getextrema()[3][0] == 255):
+            pixels = np.array(image)
+            return Image.fromarray(self.blend(pixels), image.mode)
+        return Image.alpha_composite(image.convert('RGBA'), self.image())
+
+    def image(self):
+        """The layer as a straight-alpha RGBA image, e.g. to write as a sidecar file"""
+        alpha = 255 - self.inverse_alpha
+        pixels = np.zeros((self.height * self.width, 4), dtype=np.uint8)
+        # Exact: color was rgb * alpha
+        pixels[self.index, :3] = self.color // alpha[:, None]
+        pixels[self.index, 3] = alpha
+        return Image.fromarray(pixels.reshape(self.height, self.width, 4), 'RGBA')
+
+
+def overlay_layer(key, width, height, paint):
+    """Cached OverlayLayer for key, drawn by paint(draw, offset) on first use"""
+    return _layers.get_or_create((key, width, height), lambda: OverlayLayer.draw(width, height, paint))
+
+
+def _draw_safe_area_guide(draw, width, height, margin, offset=(0, 0)):
+    """Draw the guide for a width x height canvas, shifted by offset"""
+    dx, dy = offset
+
+    # Draw safe area rectangle
+    draw.rectangle(
+        [margin + dx, margin + dy, width - margin + dx, height - margin + dy],
+        outline=(255, 0, 0, 128),
+        width=3
+    )
+
+    # Add corner markers
+    corner_size = 40
+    for x, y in [(margin, margin), (width - margin, margin),
+                 (margin, height - margin), (width - margin, height - margin)]:
+        x, y = x + dx, y + dy
+        # Horizontal line
+        draw.line([(x - corner_size, y), (x + corner_size, y)], fill=(255, 0, 0, 128), width=2)
+        # Vertical line
+        draw.line([(x, y - corner_size), (x, y + corner_size)], fill=(255, 0, 0, 128), width=2)
+
+    # Add label
+    font = fonts.truetype(24, LABEL_FONTS)
+
+    label = f"Safe Area: {margin}px margin"
+    draw.text((margin + 20 + dx, margin - 50 + dy), label, fill=(255, 0, 0, 180), font=font)
+
+
+def safe_area_layer(width, height, margin=DEFAULT_MARGIN):
+    """Cached OverlayLayer of the safe area guide"""
+    return overlay_layer(
+        ('safe-area', margin), width, height,
+        lambda draw, offset: _draw_safe_area_guide(draw, width, height, margin, offset),
+    )
+
+
+def create_safe_area_guide(width, height, margin=DEFAULT_MARGIN):
+    """Create safe area guide overlay"""
+    return safe_area_layer(width, height, margin).image()
+
+
+def apply_safe_area_guide(image, margin=DEFAULT_MARGIN):
+    """Copy of image with the safe area guide on top"""
+    return safe_area_layer(image.width, image.height, margin).composite(image)
+
+
+def apply_safe_area_guide_rows(rows, y0, height, margin=DEFAULT_MARGIN):
+    """
+    Composite the guide of a full canvas onto rows, a (n, width, 3) uint8
+    band starting at canvas row y0, in place. Used by tiled renders.
+    """
+    return safe_area_layer(rows.shape[1], height, margin).blend(rows, y0)
+
+
+def clear_cache():
+    _layers.clear()
@@ -0,0 +1,240 @@
+"""
+Per-stage timing and memory instrumentation for hero renders
+
+A Profiler records, for every (run, stage) pair, how often the stage ran,
+its total wall time and the process memory at the end of the stage:
+
+    rss_mb          resident set size (Linux only, None elsewhere)
+    peak_rss_mb     process high-water mark so far (ru_maxrss)
+    traced_peak_mb  peak Python/NumPy allocation inside the stage, only
+                    with trace_memory=True (tracemalloc, noticeably slower;
+                    Pillow's own image buffers are not traced)
+
+A run is whatever is being produced (an output file, or the decoded source
+for the 'load' stage). Stages must not nest: tracemalloc peaks are reset
+when a stage starts. Code that is handed no profiler uses NULL_PROFILER,
+whose stages cost nothing.
+
+Reports are written as JSON or CSV (picked by file extension) so renders
+can be compared across releases; --cprofile additionally dumps cProfile
+stats for the whole run.
+"""
+
+import cProfile
+import csv
+import datetime
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import imaging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ('load', 'scale', 'shadow', 'gradient', 'device', 'vignette', 'grain', 'contrast', 'overlay', 'save')
+
+REPORT_FIELDS = ('run', 'stage', 'calls', 'seconds', 'rss_mb', 'peak_rss_mb', 'traced_peak_mb')
+
+_MB = 1024 * 1024
+
+
+def add_profile_arguments(parser):
+    """Add the shared --profile / --trace-memory / --cprofile options to an argparse parser"""
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', metavar='REPORT', default=None,
+                       help="write per-stage timing and memory to REPORT (.json or .csv)")
+    group.add_argument('--trace-memory', action='store_true',
+                       help="with --profile, also record per-stage allocation peaks (tracemalloc)")
+    group.add_argument('--cprofile', metavar='STATS', default=None,
+                       help="run under cProfile and dump stats to STATS (in-process work only)")
+    return group
+
+
+def profiler_from_args(args):
+    """Profiler configured from add_profile_arguments() options, or None without --profile"""
+    if not args.profile:
+        return None
+    return Profiler(trace_memory=args.trace_memory)
+
+
+def rss_bytes():
+    """Current resident set size, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm', encoding='ascii') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes():
+    """Process peak resident set size so far, or None without the resource module"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _megabytes(value):
+    return None if value is None else round(value / _MB, 1)
+
+
+class _NullProfiler:
+    """Stand-in used when profiling is off"""
+
+    def stage(self, name):
+        return nullcontext()
+
+    def run(self, label):
+        return nullcontext()
+
+    def add(self, name, seconds, run=''):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+class Profiler:
+    """Collects per-(run, stage) timings; see the module docstring"""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.rows = {}
+        self._runs = ['']
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def run(self, label):
+        """Attribute stages inside the block to run label"""
+        self._runs.append(str(label))
+        try:
+            yield
+        finally:
+            self._runs.pop()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as stage name of the current run"""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            traced_peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+            self._record(self._runs[-1], name, seconds, traced_peak)
+
+    def add(self, name, seconds, run=''):
+        """Record a stage timed elsewhere, e.g. on an encoder thread"""
+        self._record(str(run), name, seconds, None)
+
+    def _record(self, run, name, seconds, traced_peak):
+        key = (run, name)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = dict.fromkeys(REPORT_FIELDS)
+            row.update(run=key[0], stage=name, calls=0, seconds=0.0)
+
+        row['calls'] += 1
+        row['seconds'] += seconds
+        row['rss_mb'] = _megabytes(rss_bytes())
+        row['peak_rss_mb'] = _megabytes(peak_rss_bytes())
+        if traced_peak is not None:
+            row['traced_peak_mb'] = max(row['traced_peak_mb'] or 0.0, _megabytes(traced_peak))
+
+    def report_rows(self):
+        """Recorded rows in pipeline stage order, seconds rounded to microseconds"""
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        rows = sorted(self.rows.values(), key=lambda row: (row['run'], order.get(row['stage'], len(order))))
+        return [dict(row, seconds=round(row['seconds'], 6)) for row in rows]
+
+    def extend(self, rows):
+        """Merge report rows collected by another process (e.g. a batch worker)"""
+        for row in rows:
+            key = (row['run'], row['stage'])
+            if key in self.rows:
+                merged = self.rows[key]
+                merged['calls'] += row['calls']
+                merged['seconds'] += row['seconds']
+                for field in ('rss_mb', 'peak_rss_mb', 'traced_peak_mb'):
+                    if row[field] is not None:
+                        merged[field] = max(merged[field] or 0.0, row[field])
+            else:
+                self.rows[key] = dict(row)
+
+
+def stage_totals(rows):
+    """{stage: total seconds} over all runs, in pipeline order"""
+    totals = {}
+    for row in rows:
+        totals[row['stage']] = totals.get(row['stage'], 0.0) + row['seconds']
+    order = {stage: index for index, stage in enumerate(STAGES)}
+    return dict(sorted(totals.items(), key=lambda item: order.get(item[0], len(order))))
+
+
+def write_report(path, rows, tool, trace_memory=False):
+    """Write rows as CSV (for .csv paths) or a JSON document with run metadata"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+
+    report = {
+        'tool': tool,
+        'version': imaging.__version__,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'trace_memory': trace_memory,
+        'totals': {stage: round(seconds, 6) for stage, seconds in stage_totals(rows).items()},
+        'stages': rows,
+    }
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+        handle.write('\n')
+
+
+def summary_lines(rows):
+    """Human-readable per-stage totals"""
+    totals = stage_totals(rows)
+    overall = sum(totals.values()) or 1.0
+    peak = max((row['peak_rss_mb'] for row in rows if row['peak_rss_mb'] is not None), default=None)
+
+    lines = [f"   {stage:<10} {seconds:7.3f}s {seconds / overall:6.1%}" for stage, seconds in totals.items()]
+    if peak is not None:
+        lines.append(f"   peak RSS   {peak:.0f} MB")
+    return lines
+
+
+@contextmanager
+def cprofiled(path, limit=20):
+    """Run the block under cProfile; dump stats to path and print the top entries"""
+    if not path:
+        yield
+        return
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        pstats.Stats(profile).sort_stats('cumulative').print_stats(limit)
@@ -0,0 +1,75 @@
+"""
+Render-size-aware resampling
+
+Large design-tool exports (6000px+) are first shrunk by an integer factor
+with Image.reduce() (a cheap box filter), or decoded at reduced scale with
+Image.draft() for JPEG sources, and only the last step uses the quality
+filter. The integer step always leaves `headroom` times the target size, so
+the final filter still has enough source pixels to work with.
+
+Quality modes trade filter cost against sharpness:
+
+    final      LANCZOS from >= 3x the target (release renders)
+    balanced   BICUBIC from >= 2x the target
+    preview    BILINEAR from >= 1x the target (bulk previews)
+"""
+
+import math
+from collections import namedtuple
+
+# resample names a PIL.Image.Resampling filter (resolved when resizing, so
+# importing this module does not load Pillow)
+QualityProfile = namedtuple('QualityProfile', 'resample headroom')
+
+QUALITY_PROFILES = {
+    'final': QualityProfile('LANCZOS', 3.0),
+    'balanced': QualityProfile('BICUBIC', 2.0),
+    'preview': QualityProfile('BILINEAR', 1.0),
+}
+
+DEFAULT_QUALITY = 'final'
+
+
+def quality_profile(quality):
+    if quality not in QUALITY_PROFILES:
+        raise ValueError(f"Unknown quality '{quality}' (expected one of: {', '.join(QUALITY_PROFILES)})")
+    return QUALITY_PROFILES[quality]
+
+
+def reduction_factor(source_size, target_size, quality=DEFAULT_QUALITY):
+    """Largest integer factor that keeps the source >= headroom x target on both axes"""
+    headroom = quality_profile(quality).headroom
+    factor = min(
+        source_size[0] / (target_size[0] * headroom),
+        source_size[1] / (target_size[1] * headroom),
+    )
+    return max(1, int(factor))
+
+
+def draft_size(target_size, quality=DEFAULT_QUALITY):
+    """Smallest decode size worth requesting from Image.draft() for target_size"""
+    headroom = quality_profile(quality).headroom
+    return (math.ceil(target_size[0] * headroom), math.ceil(target_size[1] * headroom))
+
+
+def reduce(image, factor):
+    """Integer downscale (box filter); factor 1 returns image unchanged"""
+    if factor <= 1:
+        return image
+    return image.reduce(factor)
+
+
+def resize(image, size, quality=DEFAULT_QUALITY, source=None):
+    """
+    Resize image to size using the quality profile's filter.
+
+    source, if given, is an already reduced copy of image to resample from.
+    """
+    from PIL import Image
+
+    profile = quality_profile(quality)
+    if source is None:
+        source = reduce(image, reduction_factor(image.size, size, quality))
+    if source.size == tuple(size):
+        return source.copy()
+    return source.resize(size, Image.Resampling[profile.resample])
@@ -0,0 +1,235 @@
+"""
+Persistent job server for the image tools
+
+Starting Python and importing NumPy and Pillow takes longer than many
+single renders. The server keeps one warm process (modules imported, font
+index built, caches alive) and runs tool invocations sent to it:
+
+    cd scripts/tools
+    python3 -m imaging.server --socket /tmp/tier-imaging.sock   # Unix socket
+    python3 -m imaging.server --stdio                           # stdin/stdout
+
+Jobs and replies are single JSON lines:
+
+    {"id": 7, "tool": "mockup-enhancer", "args": ["--batch", "in/"], "cwd": "/work"}
+    {"id": 7, "status": 0, "output": "...", "seconds": 1.42}
+
+Jobs run one at a time in the job's cwd, with their console output
+captured into the reply. Module caches outlive each job; the ones keyed
+by input path also key on the file's size and mtime, so an input
+rewritten between jobs is decoded again. With $TIER_IMAGING_SOCKET naming a running
+server, mockup-enhancer.py and add-headline.py forward their arguments to
+it (forward()) and print its reply, so each invocation skips the cold
+start; without a reachable server they run locally as before.
+
+Only the standard library is imported here; forwarding clients never load
+NumPy or Pillow.
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+
+SOCKET_ENV = 'TIER_IMAGING_SOCKET'
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOL_SCRIPTS = {
+    'mockup-enhancer': 'mockup-enhancer.py',
+    'add-headline': 'add-headline.py',
+}
+
+# Set while this process serves jobs, so the tools do not forward to themselves
+_serving = False
+_tools = {}
+
+
+def load_tool(name):
+    """A tool script loaded as a module (once per process)"""
+    if name not in TOOL_SCRIPTS:
+        raise ValueError(f"Unknown tool '{name}' (expected one of: {', '.join(TOOL_SCRIPTS)})")
+    if name not in _tools:
+        path = os.path.join(TOOLS_DIR, TOOL_SCRIPTS[name])
+        spec = importlib.util.spec_from_file_location(name.replace('-', '_'), path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _tools[name] = module
+    return _tools[name]
+
+
+def warm_up():
+    """Import the rendering stack and scan fonts before the first job arrives"""
+    from imaging import fonts, headline, overlays, session, variations  # noqa: F401
+
+    fonts.font_index()
+    for name in TOOL_SCRIPTS:
+        load_tool(name)
+
+
+def _exit_status(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    # sys.exit("message") prints the message and exits with 1
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run_job(job):
+    """Run one job dict in this process; returns the reply dict"""
+    started = time.perf_counter()
+    output = io.StringIO()
+    status = 0
+    cwd, argv = os.getcwd(), sys.argv
+    args = job.get('args', [])
+    if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+        return _rejected(job, "'args' must be a list of strings")
+    if job.get('tool') not in TOOL_SCRIPTS:
+        return _rejected(job, f"Unknown tool '{job.get('tool')}' (expected one of: {', '.join(TOOL_SCRIPTS)})")
+
+    try:
+        tool = load_tool(job['tool'])
+        os.chdir(job.get('cwd') or cwd)
+        # Usage and error messages name the tool, as they would when run directly
+        sys.argv = [TOOL_SCRIPTS[job['tool']]] + args
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                tool.main(args)
+            except SystemExit as e:
+                status = _exit_status(e.code)
+    except Exception:
+        status = 1
+        output.write(traceback.format_exc())
+    finally:
+        os.chdir(cwd)
+        sys.argv = argv
+
+    return {
+        'id': job.get('id'),
+        'status': status,
+        'output': output.getvalue(),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def _rejected(job, message):
+    return {'id': job.get('id'), 'status': 2, 'output': f"Invalid job: {message}\n", 'seconds': 0.0}
+
+
+def _reply(line):
+    try:
+        job = json.loads(line)
+    except ValueError as e:
+        return _rejected({}, e)
+    if not isinstance(job, dict):
+        return _rejected({}, "a job must be a JSON object")
+    return run_job(job)
+
+
+def serve_stream(infile, outfile):
+    """Answer JSON-line jobs from infile on outfile until EOF"""
+    for line in infile:
+        if line.strip():
+            outfile.write(json.dumps(_reply(line)) + '\n')
+            outfile.flush()
+
+
+def serve_socket(path):
+    """Answer jobs on a Unix socket at path until interrupted"""
+    if os.path.exists(path):
+        # A previous server may have died without cleaning up
+        probe = socket.socket(socket.AF_UNIX)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise OSError(f"A server is already listening on {path}")
+        finally:
+            probe.close()
+
+    listener = socket.socket(socket.AF_UNIX)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    listener.listen()
+    try:
+        while True:
+            connection, _ = listener.accept()
+            with connection, connection.makefile('r', encoding='utf-8') as reader, \
+                    connection.makefile('w', encoding='utf-8') as writer:
+                serve_stream(reader, writer)
+    finally:
+        listener.close()
+        os.unlink(path)
+
+
+def forward(tool, argv, path=None):
+    """
+    Run a tool invocation on the server at path (default: $TIER_IMAGING_SOCKET).
+
+    Prints the captured output and returns the exit status, or None when
+    no server is configured or reachable (the caller then runs locally).
+    """
+    path = path or os.environ.get(SOCKET_ENV)
+    if not path or _serving:
+        return None
+
+    client = socket.socket(socket.AF_UNIX)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+
+    job = {'tool': tool, 'args': list(argv), 'cwd': os.getcwd()}
+    with client, client.makefile('rw', encoding='utf-8') as stream:
+        stream.write(json.dumps(job) + '\n')
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        print(f"❌ Image server at {path} closed the connection", file=sys.stderr)
+        return 1
+
+    reply = json.loads(line)
+    sys.stdout.write(reply['output'])
+    sys.stdout.flush()
+    return reply['status']
+
+
+def main(argv=None):
+    global _serving
+
+    parser = argparse.ArgumentParser(description="Serve image tool jobs from one warm process.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--socket', metavar='PATH', help="listen on a Unix socket")
+    mode.add_argument('--stdio', action='store_true', help="read jobs from stdin, reply on stdout")
+    args = parser.parse_args(argv)
+
+    _serving = True
+    warm_up()
+    if args.stdio:
+        serve_stream(sys.stdin, sys.stdout)
+        return
+
+    # Stop cleanly (removing the socket file) on kill as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"🟢 Serving image tool jobs on {args.socket} (export {SOCKET_ENV}={args.socket})", file=sys.stderr)
+    try:
+        serve_socket(args.socket)
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Enhancement session: decode a mockup once, render many output sizes
+
+The source image is opened, decoded and converted to RGBA exactly once.
+Intermediate layers (scaled device, its alpha mask and blurred shadow
+coverage) live in a bounded LRU cache keyed by the size they were built for, so a
+catalog of aspect ratios only pays for what actually differs between them.
+Large sources are shrunk once to an intermediate resolution (see
+imaging.resample) that every variant then resamples from.
+
+render() returns a finished image; render_bands() yields the same canvas
+band by band (imaging.compositor.composite_hero_bands) for outputs too
+large to hold in memory.
+"""
+
+import io
+import logging
+
+import numpy as np
+from PIL import Image
+
+from imaging.compositor import composite_hero, composite_hero_bands
+from imaging.lru import LRUCache
+from imaging.profiling import NULL_PROFILER
+from imaging.resample import DEFAULT_QUALITY, draft_size, reduce, reduction_factor, resize
+from imaging.shadow import DUAL_SHADOW, alpha_digest, alpha_mask, render_shadow_alpha
+
+# Effect parameters for the keynote-style hero render
+DEFAULT_EFFECTS = {
+    'padding': 120,                # Safe area margin
+    'shadow': DUAL_SHADOW,         # Ambient + contact shadow layers
+    'vignette_strength': 0.04,
+    'vignette_falloff': 'linear',
+    'noise_strength': 0.06,
+    'grain_seed': 0,               # Fixed seed keeps renders reproducible
+    'contrast_factor': 1.05,
+    'focus_strength': 0.3,         # Strength of the focal contrast mask
+    'focal_x': 0.52,               # Device center, fraction of the width
+}
+
+
+logger = logging.getLogger(__name__)
+
+
+def _log(message):
+    logger.debug(message.strip())
+
+
+def fit_size(source_size, output_width, output_height, padding):
+    """Largest device size that fits inside the padded canvas"""
+    max_width = output_width - (padding * 2)
+    max_height = output_height - (padding * 2)
+
+    source_width, source_height = source_size
+    scale = min(max_width / source_width, max_height / source_height)
+    return int(source_width * scale), int(source_height * scale)
+
+
+def planned_fit(source_size, sizes, padding=DEFAULT_EFFECTS['padding']):
+    """
+    Device size that a session told about sizes plans its decode and
+    shared intermediate for; with the source, it determines every render.
+    """
+    fits = [fit_size(source_size, width, height, padding) for width, height in sizes]
+    return max(fit[0] for fit in fits), max(fit[1] for fit in fits)
+
+
+def _open(source):
+    """Image.open() for a path, file object or encoded bytes"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    return Image.open(source)
+
+
+class EnhancementSession:
+    """Decoded mockup plus cached per-size layers for rendering hero variants"""
+
+    def __init__(self, source, cache_size=32, progress=None, sizes=None, quality=DEFAULT_QUALITY,
+                 profiler=None):
+        """
+        sizes, if known up front, lists the (width, height) outputs this
+        session will render. All of them then resample from one shared
+        intermediate resolution, and JPEG sources are decoded at reduced
+        scale when even the largest output needs far fewer pixels.
+
+        source may be a path, an open file, encoded image bytes or a PIL
+        image. progress receives status messages (default: the module
+        logger at DEBUG level).
+
+        profiler (see imaging.profiling) times the pipeline stages; it may
+        be swapped later through the profiler attribute.
+        """
+        self.progress = progress or _log
+        self.profiler = profiler or NULL_PROFILER
+        self.quality = quality
+        self._cache = LRUCache(maxsize=cache_size)
+        self._reduction = None
+
+        if isinstance(source, Image.Image):
+            self.source_name = getattr(source, 'filename', '') or '<image>'
+        elif not isinstance(source, str):
+            self.source_name = getattr(source, 'name', '') or '<bytes>'
+        else:
+            self.source_name = str(source)
+            self.progress(f"📂 Loading: {self.source_name}")
+
+        with self.profiler.run(self.source_name), self.profiler.stage('load'):
+            self.original = self._load(source, sizes)
+
+        self.progress(f"   Original size: {self.source_size[0]}x{self.source_size[1]}")
+        if sizes:
+            self._reduction = reduction_factor(self.original.size, planned_fit(self.source_size, sizes), quality)
+
+    def _load(self, source, sizes):
+        if isinstance(source, Image.Image):
+            original = source
+            self.source_size = original.size
+        else:
+            original = _open(source)
+            self.source_size = original.size
+            if sizes:
+                # No-op for formats without draft support (e.g. PNG)
+                original.draft(None, draft_size(planned_fit(self.source_size, sizes), self.quality))
+            original.load()
+
+        if original.mode != 'RGBA':
+            original = original.convert('RGBA')
+        return original
+
+    def fit_size(self, output_width, output_height, padding):
+        """Largest device size that fits inside the padded canvas"""
+        return fit_size(self.source_size, output_width, output_height, padding)
+
+    def intermediate(self, size):
+        """Integer-reduced copy of the original to resample size from (cached)"""
+        factor = reduction_factor(self.original.size, size, self.quality)
+        if self._reduction is not None:
+            # Share the planned intermediate unless this size needs more pixels
+            factor = min(factor, self._reduction)
+        return self._cache.get_or_create(
+            ('intermediate', factor),
+            lambda: reduce(self.original, factor),
+        )
+
+    def scaled(self, size):
+        """Device image resized to size (cached)"""
+        return self._cache.get_or_create(
+            ('scaled', size, self.quality),
+            lambda: resize(self.original, size, self.quality, source=self.intermediate(size)),
+        )
+
+    def scaled_alpha(self, size):
+        """(alpha mask, content digest) of the scaled device (cached)"""
+        def build():
+            alpha = alpha_mask(self.scaled(size))
+            return alpha, alpha_digest(alpha)
+
+        return self._cache.get_or_create(('alpha', size), build)
+
+    def shadow(self, size, layers=DUAL_SHADOW):
+        """(coverage array, margin) of the shadow for the scaled device (cached)"""
+        layers = tuple(layers)
+
+        def build():
+            alpha, digest = self.scaled_alpha(size)
+            return render_shadow_alpha(alpha, layers, digest=digest)
+
+        return self._cache.get_or_create(('shadow', size, layers), build)
+
+    def scaled_pixels(self, size):
+        """Scaled device as a read-only RGBA uint8 array (cached)"""
+        def build():
+            pixels = np.asarray(self.scaled(size))
+            pixels.flags.writeable = False
+            return pixels
+
+        return self._cache.get_or_create(('pixels', size), build)
+
+    def _layers(self, output_width, output_height, params, pixels=True):
+        """Device (array, or image without pixels) and shadow layers with their canvas positions"""
+        # Scale original to fit within canvas (with padding)
+        size = self.fit_size(output_width, output_height, params['padding'])
+        self.progress(f"📐 Scaling to: {size[0]}x{size[1]}")
+        with self.profiler.stage('scale'):
+            device = self.scaled_pixels(size) if pixels else self.scaled(size)
+        with self.profiler.stage('shadow'):
+            shadow, margin = self.shadow(size, params['shadow'])
+
+        # Center position (slightly right for visual balance)
+        center_x = int(output_width * params['focal_x'])
+        center_y = int(output_height * 0.5)
+        shadow_x = center_x - (shadow.shape[1] // 2)
+        shadow_y = center_y - (shadow.shape[0] // 2)
+
+        return {
+            'device': device,
+            'device_position': (shadow_x + margin, shadow_y + margin),
+            'shadow': shadow,
+            'shadow_position': (shadow_x, shadow_y),
+        }
+
+    def render(self, output_width=1920, output_height=1080, effects=None):
+        """Render one hero variant from the cached layers"""
+        params = dict(DEFAULT_EFFECTS, **(effects or {}))
+        final = composite_hero(
+            output_width, output_height, params, progress=self.progress, profiler=self.profiler,
+            **self._layers(output_width, output_height, params),
+        )
+
+        self.progress("✅ Enhancement complete!")
+        return final
+
+    def render_bands(self, output_width, output_height, effects=None):
+        """
+        Tiled render(): yields (y0, rows) uint8 bands top to bottom.
+
+        Only the device-sized uint8 layers (scaled device, alpha and
+        shadow coverage) are kept whole; the canvas itself never exists in
+        memory.
+        """
+        params = dict(DEFAULT_EFFECTS, **(effects or {}))
+        layers = self._layers(output_width, output_height, params, pixels=False)
+        yield from composite_hero_bands(
+            output_width, output_height, params, progress=self.progress, profiler=self.profiler, **layers,
+        )
+        self.progress("✅ Enhancement complete!")
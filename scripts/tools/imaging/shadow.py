@@ -0,0 +1,147 @@
+"""
+Drop-shadow engine for device mockups
+
+Only the alpha mask is blurred (one channel instead of four). Large radii
+are blurred at reduced resolution and upsampled afterwards, and every
+layer (contact, ambient, ...) is merged into one coverage buffer in a
+single pass. Blurred layers are memoized by (alpha hash, offset, blur,
+opacity), so variants that scale the device to the same size reuse each
+other's work.
+"""
+
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from imaging.lru import LRUCache
+
+# blur is the canvas margin in px; the Gaussian radius is blur / 2
+ShadowLayer = namedtuple('ShadowLayer', 'offset_x offset_y blur opacity')
+
+# Close, sharper shadow
+CONTACT_SHADOW = ShadowLayer(offset_x=0, offset_y=12, blur=24, opacity=0.12)
+# Far, softer shadow
+AMBIENT_SHADOW = ShadowLayer(offset_x=0, offset_y=48, blur=96, opacity=0.06)
+# Bottom to top
+DUAL_SHADOW = (AMBIENT_SHADOW, CONTACT_SHADOW)
+
+# Large radii are blurred on a grid reduced until the radius is about this size
+DOWNSAMPLED_RADIUS = 8
+MAX_DOWNSAMPLE = 4
+
+# Rows merged per pass when combining layers
+STRIP_HEIGHT = 512
+
+_cache = LRUCache(maxsize=16)
+
+
+def alpha_mask(image):
+    """Alpha channel of image as an 'L' mask (opaque if it has none)"""
+    if image.mode == 'RGBA':
+        return image.getchannel('A')
+    return Image.new('L', image.size, 255)
+
+
+def alpha_digest(alpha):
+    """Content hash of an alpha mask, used as the memoization key"""
+    digest = hashlib.blake2b(alpha.tobytes(), digest_size=16)
+    digest.update(f"{alpha.width}x{alpha.height}".encode())
+    return digest.hexdigest()
+
+
+def blur_alpha(alpha, radius):
+    """Gaussian-blur an 'L' mask, downsampling first for large radii"""
+    if radius <= 0:
+        return alpha
+
+    factor = min(MAX_DOWNSAMPLE, int(radius // DOWNSAMPLED_RADIUS))
+    if factor < 2:
+        return alpha.filter(ImageFilter.GaussianBlur(radius=radius))
+
+    small = alpha.reduce(factor)
+    small = small.filter(ImageFilter.GaussianBlur(radius=radius / factor))
+    # Map the reduced grid back exactly (reduce() rounds partial blocks up)
+    box = (0, 0, alpha.width / factor, alpha.height / factor)
+    return small.resize(alpha.size, Image.Resampling.BILINEAR, box=box)
+
+
+def _layer_alpha(alpha, digest, layer):
+    """Blurred uint8 alpha for one layer, padded by layer.blur on every side"""
+    key = ('layer', digest, layer)
+
+    def build():
+        pad = layer.blur
+        padded = Image.new('L', (alpha.width + pad * 2, alpha.height + pad * 2), 0)
+        padded.paste(alpha, (pad, pad))
+        values = np.asarray(blur_alpha(padded, layer.blur / 2))
+        values.flags.writeable = False
+        return values
+
+    return _cache.get_or_create(key, build)
+
+
+def render_shadow_alpha(alpha, layers=DUAL_SHADOW, digest=None):
+    """
+    Combined shadow coverage for an alpha mask.
+
+    Returns (coverage, margin): a read-only uint8 array sized
+    alpha.size + 2 * margin, where margin is the largest layer blur. The
+    device belongs at (margin, margin) inside it.
+    """
+    layers = tuple(ShadowLayer(*layer) for layer in layers)
+    digest = digest or alpha_digest(alpha)
+    key = ('coverage', digest, layers)
+
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    margin = max(layer.blur for layer in layers)
+    width, height = alpha.width + margin * 2, alpha.height + margin * 2
+    placed = []
+    for layer in layers:
+        # Padded layer origin relative to the combined canvas
+        values = _layer_alpha(alpha, digest, layer)
+        placed.append((values, margin + layer.offset_x - layer.blur, margin + layer.offset_y - layer.blur,
+                       np.float32(layer.opacity / 255)))
+
+    # Alpha "over" for black layers: coverage = 1 - prod(1 - a_i), merged in
+    # row strips so the float32 temporaries stay small for large devices
+    coverage = np.empty((height, width), dtype=np.uint8)
+    for top in range(0, height, STRIP_HEIGHT):
+        bottom = min(top + STRIP_HEIGHT, height)
+        transparency = np.ones((bottom - top, width), dtype=np.float32)
+        for values, x, y, opacity in placed:
+            x0, y0 = max(x, 0), max(y, top)
+            x1 = min(x + values.shape[1], width)
+            y1 = min(y + values.shape[0], bottom)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            region = values[y0 - y:y1 - y, x0 - x:x1 - x].astype(np.float32) * opacity
+            transparency[y0 - top:y1 - top, x0:x1] *= 1.0 - region
+        coverage[top:bottom] = np.rint((1.0 - transparency) * 255)
+    coverage.flags.writeable = False
+
+    result = (coverage, margin)
+    _cache.put(key, result)
+    return result
+
+
+def render_shadow(alpha, layers=DUAL_SHADOW, digest=None):
+    """
+    Render shadow layers for an alpha mask in one composite.
+
+    Returns (shadow, margin): a black RGBA image carrying the combined shadow
+    in its alpha channel (see render_shadow_alpha for the geometry).
+    """
+    coverage, margin = render_shadow_alpha(alpha, layers, digest)
+    shadow = Image.new('RGBA', (coverage.shape[1], coverage.shape[0]), (0, 0, 0, 0))
+    shadow.putalpha(Image.fromarray(coverage))
+    return shadow, margin
+
+
+def clear_cache():
+    _cache.clear()
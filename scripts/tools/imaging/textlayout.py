@@ -0,0 +1,74 @@
+"""
+Cached text layout: shape and measure each string once per font
+
+layout(font, text) shapes a string a single time and keeps its ink
+bounding box together with the rendered coverage mask. The text shadow
+and fill passes paste that same mask in two colors, and positioning and
+wrapping read the cached box and advance widths instead of calling
+textbbox()/getlength() on the same glyphs again. Fonts come from
+imaging.fonts, which shares one object per (path, size), so the font
+object itself is a stable cache key.
+"""
+
+from collections import namedtuple
+
+from imaging.lru import LRUCache
+
+# bbox is the ink box relative to the draw origin; mask is an 'L' image of that box
+TextRun = namedtuple('TextRun', 'bbox mask')
+
+_runs = LRUCache(maxsize=2048)
+_widths = LRUCache(maxsize=8192)
+
+
+def _shape(font, text):
+    from PIL import Image, ImageDraw
+
+    bbox = font.getbbox(text)
+    size = (max(bbox[2] - bbox[0], 1), max(bbox[3] - bbox[1], 1))
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, font=font, fill=255)
+    return TextRun(bbox, mask)
+
+
+def layout(font, text):
+    """Shaped TextRun for text in font (cached)"""
+    return _runs.get_or_create((font, text), lambda: _shape(font, text))
+
+
+def bbox(font, text, xy=(0, 0)):
+    """Ink box of text drawn at xy, like ImageDraw.textbbox"""
+    left, top, right, bottom = layout(font, text).bbox
+    return xy[0] + left, xy[1] + top, xy[0] + right, xy[1] + bottom
+
+
+def width(font, text):
+    """Advance width of text (cached)"""
+    return _widths.get_or_create((font, text), lambda: font.getlength(text))
+
+
+def wrap(font, text, max_width):
+    """
+    Greedy word wrap of text into lines no wider than max_width.
+
+    Words wider than max_width get a line of their own. Existing line
+    breaks are kept.
+    """
+    lines = []
+    space = width(font, ' ')
+    for paragraph in text.split('\n'):
+        line, line_width = [], 0.0
+        for word in paragraph.split():
+            word_width = width(font, word)
+            if line and line_width + space + word_width > max_width:
+                lines.append(' '.join(line))
+                line, line_width = [], 0.0
+            line_width += (space if line else 0.0) + word_width
+            line.append(word)
+        lines.append(' '.join(line))
+    return lines
+
+
+def clear_cache():
+    _runs.clear()
+    _widths.clear()
@@ -0,0 +1,386 @@
+"""
+Headline variation manifests and parallel rendering
+
+A manifest lists the variations to draw and, optionally, the base images
+to draw them on. JSON and YAML are both accepted (PyYAML is only imported
+for .yaml/.yml files):
+
+    {
+      "bases": ["heroes/*.png"],
+      "defaults": {"style": {"margin": 140}, "fonts": ["Inter-Bold.ttf"]},
+      "variations": [
+        {"name": "default", "headline": "Elevate Your Golf Game",
+         "subheadline": "...", "cta": "Start Your Journey →",
+         "style": {"headline_color": "#1A1D23", "position": [160, 180]}}
+      ]
+    }
+
+style keys are those of imaging.headline.DEFAULT_STYLE; colors may be
+'#RRGGBB', '#RRGGBBAA' or [r, g, b(, a)]. Relative base paths resolve
+against the manifest's directory.
+
+Every (base, variation) pair is one job. Jobs for one base are handed to
+workers in chunks so each worker decodes a base once, and only a bounded
+number of chunks is in flight at a time, so memory stays flat no matter
+how many variants a campaign has. Within a chunk, finished images go to a
+background encoder (imaging.encode) while the next variation is drawn.
+"""
+
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from imaging import encode, fonts, headline
+from imaging.batch import FAILED, JobResult, check_unique
+from imaging.buildcache import BUILT, build_key
+from imaging.lru import LRUCache
+
+# Tool name in build cache keys
+TOOL_NAME = 'add-headline'
+
+MANIFEST_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# Fonts tried in order when a variation names none (the sans list without Arial)
+VARIATION_FONTS = tuple(font for font in fonts.SANS_FONTS if font != 'Arial.ttf')
+
+DEFAULT_VARIATIONS = (
+    {
+        'name': 'default',
+        'headline': 'Elevate Your Golf Game',
+        'subheadline': 'Professional analytics across all your devices',
+        'cta': 'Start Your Journey →',
+    },
+    {
+        'name': 'data-driven',
+        'headline': 'Data-Driven Golf Excellence',
+        'subheadline': 'Real-time insights from tee to green',
+        'cta': 'Get Started →',
+    },
+    {
+        'name': 'performance',
+        'headline': 'Master Your Performance',
+        'subheadline': 'Track, analyze, and improve every round',
+        'cta': 'Try It Free →',
+    },
+)
+
+TEXT_FIELDS = ('headline', 'subheadline', 'cta')
+COLOR_KEYS = tuple(key for key in headline.DEFAULT_STYLE if key.endswith(('_color', '_background')))
+
+# Output file name without extension; fields: stem, name, emit
+DEFAULT_NAME_TEMPLATE = '{stem}-{name}{emit}'
+
+# Chunks queued per worker; bounds how many decoded bases and results are alive
+IN_FLIGHT_PER_WORKER = 2
+
+
+def parse_color(value):
+    """'#RRGGBB', '#RRGGBBAA' or [r, g, b(, a)] as an RGBA tuple"""
+    if isinstance(value, str):
+        text = value.strip().lstrip('#')
+        if len(text) not in (6, 8):
+            raise ValueError(f"Invalid color '{value}' (expected #RRGGBB or #RRGGBBAA)")
+        try:
+            channels = [int(text[i:i + 2], 16) for i in range(0, len(text), 2)]
+        except ValueError:
+            raise ValueError(f"Invalid color '{value}'") from None
+    else:
+        channels = list(value)
+        if len(channels) not in (3, 4) or not all(isinstance(c, int) and 0 <= c <= 255 for c in channels):
+            raise ValueError(f"Invalid color {value!r} (expected [r, g, b] or [r, g, b, a])")
+
+    if len(channels) == 3:
+        channels.append(255)
+    return tuple(channels)
+
+
+def _normalize_style(style, where):
+    unknown = set(style) - set(headline.DEFAULT_STYLE)
+    if unknown:
+        raise ValueError(f"{where}: unknown style keys {sorted(unknown)}")
+
+    normalized = {}
+    for key, value in style.items():
+        if key in COLOR_KEYS:
+            value = parse_color(value)
+        elif key in ('position', 'cta_padding') and value is not None:
+            value = tuple(int(v) for v in value)
+            if len(value) != 2:
+                raise ValueError(f"{where}: {key} must be a pair of numbers")
+        normalized[key] = value
+    return normalized
+
+
+def normalize_variation(entry, defaults=None):
+    """Validated variation dict with text, style overrides and font candidates"""
+    defaults = defaults or {}
+    name = entry.get('name')
+    if not name or not isinstance(name, str):
+        raise ValueError(f"Variation without a name: {entry!r}")
+    where = f"variation '{name}'"
+
+    variation = {'name': name}
+    for field in TEXT_FIELDS:
+        value = entry.get(field, defaults.get(field))
+        if not isinstance(value, str):
+            raise ValueError(f"{where}: '{field}' must be a string")
+        variation[field] = value
+
+    style = dict(defaults.get('style') or {}, **(entry.get('style') or {}))
+    if style:
+        variation['style'] = _normalize_style(style, where)
+    candidates = entry.get('fonts', defaults.get('fonts'))
+    if candidates:
+        variation['fonts'] = tuple(candidates)
+
+    unknown = set(entry) - {'name', 'style', 'fonts', *TEXT_FIELDS}
+    if unknown:
+        raise ValueError(f"{where}: unknown keys {sorted(unknown)}")
+    return variation
+
+
+def _parse(path, text):
+    if path.lower().endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path}: YAML manifests need PyYAML (pip install pyyaml)") from None
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def load_manifest(path):
+    """
+    Read a variation manifest.
+
+    Returns (bases, variations): base image paths or patterns (absolute or
+    relative to the manifest) and the normalized variation dicts.
+    """
+    with open(path, encoding='utf-8') as handle:
+        data = _parse(path, handle.read())
+    if isinstance(data, list):
+        data = {'variations': data}
+    if not isinstance(data, dict) or not data.get('variations'):
+        raise ValueError(f"{path}: manifest has no variations")
+
+    defaults = data.get('defaults') or {}
+    variations = [normalize_variation(entry, defaults) for entry in data['variations']]
+    names = [variation['name'] for variation in variations]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: duplicate variation names {duplicates}")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    bases = [
+        entry if os.path.isabs(entry) else os.path.join(base_dir, entry)
+        for entry in data.get('bases') or []
+    ]
+    return bases, variations
+
+
+def variation_fonts(variation):
+    return variation.get('fonts') or VARIATION_FONTS
+
+
+def variation_params(variation, emit=headline.EMIT_FULL, codec=None, max_bytes=None):
+    """Everything besides the base image bytes that determines a variation's output"""
+    params = {
+        'variation': variation,
+        'font': fonts.resolve(tuple(variation_fonts(variation))),
+        'style': headline.DEFAULT_STYLE,
+        'emit': emit,
+    }
+    params.update(encode.encode_params(codec or encode.PROFILES[encode.DEFAULT_PROFILE], max_bytes))
+    return params
+
+
+def variation_output(base_image, variation, emit=headline.EMIT_FULL, out_dir=None, codec=None,
+                     template=DEFAULT_NAME_TEMPLATE):
+    """Output path of one variation, e.g. hero-default.png or hero-default-layer.png"""
+    name = template.format(
+        stem=os.path.splitext(os.path.basename(base_image))[0],
+        name=variation['name'],
+        emit='' if emit == headline.EMIT_FULL else f'-{emit}',
+    )
+    directory = os.path.dirname(base_image) if out_dir is None else out_dir
+    return os.path.join(directory, name + (codec.extension if codec else '.png'))
+
+
+def _faces_and_texts(variation):
+    faces = headline.faces(variation_fonts(variation), variation.get('style'))
+    return faces, (variation['headline'], variation['subheadline'], variation['cta'])
+
+
+def draw_variation(base, variation, emit=headline.EMIT_FULL):
+    """The output image of one variation over a decoded BaseImage"""
+    faces, texts = _faces_and_texts(variation)
+    layer, position = headline.headline_layer(*texts, faces, variation.get('style'), size=base.size)
+    return headline.output_image(base, layer, position, emit)
+
+
+def render_variation(base, variation, output_path, emit=headline.EMIT_FULL, codec=None, max_bytes=None):
+    """Draw one variation over a decoded BaseImage and save it"""
+    codec = codec or encode.PROFILES[encode.DEFAULT_PROFILE]
+    headline.check_codec(codec, emit)
+    encode.save(draw_variation(base, variation, emit), output_path, codec, max_bytes)
+
+
+def write_placement(base_image, variation, output_path, emit, size):
+    """Placement sidecar for a layer/region output (recomputed from the layout)"""
+    faces, texts = _faces_and_texts(variation)
+    box = headline.block_box(*texts, faces, variation.get('style'), size=size)
+    headline.write_placement(output_path, base_image, box, emit)
+
+
+# Per-process decoded bases; a worker gets all its chunks of a base in a row
+_bases = LRUCache(maxsize=1)
+
+
+def _decoded(base_image):
+    stat = os.stat(base_image)
+    key = (os.path.abspath(base_image), stat.st_size, stat.st_mtime_ns)
+    return _bases.get_or_create(key, lambda: headline.BaseImage(base_image))
+
+
+def _error(e):
+    return f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+
+
+def _start_job(base_image, variation, output_path, cache, emit, codec, max_bytes, encoder):
+    """
+    Draw one variation and submit it to encoder; returns finish(), which
+    waits for the write and returns the JobResult. Never raises.
+    """
+    started = time.perf_counter()
+    codec = codec or encode.PROFILES[encode.DEFAULT_PROFILE]
+    status, error, pending = None, None, None
+
+    try:
+        headline.check_codec(codec, emit)
+        store = None
+        if cache is not None:
+            key = build_key(base_image, variation_params(variation, emit, codec, max_bytes), TOOL_NAME)
+            status = cache.lookup(key, output_path)
+
+            def store(path):
+                cache.store(key, path)
+
+        if status is None:
+            image = draw_variation(_decoded(base_image), variation, emit)
+            pending = encoder.submit(image, output_path, codec, max_bytes, on_done=store)
+            status = BUILT
+
+        if emit != headline.EMIT_FULL:
+            from PIL import Image
+
+            # Also needed when the image itself came from the cache
+            with Image.open(base_image) as image:
+                size = image.size
+            write_placement(base_image, variation, output_path, emit, size)
+    except Exception as e:
+        status, error = FAILED, _error(e)
+
+    def finish():
+        nonlocal status, error
+        if pending is not None:
+            try:
+                pending.result()
+            except Exception as e:
+                status, error = FAILED, _error(e)
+        return JobResult(base_image, output_path, status, error, time.perf_counter() - started)
+
+    return finish
+
+
+def render_job(base_image, variation, output_path, cache=None, emit=headline.EMIT_FULL, codec=None,
+               max_bytes=None):
+    """Render and save one (base, variation) pair (skipped if cache has it); never raises"""
+    with encode.Encoder(threads=0) as encoder:
+        return _start_job(base_image, variation, output_path, cache, emit, codec, max_bytes, encoder)()
+
+
+def _run_chunk(chunk):
+    """Draw a chunk's variations in a row while the encoder writes the finished ones"""
+    jobs, encode_threads = chunk
+    with encode.Encoder(threads=encode_threads) as encoder:
+        finishers = [_start_job(*job, encoder=encoder) for job in jobs]
+        return [finish() for finish in finishers]
+
+
+def _chunks(bases, variations, out_dir, cache, emit, workers, codec=None, max_bytes=None,
+            encode_threads=encode.DEFAULT_THREADS, template=DEFAULT_NAME_TEMPLATE):
+    """
+    Jobs grouped per base. With more workers than bases, variation lists
+    are split so all workers get work, at the cost of decoding a base
+    once per piece.
+    """
+    size = len(variations)
+    if len(bases) < workers:
+        size = max(1, -(-len(variations) * len(bases) // workers))
+
+    for base_image in bases:
+        jobs = [
+            (base_image, variation, variation_output(base_image, variation, emit, out_dir, codec, template),
+             cache, emit, codec, max_bytes)
+            for variation in variations
+        ]
+        for start in range(0, len(jobs), size):
+            yield jobs[start:start + size], encode_threads
+
+
+def run_variations(bases, variations=DEFAULT_VARIATIONS, out_dir=None, workers=None, progress=None,
+                   cache=None, emit=headline.EMIT_FULL, codec=None, max_bytes=None,
+                   encode_threads=encode.DEFAULT_THREADS, name_template=DEFAULT_NAME_TEMPLATE):
+    """
+    Render every (base, variation) pair on up to workers processes.
+
+    out_dir=None writes next to each base. workers=None uses one process
+    per base, up to the CPU count, so each base is decoded once; workers=1
+    renders in the current process. progress, if given, is called with each JobResult as it
+    finishes. codec, max_bytes and encode_threads select the output
+    encoding (see imaging.encode); name_template names the outputs (see
+    variation_output). Raises ValueError before rendering anything if two
+    jobs would write the same file. Returns the JobResults in completion
+    order.
+    """
+    bases, variations = list(bases), list(variations)
+    check_unique(
+        variation_output(base_image, variation, emit, out_dir, codec, name_template)
+        for base_image in bases for variation in variations
+    )
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(bases))
+    workers = max(1, workers)
+    chunks = _chunks(bases, variations, out_dir, cache, emit, workers, codec, max_bytes, encode_threads,
+                     name_template)
+    results = []
+
+    def collect(chunk_results):
+        for result in chunk_results:
+            results.append(result)
+            if progress:
+                progress(result)
+
+    if workers == 1:
+        for chunk in chunks:
+            collect(_run_chunk(chunk))
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_run_chunk, chunk))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future.result())
+        for future in pending:
+            collect(future.result())
+
+    return results
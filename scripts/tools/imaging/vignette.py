@@ -0,0 +1,177 @@
+"""
+Closed-form radial vignette and focus masks
+
+The alpha for every pixel is computed directly from its distance to the
+focal point instead of stacking 100 full-canvas ellipse fills. Distance and
+falloff fields are cached per canvas size, so the vignette (strength 0.04)
+and the focal contrast mask (strength 0.3) share one computation.
+
+Falloff curves map the normalized distance t (0 at the focal point, 1 at
+the vignette radius) to a weight in [0, 1]:
+
+    linear      1 - t (smooth version of the legacy look, default)
+    quadratic   (1 - t) ** 2
+    smoothstep  1 - smoothstep(t)
+    cosine      (1 + cos(pi * t)) / 2
+    stepped     legacy 100-ring quantization (compatibility mode)
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+# Focal point used by the hero layouts (centered on the device)
+DEFAULT_CENTER = (0.55, 0.5)
+
+# Number of rings the legacy ellipse loop drew
+LEGACY_STEPS = 100
+
+
+def _linear(t):
+    return 1.0 - t
+
+
+def _quadratic(t):
+    return (1.0 - t) ** 2
+
+
+def _smoothstep(t):
+    return 1.0 - t * t * (3.0 - 2.0 * t)
+
+
+def _cosine(t):
+    return (1.0 + np.cos(np.pi * t)) * 0.5
+
+
+def _stepped(t):
+    return 1.0 - _rings(t) / LEGACY_STEPS
+
+
+def _rings(t):
+    # Ring k covers LEGACY_STEPS * t <= k; the innermost ring is k=1
+    return np.maximum(np.ceil(t * LEGACY_STEPS), 1)
+
+
+FALLOFFS = {
+    'linear': _linear,
+    'quadratic': _quadratic,
+    'smoothstep': _smoothstep,
+    'cosine': _cosine,
+    'stepped': _stepped,
+}
+
+
+def _distance(width, height, center, y0, y1):
+    """Normalized distance to the focal point for canvas rows y0:y1"""
+    cx, cy = width * center[0], height * center[1]
+    max_radius = np.sqrt((width / 2) ** 2 + (height / 2) ** 2)
+
+    ys, xs = np.ogrid[y0:y1, 0:width]
+    # Sample at pixel centers, as the rasterized ellipses did
+    dx = (xs + 0.5 - cx).astype(np.float32)
+    dy = (ys + 0.5 - cy).astype(np.float32)
+    return np.sqrt(dx * dx + dy * dy) / np.float32(max_radius)
+
+
+def _weight(t, falloff):
+    if falloff not in FALLOFFS:
+        raise ValueError(f"Unknown falloff '{falloff}' (expected one of: {', '.join(FALLOFFS)})")
+
+    weight = FALLOFFS[falloff](np.minimum(t, 1.0)).astype(np.float32)
+    # The legacy rings never reached pixels outside the half-diagonal circle
+    weight[t > 1.0] = 0.0
+    return weight
+
+
+def _ring_index(t):
+    rings = _rings(t).astype(np.uint8)
+    rings[t > 1.0] = 0
+    return rings
+
+
+def _stepped_lut(strength):
+    # The exact opacity the legacy loop used for each ring
+    return np.array(
+        [0] + [int(255 * strength * (1 - k / LEGACY_STEPS)) for k in range(1, LEGACY_STEPS + 1)],
+        dtype=np.uint8,
+    )
+
+
+# Float fields are full-canvas float32 arrays; keep only a couple of sizes
+@lru_cache(maxsize=2)
+def _distance_field(width, height, center):
+    """Distance to the focal point, normalized by the half-diagonal"""
+    field = _distance(width, height, center, 0, height)
+    field.flags.writeable = False
+    return field
+
+
+@lru_cache(maxsize=2)
+def _weight_field(width, height, falloff, center):
+    """Falloff weight per pixel; zero beyond the vignette radius"""
+    weight = _weight(_distance_field(width, height, center), falloff)
+    weight.flags.writeable = False
+    return weight
+
+
+@lru_cache(maxsize=8)
+def _ring_field(width, height, center):
+    """Legacy ring index per pixel (0 outside the outermost ring)"""
+    rings = _ring_index(_distance_field(width, height, center))
+    rings.flags.writeable = False
+    return rings
+
+
+@lru_cache(maxsize=16)
+def vignette_alpha(width, height, strength=0.04, falloff='linear', center=DEFAULT_CENTER):
+    """Vignette opacity as a read-only (height, width) uint8 array"""
+    if falloff == 'stepped':
+        alpha = _stepped_lut(strength)[_ring_field(width, height, tuple(center))]
+    else:
+        weight = _weight_field(width, height, falloff, tuple(center))
+        alpha = (weight * np.float32(255 * strength)).astype(np.uint8)
+    alpha.flags.writeable = False
+    return alpha
+
+
+@lru_cache(maxsize=16)
+def focus_mask_array(width, height, strength=0.3, falloff='linear', center=DEFAULT_CENTER):
+    """Inverted vignette (center bright, edges dark) as a read-only uint8 array"""
+    mask = 255 - vignette_alpha(width, height, strength, falloff, tuple(center))
+    mask.flags.writeable = False
+    return mask
+
+
+def vignette_rows(width, height, y0, y1, strength=0.04, falloff='linear', center=DEFAULT_CENTER):
+    """
+    Rows y0:y1 of vignette_alpha(), computed without the full-canvas fields.
+
+    Uncached, for tiled renders whose canvas would not fit in memory.
+    """
+    t = _distance(width, height, tuple(center), y0, y1)
+    if falloff == 'stepped':
+        return _stepped_lut(strength)[_ring_index(t)]
+    return (_weight(t, falloff) * np.float32(255 * strength)).astype(np.uint8)
+
+
+def focus_mask_rows(width, height, y0, y1, strength=0.3, falloff='linear', center=DEFAULT_CENTER):
+    """Rows y0:y1 of focus_mask_array() (uncached)"""
+    return 255 - vignette_rows(width, height, y0, y1, strength, falloff, center)
+
+
+def create_vignette(width, height, strength=0.04, falloff='linear', center=DEFAULT_CENTER):
+    """Black RGBA layer carrying the vignette in its alpha channel"""
+    vignette = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    vignette.putalpha(Image.fromarray(vignette_alpha(width, height, strength, falloff, tuple(center))))
+    return vignette
+
+
+def focus_mask(width, height, strength=0.3, falloff='linear', center=DEFAULT_CENTER):
+    """Inverted vignette as an 'L' mask for Image.composite"""
+    return Image.fromarray(focus_mask_array(width, height, strength, falloff, tuple(center)))
+
+
+def clear_cache():
+    for cached in (_distance_field, _weight_field, _ring_field, vignette_alpha, focus_mask_array):
+        cached.cache_clear()
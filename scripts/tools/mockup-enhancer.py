@@ -5,6 +5,20 @@ Auto-improve device mockup to Apple keynote quality
 
 Usage:
     python mockup-enhancer.py input.png
+    python mockup-enhancer.py --batch mockups/ [-o 1920x1080 ...] [-j WORKERS] [--out-dir DIR]
+
+Outputs whose input and effect parameters are unchanged are skipped (see
+--no-cache and the other build cache options). --profile report.json (or
+.csv) records per-stage timing and memory; see imaging.profiling.
+--format picks the codec profile (png-fast, png-optimized, webp, avif,
+jpeg) and --max-kb a size target for the lossy ones; see imaging.encode.
+Print-size batch outputs render tile by tile with bounded memory (--tiled).
+--guides sidecar writes safe area variants as transparent guide layers
+instead of recompositing the render.
+--name sets the output file names; services can render in memory through
+imaging.api instead of this script. With $TIER_IMAGING_SOCKET pointing at
+a running `python3 -m imaging.server --socket PATH`, runs are forwarded
+to that warm process (see imaging.server).
 
 Outputs:
     - tier-golf-hero-1920x1080.png (16:9 web hero)
@@ -12,246 +26,219 @@ Outputs:
     - tier-golf-hero-1920x1080-safe.png (with safe area guides)
 """
 
+import argparse
+import os
 import sys
-from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
-import numpy as np
+import time
+
+# Only option parsing and the batch front end load at startup; the
+# rendering modules (NumPy, Pillow) are imported by the functions using them
+from imaging import batch, encode, profiling, server
+from imaging.buildcache import (
+    BUILT, FRESH, RESTORED, add_cache_arguments, build_key, cache_from_args,
+)
+from imaging.resample import DEFAULT_QUALITY, QUALITY_PROFILES
+
+# Single-image output names (batch mode uses batch.DEFAULT_NAME_TEMPLATE)
+SINGLE_NAME_TEMPLATE = 'tier-golf-hero-{width}x{height}{safe}'
+# Sizes the single-image run renders; its session plans its intermediate for them
+SINGLE_SIZES = [(1920, 1080), (1600, 1200)]
+
+# Per-variant status line for each build cache outcome
+SAVE_MESSAGES = {
+    BUILT: "✅ Saved",
+    FRESH: "⏭️  Up to date",
+    RESTORED: "♻️  Restored from cache",
+}
 
 def create_gradient_background(width, height):
     """Create subtle gradient background (top: light, bottom: slightly darker)"""
-    # Create gradient from #FCFCFC (top) to #F5F5F5 (bottom)
-    gradient = Image.new('RGB', (width, height), color='#FCFCFC')
-    draw = ImageDraw.Draw(gradient, 'RGBA')
+    from imaging.gradient import HERO_STOPS, linear_gradient
 
-    for y in range(height):
-        # Calculate color for this row
-        ratio = y / height
-        # Top color: (252, 252, 252) -> Bottom: (245, 245, 245)
-        r = int(252 - (7 * ratio))
-        g = int(252 - (7 * ratio))
-        b = int(252 - (7 * ratio))
+    # Gradient from #FCFCFC (top) to #F5F5F5 (bottom), built as one array
+    return linear_gradient(width, height, HERO_STOPS)
 
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-    return gradient
-
-def create_radial_vignette(width, height, strength=0.04):
+def create_radial_vignette(width, height, strength=0.04, falloff='linear'):
     """Create subtle radial vignette for focus"""
-    vignette = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(vignette, 'RGBA')
-
-    center_x, center_y = width * 0.55, height * 0.5  # Centered on MacBook
-    max_radius = np.sqrt((width/2)**2 + (height/2)**2)
-
-    for radius_step in range(100, 0, -1):
-        radius = max_radius * (radius_step / 100)
-        # Opacity increases towards edges
-        opacity = int(255 * strength * (1 - radius_step/100))
-        draw.ellipse(
-            [center_x - radius, center_y - radius, center_x + radius, center_y + radius],
-            fill=(0, 0, 0, opacity)
-        )
+    from imaging.vignette import DEFAULT_CENTER, create_vignette
 
-    return vignette
+    # Closed-form per-pixel alpha; falloff='stepped' reproduces the legacy 100-ring look
+    return create_vignette(width, height, strength, falloff, center=DEFAULT_CENTER)
 
 def add_professional_shadow(image, offset_x=0, offset_y=48, blur=96, opacity=0.06):
     """Add soft, professional drop shadow"""
-    # Create shadow layer
-    shadow = Image.new('RGBA', (image.width + blur*2, image.height + blur*2), (0, 0, 0, 0))
-
-    # Create shadow shape (copy of image alpha channel)
-    shadow_draw = ImageDraw.Draw(shadow)
-
-    # Get alpha channel from original image
-    if image.mode == 'RGBA':
-        alpha = image.split()[3]
-    else:
-        alpha = Image.new('L', image.size, 255)
-
-    # Create shadow by darkening
-    shadow_img = Image.new('RGBA', image.size, (0, 0, 0, int(255 * opacity)))
-    shadow_img.putalpha(alpha)
+    from imaging.shadow import ShadowLayer, alpha_mask, render_shadow
 
-    # Blur the shadow
-    shadow_img = shadow_img.filter(ImageFilter.GaussianBlur(radius=blur/2))
-
-    # Position shadow with offset
-    shadow_canvas = Image.new('RGBA', (image.width + blur*2, image.height + blur*2), (0, 0, 0, 0))
-    shadow_canvas.paste(shadow_img, (blur + offset_x, blur + offset_y))
-
-    return shadow_canvas, blur
+    layer = ShadowLayer(offset_x=offset_x, offset_y=offset_y, blur=blur, opacity=opacity)
+    return render_shadow(alpha_mask(image), [layer])
 
 def add_dual_shadow(image):
     """Add dual-layer shadow system (contact + ambient)"""
-    # Layer 1: Contact shadow (close, sharper)
-    contact_shadow, blur1 = add_professional_shadow(
-        image,
-        offset_x=0,
-        offset_y=12,
-        blur=24,
-        opacity=0.12
-    )
+    from imaging.shadow import DUAL_SHADOW, alpha_mask, render_shadow
 
-    # Layer 2: Ambient shadow (far, softer)
-    ambient_shadow, blur2 = add_professional_shadow(
-        image,
-        offset_x=0,
-        offset_y=48,
-        blur=96,
-        opacity=0.06
-    )
+    # Ambient (far, softer) and contact (close, sharper) composited in one pass
+    return render_shadow(alpha_mask(image), DUAL_SHADOW)
 
-    # Combine shadows - ensure same size
-    max_blur = max(blur1, blur2)
-
-    # Use the larger canvas size
-    max_width = max(contact_shadow.width, ambient_shadow.width)
-    max_height = max(contact_shadow.height, ambient_shadow.height)
-
-    # Create new canvas and paste both shadows centered
-    combined = Image.new('RGBA', (max_width, max_height), (0, 0, 0, 0))
-
-    # Paste ambient shadow (centered)
-    ambient_x = (max_width - ambient_shadow.width) // 2
-    ambient_y = (max_height - ambient_shadow.height) // 2
-    combined.paste(ambient_shadow, (ambient_x, ambient_y), ambient_shadow)
-
-    # Paste contact shadow on top (centered)
-    contact_x = (max_width - contact_shadow.width) // 2
-    contact_y = (max_height - contact_shadow.height) // 2
-    combined = Image.alpha_composite(combined,
-                                    Image.new('RGBA', (max_width, max_height), (0, 0, 0, 0)))
-    temp_canvas = Image.new('RGBA', (max_width, max_height), (0, 0, 0, 0))
-    temp_canvas.paste(contact_shadow, (contact_x, contact_y), contact_shadow)
-    combined = Image.alpha_composite(combined, temp_canvas)
-
-    return combined, max_blur
-
-def add_noise_texture(image, strength=0.06):
-    """Add subtle grain/noise for realism"""
-    # Create noise
-    noise = np.random.randint(0, 50, (image.height, image.width), dtype=np.uint8)
-    noise_img = Image.fromarray(noise, mode='L')
-    noise_rgba = Image.new('RGBA', image.size)
-    noise_rgba.putalpha(noise_img)
-
-    # Apply with low opacity
-    enhancer = ImageEnhance.Brightness(noise_rgba)
-    noise_rgba = enhancer.enhance(strength)
-
-    # Blend with original
-    result = Image.alpha_composite(image.convert('RGBA'), noise_rgba)
-    return result
-
-def enhance_mockup(input_path, output_width=1920, output_height=1080):
-    """Main enhancement function"""
-    print(f"📂 Loading: {input_path}")
+def add_noise_texture(image, strength=0.06, seed=None):
+    """Add subtle grain/noise for realism (seed defaults to grain.DEFAULT_SEED)"""
+    from imaging import grain
 
-    # Load original image
-    original = Image.open(input_path)
-    if original.mode != 'RGBA':
-        original = original.convert('RGBA')
+    return grain.add_noise_texture(image, strength, seed=grain.DEFAULT_SEED if seed is None else seed)
 
-    print(f"   Original size: {original.width}x{original.height}")
+def enhance_mockup(input_path, output_width=1920, output_height=1080, session=None):
+    """Main enhancement function"""
+    from imaging.session import EnhancementSession
 
-    # Create new canvas with gradient background
-    print("🎨 Creating gradient background...")
-    canvas = create_gradient_background(output_width, output_height)
-    canvas = canvas.convert('RGBA')
+    # Reuse the caller's session so the source is decoded and scaled only once
+    if session is None:
+        session = EnhancementSession(input_path, progress=print, sizes=[(output_width, output_height)])
 
-    # Calculate scaling to fit within canvas (with padding)
-    padding = 120  # Safe area margin
-    max_width = output_width - (padding * 2)
-    max_height = output_height - (padding * 2)
+    return session.render(output_width, output_height)
 
-    # Scale original to fit
-    scale = min(max_width / original.width, max_height / original.height)
-    new_width = int(original.width * scale)
-    new_height = int(original.height * scale)
+def create_safe_area_guide(width, height, margin=120):
+    """Create safe area guide overlay"""
+    from imaging import overlays
 
-    print(f"📐 Scaling to: {new_width}x{new_height}")
-    scaled = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    return overlays.create_safe_area_guide(width, height, margin)
 
-    # Add dual-layer shadow system
-    print("🌑 Adding professional shadows...")
-    shadowed, shadow_blur = add_dual_shadow(scaled)
+def output_spec(text):
+    """argparse type for --output"""
+    try:
+        return batch.parse_output_spec(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
-    # Calculate center position (slightly right for visual balance)
-    center_x = int(output_width * 0.52)  # 52% from left (slight right bias)
-    center_y = int(output_height * 0.5)  # Centered vertically
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Enhance device mockups into keynote-style hero images.",
+    )
+    parser.add_argument('inputs', nargs='*', metavar='INPUT',
+                        help="image file; in batch mode also a directory, glob or manifest (.json/.txt)")
+    parser.add_argument('--batch', action='store_true',
+                        help="render every input x output pair on a process pool")
+    parser.add_argument('-o', '--output', dest='outputs', action='append', type=output_spec,
+                        metavar='WxH[+safe]',
+                        help="batch output size, repeatable (default: 1920x1080, 1600x1200, 1920x1080+safe)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="batch worker processes (default: CPU count)")
+    parser.add_argument('--out-dir', default='.', help="batch output directory (default: current directory)")
+    parser.add_argument('--quality', choices=sorted(QUALITY_PROFILES), default=DEFAULT_QUALITY,
+                        help="resampling quality: preview is fastest, final is sharpest (default: final)")
+    parser.add_argument('--name', dest='name_template', default=None, metavar='TEMPLATE',
+                        help="output file name without extension; fields {stem}, {width}, {height}, {safe} "
+                             f"(default: {SINGLE_NAME_TEMPLATE}, batch: {batch.DEFAULT_NAME_TEMPLATE})")
+    parser.add_argument('--tiled', choices=batch.TILED_MODES, default=batch.TILED_AUTO,
+                        help="batch: render band by band into a streamed PNG with bounded memory "
+                             f"(default: auto, for outputs of {batch.TILED_MIN_PIXELS // 1_000_000}+ megapixels)")
+    parser.add_argument('--guides', choices=batch.GUIDE_MODES, default=batch.GUIDES_COMPOSITE,
+                        help="safe area variants: guide composited onto the render, or only the transparent "
+                             "guide layer as a sidecar to the plain render (default: composite)")
+    add_cache_arguments(parser)
+    profiling.add_profile_arguments(parser)
+    encode.add_encode_arguments(parser)
+    return parser.parse_args(argv)
+
+def is_batch(args):
+    """Batch mode is explicit, or implied by several inputs / a non-image input"""
+    if args.batch or len(args.inputs) > 1:
+        return True
+    source = args.inputs[0]
+    return not os.path.isfile(source) or source.lower().endswith(batch.MANIFEST_EXTENSIONS)
+
+def report_profile(args, profiler):
+    """Write the --profile report and print per-stage totals"""
+    rows = profiler.report_rows()
+    profiling.write_report(args.profile, rows, batch.TOOL_NAME, trace_memory=args.trace_memory)
+    print("⏱️  Stage timings:")
+    for line in profiling.summary_lines(rows):
+        print(line)
+    print(f"   📊 Report: {args.profile}")
+    print()
 
-    # Position with shadow
-    shadow_x = center_x - (shadowed.width // 2)
-    shadow_y = center_y - (shadowed.height // 2)
+def batch_main(args):
+    print("=" * 60)
+    print("🎨 TIER GOLF MOCKUP ENHANCER - BATCH")
+    print("=" * 60)
+    print()
 
-    # Composite shadow + image onto canvas
-    canvas.paste(shadowed, (shadow_x, shadow_y), shadowed)
+    inputs, missing = batch.collect_inputs(args.inputs)
+    outputs = args.outputs or batch.DEFAULT_OUTPUTS
+    print(f"📂 {len(inputs)} inputs × {len(outputs)} variants → {args.out_dir}")
+    print()
 
-    # Add radial vignette for focus
-    print("✨ Adding vignette...")
-    vignette = create_radial_vignette(output_width, output_height, strength=0.04)
-    canvas = Image.alpha_composite(canvas, vignette)
+    def report(result):
+        status = {BUILT: "✅", FRESH: "⏭️ ", RESTORED: "♻️ "}.get(result.status, "❌")
+        print(f"   {status} {os.path.basename(result.output)} ({result.seconds:.1f}s)")
 
-    # Add subtle noise texture
-    print("🔲 Adding subtle grain texture...")
-    canvas = add_noise_texture(canvas, strength=0.06)
+    cache = cache_from_args(args)
+    profiler = profiling.profiler_from_args(args)
+    codec, max_bytes = encode.profile_from_args(args)
+    started = time.perf_counter()
+    try:
+        results = batch.run_batch(
+            inputs, outputs, args.out_dir, workers=args.workers, progress=report, cache=cache,
+            quality=args.quality, profile=profiler is not None, trace_memory=args.trace_memory,
+            codec=codec, max_bytes=max_bytes, encode_threads=args.encode_threads, tiled=args.tiled,
+            name_template=args.name_template or batch.DEFAULT_NAME_TEMPLATE, guides=args.guides,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    if cache is not None:
+        cache.prune()
 
-    # Apply micro contrast boost to center area (where MacBook would be)
-    print("🎯 Enhancing focal point...")
-    enhancer = ImageEnhance.Contrast(canvas)
-    enhanced = enhancer.enhance(1.05)
+    print()
+    print("=" * 60)
+    for line in batch.summarize(results, missing, elapsed):
+        print(line)
+    print("=" * 60)
 
-    # Blend enhanced version only in center (focus effect)
-    mask = create_radial_vignette(output_width, output_height, strength=0.3)
-    # Invert mask (center bright, edges dark)
-    mask_array = np.array(mask)[:, :, 3]
-    mask_array = 255 - mask_array
-    mask_inverted = Image.fromarray(mask_array, mode='L')
+    if profiler is not None:
+        for result in results:
+            profiler.extend(result.stages or [])
+        print()
+        report_profile(args, profiler)
 
-    final = Image.composite(enhanced, canvas, mask_inverted)
+    if missing or not all(result.ok for result in results):
+        sys.exit(1)
 
-    print("✅ Enhancement complete!")
-    return final
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Hand the job to a warm image server when one is running
+    status = server.forward(batch.TOOL_NAME, argv)
+    if status is not None:
+        sys.exit(status)
 
-def create_safe_area_guide(width, height, margin=120):
-    """Create safe area guide overlay"""
-    guide = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(guide)
-
-    # Draw safe area rectangle
-    draw.rectangle(
-        [margin, margin, width - margin, height - margin],
-        outline=(255, 0, 0, 128),
-        width=3
-    )
+    args = parse_args(argv)
+    if not args.inputs:
+        print("❌ Usage: python mockup-enhancer.py input.png")
+        print("   Example: python mockup-enhancer.py tier-golf-mockup.png")
+        print("   Batch:   python mockup-enhancer.py --batch mockups/ -o 1920x1080 -o 1080x1350 -j 8")
+        sys.exit(1)
 
-    # Add corner markers
-    corner_size = 40
-    for x, y in [(margin, margin), (width - margin, margin),
-                 (margin, height - margin), (width - margin, height - margin)]:
-        # Horizontal line
-        draw.line([(x - corner_size, y), (x + corner_size, y)], fill=(255, 0, 0, 128), width=2)
-        # Vertical line
-        draw.line([(x, y - corner_size), (x, y + corner_size)], fill=(255, 0, 0, 128), width=2)
-
-    # Add label
-    from PIL import ImageFont
     try:
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 24)
-    except:
-        font = ImageFont.load_default()
-
-    label = f"Safe Area: {margin}px margin"
-    draw.text((margin + 20, margin - 50), label, fill=(255, 0, 0, 180), font=font)
+        codec, _ = encode.profile_from_args(args)
+        if args.tiled == batch.TILED_ON and not encode.can_stream(codec):
+            raise ValueError(f"--tiled on streams PNG only, not '{codec.name}'")
+        if args.name_template:
+            batch.check_name_template(args.name_template)
+        batch.check_guides(codec, args.guides)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
 
-    return guide
+    with profiling.cprofiled(args.cprofile):
+        if is_batch(args):
+            batch_main(args)
+        else:
+            single_main(args)
 
-def main():
-    if len(sys.argv) < 2:
-        print("❌ Usage: python mockup-enhancer.py input.png")
-        print("   Example: python mockup-enhancer.py tier-golf-mockup.png")
-        sys.exit(1)
+def single_main(args):
+    from imaging import overlays
+    from imaging.session import EnhancementSession
 
-    input_path = sys.argv[1]
+    input_path = args.inputs[0]
 
     print("=" * 60)
     print("🎨 TIER GOLF MOCKUP ENHANCER")
@@ -259,33 +246,87 @@ def main():
     print("=" * 60)
     print()
 
+    cache = cache_from_args(args)
+    profiler = profiling.profiler_from_args(args) or profiling.NULL_PROFILER
+    codec, max_bytes = encode.profile_from_args(args)
+    encoder = encode.encoder_from_args(args)
+    pending = []
+    session = None
+    renders = {}
+
+    def render(width, height):
+        nonlocal session
+        if session is None:
+            # Decode the source once; every variant renders from its cached layers
+            session = EnhancementSession(
+                input_path, progress=print, sizes=SINGLE_SIZES, quality=args.quality,
+                profiler=profiler,
+            )
+            print()
+        if (width, height) not in renders:
+            renders[(width, height)] = enhance_mockup(input_path, width, height, session=session)
+        return renders[(width, height)]
+
+    def save_variant(spec, build):
+        """Render a variant and queue it on the encoder; returns its output path"""
+        output = batch.output_filename(input_path, spec, codec, args.name_template or SINGLE_NAME_TEMPLATE)
+        store = None
+        if cache is not None:
+            plan = batch.intermediate_plan(input_path, SINGLE_SIZES)
+            params = batch.render_params(spec, args.quality, codec, max_bytes, args.guides, plan)
+            key = build_key(input_path, params, batch.TOOL_NAME)
+            status = cache.lookup(key, output)
+            if status is not None:
+                pending.append((output, status, None))
+                return output
+
+            def store(path):
+                cache.store(key, path)
+
+        with profiler.run(output):
+            image = build()
+        pending.append((output, BUILT, encoder.submit(image, output, codec, max_bytes, on_done=store)))
+        return output
+
+    def finish():
+        """Wait for the queued writes and report each variant"""
+        encoder.close()
+        for output, status, future in pending:
+            if future is not None:
+                profiler.add('save', future.result(), run=output)
+            print(f"   {SAVE_MESSAGES[status]}: {output}")
+        print()
+
+    def safe_area(width, height):
+        with profiler.stage('overlay'):
+            if args.guides == batch.GUIDES_SIDECAR:
+                # Only the cached guide layer; viewers stack it over the plain render
+                return overlays.safe_area_layer(width, height, margin=120).image()
+            return overlays.apply_safe_area_guide(render(width, height), margin=120)
+
     try:
         # Variant A: 1920x1080 (16:9 web hero)
         print("📦 Creating Variant A: 1920x1080 (16:9)")
-        enhanced_16_9 = enhance_mockup(input_path, 1920, 1080)
-        output_a = "tier-golf-hero-1920x1080.png"
-        enhanced_16_9.convert('RGB').save(output_a, 'PNG', quality=95)
-        print(f"   ✅ Saved: {output_a}")
-        print()
+        output_a = save_variant(batch.OutputSpec(1920, 1080, False), lambda: render(1920, 1080))
 
         # Variant B: 1600x1200 (4:3)
         print("📦 Creating Variant B: 1600x1200 (4:3)")
-        enhanced_4_3 = enhance_mockup(input_path, 1600, 1200)
-        output_b = "tier-golf-hero-1600x1200.png"
-        enhanced_4_3.convert('RGB').save(output_b, 'PNG', quality=95)
-        print(f"   ✅ Saved: {output_b}")
-        print()
+        output_b = save_variant(batch.OutputSpec(1600, 1200, False), lambda: render(1600, 1200))
 
         # Variant C: 1920x1080 with safe area guides
         print("📦 Creating Variant C: 1920x1080 with safe area")
-        enhanced_safe = enhanced_16_9.copy()
-        safe_guide = create_safe_area_guide(1920, 1080, margin=120)
-        enhanced_safe = Image.alpha_composite(enhanced_safe.convert('RGBA'), safe_guide)
-        output_c = "tier-golf-hero-1920x1080-safe.png"
-        enhanced_safe.convert('RGB').save(output_c, 'PNG', quality=95)
-        print(f"   ✅ Saved: {output_c}")
+        output_c = save_variant(batch.OutputSpec(1920, 1080, True), lambda: safe_area(1920, 1080))
         print()
 
+        # Writes overlap with rendering; wait for them before reporting
+        print("💾 Writing outputs")
+        finish()
+
+        if cache is not None:
+            cache.prune()
+        if profiler is not profiling.NULL_PROFILER:
+            report_profile(args, profiler)
+
         print("=" * 60)
         print("✨ ENHANCEMENT COMPLETE!")
         print("=" * 60)
@@ -293,7 +334,10 @@ def main():
         print("📁 Output files:")
         print(f"   • {output_a} (web hero, 16:9)")
         print(f"   • {output_b} (pitch deck, 4:3)")
-        print(f"   • {output_c} (with safe area guides)")
+        if args.guides == batch.GUIDES_SIDECAR:
+            print(f"   • {output_c} (safe area guide layer for {output_a})")
+        else:
+            print(f"   • {output_c} (with safe area guides)")
         print()
         print("🎯 Improvements applied:")
         print("   ✅ Professional dual-layer shadow system")
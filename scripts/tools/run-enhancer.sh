@@ -11,25 +11,49 @@ if [ -z "$1" ]; then
     echo ""
     echo "Usage:"
     echo "  ./run-enhancer.sh /path/to/your/mockup.png"
+    echo "  ./run-enhancer.sh /path/to/mockups/          # batch: every image in the folder"
+    echo "  ./run-enhancer.sh a.png b.png 'exports/*.png'  # batch: several inputs or globs"
+    echo ""
+    echo "Batch options via environment:"
+    echo "  WORKERS=8 OUT_DIR=heroes OUTPUTS=\"1920x1080 1080x1350 1920x1080+safe\""
     echo ""
     echo "Or place your image as 'original-mockup.png' in this directory"
     echo "and run: ./run-enhancer.sh original-mockup.png"
     exit 1
 fi
 
-IMAGE_PATH="$1"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
-# Check if file exists
-if [ ! -f "$IMAGE_PATH" ]; then
-    echo "❌ File not found: $IMAGE_PATH"
-    exit 1
+# Batch mode: several inputs, a directory, a glob or a manifest
+if [ $# -gt 1 ] || [ -d "$1" ] || [ ! -f "$1" ] || [[ "$1" == *.json ]] || [[ "$1" == *.txt ]]; then
+    BATCH_ARGS=(--batch --out-dir "${OUT_DIR:-.}")
+    if [ -n "$WORKERS" ]; then
+        BATCH_ARGS+=(-j "$WORKERS")
+    fi
+    for SPEC in $OUTPUTS; do
+        BATCH_ARGS+=(-o "$SPEC")
+    done
+
+    python3 "$SCRIPT_DIR/mockup-enhancer.py" "${BATCH_ARGS[@]}" "$@"
+    STATUS=$?
+
+    echo ""
+    if [ $STATUS -eq 0 ]; then
+        echo "🎉 SUCCESS! All batch variants rendered into ${OUT_DIR:-.}"
+    else
+        echo "⚠️  Batch finished with failures. See the summary above."
+    fi
+    exit $STATUS
 fi
 
+# Single image (anything else went to batch mode, which reports missing inputs)
+IMAGE_PATH="$1"
+
 echo "📂 Input: $IMAGE_PATH"
 echo ""
 
 # Run the Python script
-python3 mockup-enhancer.py "$IMAGE_PATH"
+python3 "$SCRIPT_DIR/mockup-enhancer.py" "$IMAGE_PATH"
 
 # Check if successful
 if [ $? -eq 0 ]; then